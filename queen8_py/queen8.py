@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from queen8_algorithm import SearchBudgetExceeded, complete_board
+
+# ---------------------------- Batch completion CLI ---------------------------- #
+#
+#   python -m queen8 [jobs.jsonl] [--workers W] [--in-flight K] [--order input|completion]
+#
+# Each input line is one job: a JSON object {"id": ..., "state": [...]} or a
+# bare state list, using the same encoding as `state` (column per row, -1 for
+# an empty row). Each output line is {"id", "status", "state", "ms"} where
+# status is one of solved, unsolvable, budget or invalid; "ms" is the time
+# from submission to result. Throughput and latency percentiles go to stderr.
+
+# Per-job placement budget: proving that a large board has no completion can
+# take exponential time, so jobs report "budget" instead of running forever
+DEFAULT_MAX_NODES = 1_000_000
+
+Job = Tuple[int, object, Optional[Tuple[int, ...]], Optional[str]]  # seq, id, state, parse error
+
+
+def _solve(args: Tuple[Tuple[int, ...], Optional[int]]) -> Tuple[str, Optional[List[int]], Optional[str]]:
+    """Worker: (status, board, error) for one partial board"""
+    state, max_nodes = args
+    try:
+        board = complete_board(state, max_nodes=max_nodes)
+    except SearchBudgetExceeded as e:
+        return 'budget', None, str(e)
+    except ValueError as e:
+        return 'invalid', None, str(e)
+    if board is None:
+        return 'unsolvable', None, None
+    return 'solved', list(board), None
+
+
+def _parse(seq: int, line: str) -> Job:
+    try:
+        job = json.loads(line)
+        if isinstance(job, dict):
+            job_id, state = job.get('id', seq), job.get('state')
+        else:
+            job_id, state = seq, job
+        # type() rather than isinstance(): JSON true/false load as bools, which are ints
+        if not isinstance(state, list) or not all(type(c) is int for c in state):
+            return seq, job_id, None, "state must be a list of ints"
+        if not state:
+            return seq, job_id, None, "state must have at least one row"
+        return seq, job_id, tuple(state), None
+    except json.JSONDecodeError as e:
+        return seq, seq, None, f"bad JSON: {e.msg}"
+
+
+def read_jobs(stream: TextIO) -> Iterator[Job]:
+    """Parse JSONL jobs lazily; blank lines are skipped. Jobs without an
+    "id" are numbered from 0 in input order."""
+    seq = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        yield _parse(seq, line)
+        seq += 1
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    i = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[i]
+
+
+def run_jobs(jobs: Iterator[Job], out: TextIO, workers: Optional[int] = None,
+             in_flight: Optional[int] = None, order: str = 'input',
+             max_nodes: Optional[int] = None) -> List[float]:
+    """Solve jobs on a process pool (in this process when workers == 1),
+    keeping at most `in_flight` jobs submitted but not yet written, and
+    write one result line per job. Returns the per-job latencies in ms."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if in_flight is None:
+        in_flight = 4 * workers
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if in_flight < 1:
+        raise ValueError(f"in_flight must be at least 1, got {in_flight}")
+    latencies: List[float] = []
+
+    def emit(job_id, status, board, error, ms):
+        record = {'id': job_id, 'status': status, 'state': board, 'ms': round(ms, 3)}
+        if error is not None:
+            record['error'] = error
+        out.write(json.dumps(record) + '\n')
+        latencies.append(ms)
+
+    if workers == 1:
+        for seq, job_id, state, error in jobs:
+            start = time.perf_counter()
+            status, board = 'invalid', None
+            if state is not None:
+                status, board, error = _solve((state, max_nodes))
+            emit(job_id, status, board, error, (time.perf_counter() - start) * 1000)
+        return latencies
+
+    pending: Dict[Future, Tuple[int, object, float]] = {}
+    done_early: Dict[int, tuple] = {}  # input order: finished, waiting for earlier jobs
+    next_seq = 0
+    jobs = iter(jobs)
+    exhausted = False
+
+    def finish(seq, record):
+        nonlocal next_seq
+        if order == 'completion':
+            emit(*record)
+            return
+        done_early[seq] = record
+        while next_seq in done_early:
+            emit(*done_early.pop(next_seq))
+            next_seq += 1
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            # top up: jobs waiting to be written count against the bound too
+            while not exhausted and len(pending) + len(done_early) < in_flight:
+                job = next(jobs, None)
+                if job is None:
+                    exhausted = True
+                    break
+                seq, job_id, state, error = job
+                if state is None:
+                    finish(seq, (job_id, 'invalid', None, error, 0.0))
+                    continue
+                future = pool.submit(_solve, (state, max_nodes))
+                pending[future] = (seq, job_id, time.perf_counter())
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            now = time.perf_counter()
+            for future in finished:
+                seq, job_id, start = pending.pop(future)
+                status, board, error = future.result()
+                finish(seq, (job_id, status, board, error, (now - start) * 1000))
+    return latencies
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m queen8",
+                                     description="Complete partially placed N-Queens boards from JSONL jobs")
+    parser.add_argument("input", nargs="?", default="-", help="JSONL job file (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="result file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU; 1 = no pool)")
+    parser.add_argument("--in-flight", type=int, default=None, help="max jobs submitted but not yet written (default: 4 x workers)")
+    parser.add_argument("--order", choices=["input", "completion"], default="input",
+                        help="write results in input order or as they finish")
+    parser.add_argument("--max-nodes", type=int, default=DEFAULT_MAX_NODES,
+                        help=f"per-job search budget in placements (default: {DEFAULT_MAX_NODES})")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.in_flight is not None and args.in_flight < 1:
+        parser.error("--in-flight must be at least 1")
+
+    src = sys.stdin if args.input == "-" else open(args.input)
+    dst = sys.stdout if args.output == "-" else open(args.output, "w")
+    start = time.perf_counter()
+    try:
+        latencies = run_jobs(read_jobs(src), dst, args.workers, args.in_flight, args.order, args.max_nodes)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    rate = len(latencies) / elapsed if elapsed > 0 else 0.0
+    print(f"{len(latencies)} jobs in {elapsed:.2f}s ({rate:.1f} jobs/s)", file=sys.stderr)
+    print("latency ms: " + "  ".join(f"p{q}={_percentile(latencies, q):.2f}" for q in (50, 90, 99))
+          + f"  max={latencies[-1] if latencies else 0.0:.2f}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
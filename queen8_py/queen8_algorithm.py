@@ -1,83 +1,667 @@
-from typing import List, Tuple
+import heapq
+import random
+from array import array
+from collections import OrderedDict
+from time import perf_counter
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Set, Tuple
+
+from queen8_index import load_index
 
 # ---------------------------- Board constants ---------------------------- #
-BOARD_SIZE = 8
+BOARD_SIZE = 8  # default N; every engine takes the board size at runtime
+MODES = ('deterministic', 'astar', 'minconflicts', 'forward', 'beam', 'idastar')
+
+# Min-conflicts: boards up to this size scan every column for the least
+# conflicted move; larger boards sample MC_SAMPLE random columns plus the
+# currently empty ones.
+MC_FULL_SCAN = 1024
+MC_SAMPLE = 64
+MC_INIT_TRIES = 64  # random unused-column draws per row during initial placement
+
+# A* heap keys pack (f, -g, node id) into one int; ids get the low bits
+NODE_ID_BITS = 40
+
+# Beam search: nodes kept per depth unless the engine is given beam_width
+BEAM_WIDTH = 64
+
+# Default number of entries kept by a PrefixCache
+CACHE_SIZE = 1 << 16
+
+# Board.from_state() builds its masks in byte arrays from this size up: ORing
+# bits into a growing int costs O(N) per queen, O(N^2) in all
+BYTE_MASK_MIN_N = 2048
+
+# PrefixCache key kinds: an A* expansion (valid columns with child
+# heuristics), calculate_future_conflicts() and get_valid_columns()
+_CACHE_EXPAND, _CACHE_H, _CACHE_VALID = 0, 1, 2
 
 # ---------------------------- Heuristic ---------------------------- #
 
-def attacking_pairs(state: Tuple[int, ...]) -> int:
+def attacking_pairs(state: Tuple[int, ...], n: Optional[int] = None) -> int:
     """Number of attacking queen pairs (rows implied unique, but function
-    works regardless). state[r] = column of queen in row r or -1 if empty."""
-    rows = [i for i, c in enumerate(state) if c != -1]
-    cols = [state[r] for r in rows]
-    pairs = 0
+    works regardless). state[r] = column of queen in row r or -1 if empty.
+    `n` is the board size and defaults to len(state)."""
+    if n is None:
+        n = len(state)
+    if len(state) != n:
+        raise ValueError(f"state has {len(state)} rows, expected {n}")
     # row conflicts (only if multiple per row allowed; here one per row, so 0)
-    # column & diagonal conflicts across placed rows
-    for i in range(len(rows)):
-        r1, c1 = rows[i], cols[i]
-        for j in range(i + 1, len(rows)):
-            r2, c2 = rows[j], cols[j]
-            same_col = (c1 == c2)
-            same_diag = abs(r1 - r2) == abs(c1 - c2)
-            if same_col or same_diag:
-                pairs += 1
+    # column & diagonal conflicts: k queens sharing a line make k*(k-1)/2
+    # pairs. Two distinct rows never share both a column and a diagonal, so
+    # summing over lines counts every attacking pair exactly once.
+    col_count = [0] * n
+    diag_count = [0] * (2 * n - 1)
+    anti_count = [0] * (2 * n - 1)
+    offset = n - 1
+    for r, c in enumerate(state):
+        if c == -1:
+            continue
+        col_count[c] += 1
+        diag_count[c - r + offset] += 1
+        anti_count[r + c] += 1
+    pairs = 0
+    for counts in (col_count, diag_count, anti_count):
+        for k in counts:
+            if k > 1:
+                pairs += k * (k - 1) // 2
     return pairs
 
+def _popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+def _byte_masks(queens: Tuple[int, ...], n: int) -> Tuple[int, int, int]:
+    """Column, diagonal and anti-diagonal masks of a board in O(N)"""
+    cols = bytearray((n + 7) >> 3)
+    diags = bytearray((2 * n + 6) >> 3)
+    antis = bytearray((2 * n + 6) >> 3)
+    for r, c in enumerate(queens):
+        if c != -1:
+            cols[c >> 3] |= 1 << (c & 7)
+            d = c - r + n - 1
+            diags[d >> 3] |= 1 << (d & 7)
+            a = r + c
+            antis[a >> 3] |= 1 << (a & 7)
+    return int.from_bytes(cols, 'little'), int.from_bytes(diags, 'little'), int.from_bytes(antis, 'little')
+
+def _has_solution(n: int) -> bool:
+    return n not in (2, 3)
+
+def constructive_column(n: int, row: int) -> int:
+    """Column of `row` in the closed-form solution, in O(1). Row r takes the
+    r-th entry of evens-then-odds (1-based), with the standard fix-ups for
+    N mod 6 = 2 (odds 3, 1, 7, 9, ..., 5) or N mod 6 = 3 (evens 4, 6, ..., 2;
+    odds 5, 7, ..., 1, 3). Raises ValueError when N has no solution."""
+    if not _has_solution(n):
+        raise ValueError(f"no {n}-queens solution exists")
+    if not 0 <= row < n:
+        raise ValueError(f"row {row} is outside a board of size {n}")
+    half = n // 2
+    i = row - half  # position among the odds
+    if row < half:
+        if n % 6 == 3:
+            return 2 * row + 3 if row < half - 1 else 1
+        return 2 * row + 1
+    if n % 6 == 2:
+        if i < 2:
+            return 2 - 2 * i
+        return 4 if i == n - half - 1 else 2 * i + 2
+    if n % 6 == 3:
+        last = n - half - 1
+        if i >= last - 1:
+            return 0 if i == last - 1 else 2
+        return 2 * i + 4
+    return 2 * i
+
+
+def constructive_placements(n: int, start: int = 0) -> Iterator[Tuple[int, int]]:
+    """Lazily yield (row, col) of the closed-form solution from row `start`
+    down, one O(1) placement at a time. Yields nothing when N has no
+    solution."""
+    if not _has_solution(n):
+        return
+    for row in range(start, n):
+        yield row, constructive_column(n, row)
+
+
+def constructive_solution(n: int) -> Optional[List[int]]:
+    """The whole closed-form solution in O(N), built from ranges rather than
+    per-row calls, or None when none exists (N=2, 3). Same board as
+    constructive_column()."""
+    if n == 1:
+        return [0]
+    if n < 4:
+        return None
+    # 0-based columns of the 1-based evens and odds
+    evens = list(range(1, n, 2))
+    odds = list(range(0, n, 2))
+    if n % 6 == 2:
+        # swap 1 and 3, move 5 to the end
+        odds = [2, 0] + odds[3:] + [4]
+    elif n % 6 == 3:
+        # move 2 to the end of the evens, 1 and 3 to the end of the odds
+        evens = evens[1:] + [1]
+        odds = odds[2:] + [0, 2]
+    return evens + odds
+
+# ---------------------------- Step events ---------------------------- #
+
+class StepEvent:
+    """One search step. Fields are plain ints; the human-readable message is
+    only formatted when `message` is read.
+
+    kind         row / col                 frontier             info
+    place        queen placed              -                    -
+    placed_all   last initial queen        attacked queens      -
+    expand       expanded row / best col   open list size       -
+    dead_end     row with no valid column  open list size       -
+                 (forward: row whose domain emptied, last placement stays shown)
+    backtrack    row given up              search depth         -
+    deepen       -                         -                    new f-bound (IDA*)
+    move         row / new column          attacked queens      old column
+    restart      -                         -                    restart count
+    solved       last placement, if any    open list size (A*)  -
+    conflict     (full board has a conflict)
+    exhausted    (A* open list empty)
+    budget       -                         -                    restart count
+    no_solution  -                         -                    board size
+    """
+
+    __slots__ = ('kind', 'step', 'row', 'col', 'frontier', 'info')
+
+    TERMINAL = frozenset(('solved', 'conflict', 'exhausted', 'budget', 'no_solution'))
+
+    def __init__(self, kind: str, step: int, row: int = -1, col: int = -1,
+                 frontier: int = 0, info: int = 0):
+        self.kind = kind
+        self.step = step
+        self.row = row
+        self.col = col
+        self.frontier = frontier
+        self.info = info
+
+    @property
+    def done(self) -> bool:
+        return self.kind in StepEvent.TERMINAL
+
+    @property
+    def message(self) -> str:
+        kind, step = self.kind, self.step
+        if kind == 'place':
+            return f"Step {step}: Placed queen at row {self.row}, col {self.col}."
+        if kind == 'placed_all':
+            return (f"Step {step}: Placed queen at row {self.row}, col {self.col}."
+                    f" Initial board has {self.frontier} attacked queens.")
+        if kind == 'expand':
+            return f"Step {step}: Expanded row {self.row}, placed queen at col {self.col}. Open list size: {self.frontier}"
+        if kind == 'dead_end':
+            return f"Step {step}: Dead end at row {self.row}. Exploring other candidates..."
+        if kind == 'backtrack':
+            return f"Step {step}: No columns left in row {self.row}, backtracking."
+        if kind == 'deepen':
+            return f"Step {step}: Nothing left within the f-bound, raising it to {self.info}."
+        if kind == 'move':
+            return f"Step {step}: Moved queen in row {self.row} from col {self.info} to col {self.col}."
+        if kind == 'restart':
+            return f"Step {step}: No solution found, restart {self.info}."
+        if kind == 'solved':
+            return f"Step {step}: Solution found!"
+        if kind == 'conflict':
+            return "Unexpected conflict at full placement."
+        if kind == 'exhausted':
+            return "Frontier exhausted. No solution found (no backtracking)."
+        if kind == 'budget':
+            return f"Step budget exhausted at step {step - 1} after {self.info} restarts."
+        if kind == 'no_solution':
+            return f"No solution exists for N={self.info}."
+        return f"Step {step}: {kind}"
+
+    def __repr__(self) -> str:
+        return (f"StepEvent({self.kind!r}, step={self.step}, row={self.row}, col={self.col}, "
+                f"frontier={self.frontier}, info={self.info})")
+
+# ---------------------------- Search statistics ---------------------------- #
+
+class SearchStats:
+    """Counters and phase timers for one search run (reset with the engine).
+
+    nodes_generated  A*/beam/IDA*: children scored; deterministic: queens
+                     placed; min-conflicts: candidate squares scored
+    nodes_expanded   A*/beam: nodes popped and expanded; IDA*: nodes
+                     entered; deterministic: queens placed; min-conflicts:
+                     repair moves
+    dead_ends        A*/beam: expanded nodes with no valid column; IDA*:
+                     rows backed out of; min-conflicts: random restarts
+    peak_frontier    largest open list (A*), nodes held by the beam, search
+                     depth (IDA*, forward) or conflicted-row list
+    heuristic_calls  heuristic evaluations (one per child or candidate scored)
+
+    The time_* fields are seconds spent selecting the next node, expanding it
+    and scoring children. They are only measured when the engine is built
+    with profile=True; the counters are always on and cost an integer add."""
+
+    __slots__ = ('nodes_generated', 'nodes_expanded', 'dead_ends', 'peak_frontier',
+                 'heuristic_calls', 'time_selection', 'time_expansion', 'time_heuristic')
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.nodes_generated = 0
+        self.nodes_expanded = 0
+        self.dead_ends = 0
+        self.peak_frontier = 0
+        self.heuristic_calls = 0
+        self.time_selection = 0.0
+        self.time_expansion = 0.0
+        self.time_heuristic = 0.0
+
+    @property
+    def time_total(self) -> float:
+        return self.time_selection + self.time_expansion + self.time_heuristic
+
+    def as_dict(self) -> Dict[str, float]:
+        return {name: getattr(self, name) for name in SearchStats.__slots__}
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={v:.6f}" if isinstance(v, float) else f"{k}={v}"
+                           for k, v in self.as_dict().items())
+        return f"SearchStats({fields})"
+
+# ---------------------------- Prefix cache ---------------------------- #
+
+def canonical_prefix(prefix: Tuple[int, ...], n: int) -> Tuple[Tuple[int, ...], bool]:
+    """The smaller of `prefix` and its left-right mirror (c -> n-1-c, empty
+    rows stay -1), and whether the mirror was taken. A prefix and its mirror
+    image share the same canonical form."""
+    mirror = tuple(-1 if c == -1 else n - 1 - c for c in prefix)
+    if mirror < prefix:
+        return mirror, True
+    return tuple(prefix), False
+
+
+class PrefixCache:
+    """Bounded LRU map from canonical partial boards to search results.
+    One cache can be shared by any number of engines (keys include N); the
+    least recently used entry is evicted once `maxsize` is reached."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        if maxsize < 1:
+            raise ValueError(f"cache size must be at least 1, got {maxsize}")
+        self.maxsize = maxsize
+        self._data: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Cached value for `key`, or None on a miss"""
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        data = self._data
+        data[key] = value
+        data.move_to_end(key)
+        if len(data) > self.maxsize:
+            data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry and zero the counters"""
+        self._data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return (f"PrefixCache(size={len(self)}/{self.maxsize}, hits={self.hits}, "
+                f"misses={self.misses}, evictions={self.evictions}, hit_rate={self.hit_rate:.1%})")
+
+# ---------------------------- Bitboard ---------------------------- #
+
+class Board:
+    """Immutable partial board: the queens tuple plus column, diagonal and
+    anti-diagonal occupancy bitmasks. Bit c of `cols` marks column c, bit
+    (c - r + n - 1) of `diags` and bit (r + c) of `antis` mark the two
+    diagonals through (r, c)."""
+
+    __slots__ = ('n', 'queens', 'cols', 'diags', 'antis')
+
+    def __init__(self, n: int, queens: Optional[Tuple[int, ...]] = None,
+                 cols: int = 0, diags: int = 0, antis: int = 0):
+        self.n = n
+        self.queens = queens if queens is not None else tuple([-1] * n)
+        self.cols = cols
+        self.diags = diags
+        self.antis = antis
+
+    @classmethod
+    def from_state(cls, state: Tuple[int, ...], n: Optional[int] = None) -> 'Board':
+        """Build masks from a state tuple; rows past len(state) are empty"""
+        if n is None:
+            n = len(state)
+        queens = tuple(state) + (-1,) * (n - len(state))
+        if n >= BYTE_MASK_MIN_N:
+            return cls(n, queens, *_byte_masks(queens, n))
+        cols = diags = antis = 0
+        for r, c in enumerate(queens):
+            if c != -1:
+                cols |= 1 << c
+                diags |= 1 << (c - r + n - 1)
+                antis |= 1 << (r + c)
+        return cls(n, queens, cols, diags, antis)
+
+    def place(self, row: int, col: int) -> 'Board':
+        """Return a new board with a queen added at (row, col)"""
+        queens = list(self.queens)
+        queens[row] = col
+        return Board(self.n, tuple(queens),
+                     self.cols | (1 << col),
+                     self.diags | (1 << (col - row + self.n - 1)),
+                     self.antis | (1 << (row + col)))
+
+    def free_mask(self, row: int) -> int:
+        """Bitmask of columns in `row` not attacked by any placed queen"""
+        n = self.n
+        blocked = self.cols | (self.diags >> (n - 1 - row)) | (self.antis >> row)
+        return ((1 << n) - 1) & ~blocked
+
+    def is_free(self, row: int, col: int) -> bool:
+        return bool(self.free_mask(row) >> col & 1)
+
+    def valid_columns(self, row: int) -> List[int]:
+        """Free columns in `row`, ascending"""
+        mask = self.free_mask(row)
+        cols = []
+        while mask:
+            low = mask & -mask
+            cols.append(low.bit_length() - 1)
+            mask ^= low
+        return cols
+
+# ---------------------------- Board completion ---------------------------- #
+
+class SearchBudgetExceeded(RuntimeError):
+    """A bounded search gave up before finding an answer"""
+
+
+def complete_board(state: Tuple[int, ...], n: Optional[int] = None,
+                   max_nodes: Optional[int] = None, seed: int = 0) -> Optional[Tuple[int, ...]]:
+    """Fill the empty (-1) rows of `state` so that no two queens attack,
+    keeping every queen already placed. Returns the full board, or None when
+    the fixed queens attack each other or no completion exists.
+
+    Depth-first search on bitmasks that always branches on the empty row
+    with the fewest free columns. The first run tries columns from the
+    centre outwards; backtracking search has a heavy-tailed run time, so
+    each run is capped and the search restarts with a shuffled column order
+    (from `seed`) and double the cap. A run that ends inside its cap is
+    exhaustive, so None is still a proof. When the placed queens fill rows
+    0..k-1 and there is a solution index for N, the answer is an index
+    lookup; otherwise an empty board uses the closed-form construction.
+    Raises SearchBudgetExceeded after `max_nodes` placements in total and
+    ValueError for a malformed state."""
+    if n is None:
+        n = len(state)
+    if len(state) != n:
+        raise ValueError(f"state has {len(state)} rows, expected {n}")
+    for c in state:
+        if not -1 <= c < n:
+            raise ValueError(f"column {c} is outside a board of size {n}")
+    if attacking_pairs(state, n) > 0:
+        return None
+    k = state.index(-1) if -1 in state else n
+    if all(c == -1 for c in state[k:]):
+        index = load_index(n)
+        if index is not None:
+            return index.first(tuple(state[:k]))
+    if all(c == -1 for c in state):
+        solution = constructive_solution(n)
+        return tuple(solution) if solution is not None else None
+
+    rng = None
+    cap = max(64, 4 * n)
+    used = 0
+    while True:
+        budget = cap if max_nodes is None else min(cap, max_nodes - used)
+        result, nodes = _complete_dfs(state, n, budget, rng)
+        used += nodes
+        if nodes <= budget:
+            return result  # run finished: a board, or None after an exhaustive search
+        if max_nodes is not None and used >= max_nodes:
+            raise SearchBudgetExceeded(f"no completion within {max_nodes} placements")
+        if rng is None:
+            rng = random.Random(seed)
+        cap *= 2
+
+
+def _complete_dfs(state: Tuple[int, ...], n: int, budget: int,
+                  rng: Optional[random.Random]) -> Tuple[Optional[Tuple[int, ...]], int]:
+    """One complete_board() run: (board or None, placements made). Stops
+    with more than `budget` placements, in which case the board is None
+    and nothing was proved. Columns are tried centre-out, or in random
+    order when `rng` is given."""
+    board = Board.from_state(state, n)
+    queens = list(board.queens)
+    cols, diags, antis = board.cols, board.diags, board.antis
+    empty = [r for r in range(n) if queens[r] == -1]
+    full = (1 << n) - 1
+    shift = n - 1
+    centre = (n - 1) / 2
+    stack: List[Tuple[int, List[int]]] = []  # (row, untried columns; the next is last)
+    nodes = 0
+    while True:
+        if not empty:
+            return tuple(queens), nodes
+        # pick the most constrained empty row
+        best_row, best_mask, best_count = -1, 0, n + 1
+        for r in empty:
+            mask = full & ~(cols | (diags >> (shift - r)) | (antis >> r))
+            count = _popcount(mask)
+            if count < best_count:
+                best_row, best_mask, best_count = r, mask, count
+                if count <= 1:
+                    break
+        if best_count > 0:
+            empty.remove(best_row)
+            free = []
+            while best_mask:
+                low = best_mask & -best_mask
+                free.append(low.bit_length() - 1)
+                best_mask ^= low
+            if rng is None:
+                free.sort(key=lambda c: abs(c - centre), reverse=True)
+            else:
+                rng.shuffle(free)
+            stack.append((best_row, free))
+        # place the next untried column of the deepest row, backtracking
+        # out of rows that have none left
+        while True:
+            if not stack:
+                return None, nodes
+            row, free = stack[-1]
+            col = queens[row]
+            if col != -1:
+                queens[row] = -1
+                cols ^= 1 << col
+                diags ^= 1 << (col - row + shift)
+                antis ^= 1 << (row + col)
+            if free:
+                col = free.pop()
+                queens[row] = col
+                cols |= 1 << col
+                diags |= 1 << (col - row + shift)
+                antis |= 1 << (row + col)
+                nodes += 1
+                if nodes > budget:
+                    return None, nodes
+                break
+            stack.pop()
+            empty.append(row)
+
 # ---------------------------- Step-by-step A* Search ---------------------------- #
 
 class StepByStepAStar:
-    def __init__(self):
-        self.mode = 'deterministic'  # 'deterministic' | 'astar'
+    def __init__(self, n: int = BOARD_SIZE, seed: Optional[int] = None,
+                 max_steps: Optional[int] = None, restart_after: Optional[int] = None,
+                 vectorized: bool = False, profile: bool = False,
+                 on_step: Optional[Callable[[StepEvent, SearchStats], None]] = None,
+                 cache: Optional[PrefixCache] = None, beam_width: int = BEAM_WIDTH):
+        """`seed`, `max_steps` and `restart_after` configure min-conflicts mode:
+        the random seed, the total step budget (None = unlimited) and the
+        number of repair moves before a random restart (default max(100, 2N)).
+        `vectorized` scores A* children with NumPy (queen8_batch).
+        `profile` turns on the phase timers in `self.stats`; `on_step`, if
+        set, is called with every StepEvent and the stats after each step.
+        `cache` memoizes A* expansions, calculate_future_conflicts() and
+        get_valid_columns() by canonical prefix; share one PrefixCache
+        between engines to reuse results across solves. `beam_width` is
+        the number of nodes beam mode keeps per depth."""
+        if n < 1:
+            raise ValueError(f"board size must be at least 1, got {n}")
+        if beam_width < 1:
+            raise ValueError(f"beam width must be at least 1, got {beam_width}")
+        self.n = n
+        self.seed = seed
+        self.max_steps = max_steps
+        self.restart_after = restart_after if restart_after is not None else max(100, 2 * n)
+        self.vectorized = vectorized
+        self.profile = profile
+        self.on_step = on_step
+        self.cache = cache
+        self.beam_width = beam_width
+        self.stats = SearchStats()
+        self.mode = 'deterministic'  # one of MODES
+        # Rows changed since the last row_changes() call, once track_changes()
+        # turns this on; _dirty_all means "diff the whole board" instead
+        self._dirty: Optional[List[int]] = None
+        self._dirty_all = False
         self.reset()
 
     def set_mode(self, mode: str):
-        if mode not in ('deterministic', 'astar'):
+        if mode not in MODES:
             return
         self.mode = mode
         self.reset()
 
+    @property
+    def current_state(self) -> Tuple[int, ...]:
+        """The board being shown: state[r] = column of row r's queen or -1"""
+        if self.mode in ('minconflicts', 'forward', 'idastar'):
+            return tuple(self.queens)
+        return self.board.queens
+
+    def track_changes(self, enabled: bool = True):
+        """Start (or stop) recording which rows each step changes, for
+        row_changes()"""
+        self._dirty = [] if enabled else None
+        self._dirty_all = False
+
+    def row_changes(self) -> Optional[List[Tuple[int, int]]]:
+        """(row, column) of every row changed since the last call (or since
+        track_changes()), in row order, without copying the board. Rows set
+        back to their old column may be included. None when the whole board
+        may have changed: A* and beam jump between frontier nodes, and a
+        reset or min-conflicts restart clears every row."""
+        dirty = self._dirty
+        if dirty is None:
+            raise RuntimeError("row_changes() needs track_changes() first")
+        changes = None
+        if not self._dirty_all and self.mode not in ('astar', 'beam'):
+            queens = self.queens if self.mode in ('minconflicts', 'forward', 'idastar') else self.board.queens
+            changes = [(r, queens[r]) for r in sorted(set(dirty))]
+        self._dirty = []
+        self._dirty_all = False
+        return changes
+
     def reset(self):
         """Reset the search to start from beginning"""
-        self.current_state = tuple([-1] * BOARD_SIZE)
+        self._dirty_all = True
+        self.board = Board(self.n)
         self.current_row = 0
         self.solved = False
         self.stuck = False
         self.step_count = 0
+        self.stats.clear()
         if self.mode == 'astar':
-            # Open list frontier: each node is (f, g, state, row)
-            h0 = self.calculate_future_conflicts(self.current_state, 0)
-            self.open_list: List[Tuple[int, int, Tuple[int, ...], int]] = [(h0, 0, self.current_state, 0)]
+            # Search tree nodes live in parallel arrays indexed by node id:
+            # the parent's id and the column placed in the parent's row. A
+            # node's row is its depth g, and the board is rebuilt from the
+            # parent chain only when the node is popped or displayed.
+            self.node_parent = array('l')
+            self.node_col = array('l')
+            # Open list frontier: binary heap of packed int keys ordered by
+            # (f, -g, node id). Ties on f go to the deeper node, then to
+            # insertion order, so the pop order is stable. Every node is
+            # created once by its parent's single expansion, so no partial
+            # state can be queued twice.
+            self.open_list: List[int] = []
+            h0 = self.calculate_future_conflicts(self.board.queens, 0)
+            self.stats.heuristic_calls += 1
+            self._push_node(h0, 0, -1, -1)
+        elif self.mode == 'minconflicts':
+            self._rng = random.Random(self.seed)
+            self.restarts = 0
+            self._mc_restart()
+        elif self.mode == 'forward':
+            self._fc_init()
+        elif self.mode == 'beam':
+            self._beam_init()
+        elif self.mode == 'idastar':
+            self._ida_init()
         else:
-            # Known valid solution: one queen per row
-            self.fixed_solution: List[int] = [0, 4, 7, 5, 2, 6, 1, 3]
+            # Known valid solution: one queen per row. The lexicographically
+            # first one from the solution index where there is an index;
+            # otherwise the closed-form construction, generated one row per
+            # step so that any N starts instantly. The index is looked up on
+            # the first step, so engines that never run this mode skip it
+            self.fixed_solution: Optional[List[int]] = None
+            self._index_checked = False
+            self._placements: Optional[Iterator[Tuple[int, int]]] = None
     
+    def save_checkpoint(self, path: str):
+        """Write the search state to `path` (see queen8_checkpoint)"""
+        from queen8_checkpoint import save_checkpoint
+        save_checkpoint(self, path)
+
+    @classmethod
+    def load_checkpoint(cls, path: str) -> 'StepByStepAStar':
+        """A new engine that resumes from a save_checkpoint() file"""
+        from queen8_checkpoint import load_checkpoint
+        return load_checkpoint(path)
+
+    def record_trace(self, path: str, max_steps: Optional[int] = None) -> int:
+        """Run the search, writing every step to a trace file that can be
+        replayed and scrubbed without re-solving (see queen8_trace)"""
+        from queen8_trace import record_trace
+        return record_trace(self, path, max_steps=max_steps)
+
     def get_valid_columns(self, state: Tuple[int, ...], row: int) -> List[int]:
-        """Get all valid columns for placing a queen in the given row"""
-        valid_cols = []
-        for col in range(BOARD_SIZE):
-            # Create temporary state with queen at (row, col)
-            temp_state = list(state)
-            temp_state[row] = col
-            
-            # Check if this placement conflicts with existing queens
-            conflicts = False
-            for r in range(row):
-                if temp_state[r] == -1:
-                    continue
-                c = temp_state[r]
-                # Check column conflict
-                if c == col:
-                    conflicts = True
-                    break
-                # Check diagonal conflicts
-                if abs(r - row) == abs(c - col):
-                    conflicts = True
-                    break
-            
-            if not conflicts:
-                valid_cols.append(col)
-        
-        return valid_cols
+        """Get all valid columns for placing a queen in the given row,
+        checking only the queens in rows above it"""
+        if self.cache is None:
+            return Board.from_state(state[:row], self.n).valid_columns(row)
+        n = self.n
+        prefix, mirrored = canonical_prefix(state[:row], n)
+        key = (_CACHE_VALID, n, prefix)
+        cols = self.cache.get(key)
+        if cols is None:
+            cols = tuple(Board.from_state(prefix, n).valid_columns(row))
+            self.cache.put(key, cols)
+        if mirrored:
+            return [n - 1 - c for c in reversed(cols)]
+        return list(cols)
     
     def next_step(self) -> Tuple[Tuple[int, ...], str, bool]:
         """Perform one step of the search based on mode. Returns (new_state, message, is_complete)"""
@@ -85,98 +669,879 @@ class StepByStepAStar:
             return self.current_state, "Already solved!", True
         if self.stuck:
             return self.current_state, "Search failed - no solution found", True
+        event = self._advance()
+        return self.current_state, event.message, event.done
 
-        self.step_count += 1
+    def steps(self) -> Iterator[StepEvent]:
+        """Yield one StepEvent per search step until the search finishes.
+        No message strings or state tuples are built unless the consumer
+        asks for them (event.message, self.current_state)."""
+        advance = self._advance
+        while not self.solved and not self.stuck:
+            yield advance()
+
+    def solutions(self) -> Iterator[Tuple[int, ...]]:
+        """Yield complete conflict-free boards lazily. A* keeps draining its
+        frontier after each goal, so it yields every solution it can reach;
+        min-conflicts restarts after each one and never runs dry on its own
+        (bound it with max_steps or stop iterating); forward checking and
+        IDA* keep backtracking and yield every solution; beam yields the
+        solutions in its last layer; deterministic yields once."""
+        while True:
+            for _ in self.steps():
+                pass
+            if not self.solved:
+                return
+            yield self.current_state
+            if self.mode == 'astar' and self.open_list:
+                self.solved = False
+            elif self.mode == 'beam' and self._beam:
+                self.solved = False
+            elif self.mode == 'idastar':
+                self.solved = False
+            elif self.mode == 'minconflicts':
+                self.solved = False
+                self.restarts += 1
+                self._mc_restart()
+            elif self.mode == 'forward':
+                # retry the last row's next column: backtracking enumerates all
+                self.solved = False
+                self._fc_descend = False
+            else:
+                return
 
+    def _advance(self) -> StepEvent:
+        self.step_count += 1
         if self.mode == 'deterministic':
-            # If all rows placed, validate and finish
-            if self.current_row >= BOARD_SIZE:
-                h = attacking_pairs(self.current_state)
-                if h == 0:
-                    self.solved = True
-                    return self.current_state, f"Step {self.step_count}: Solution found!", True
-                else:
-                    self.stuck = True
-                    return self.current_state, "Unexpected conflict at full placement.", True
-
-            col = self.fixed_solution[self.current_row]
-            new_state = list(self.current_state)
-            new_state[self.current_row] = col
-            self.current_state = tuple(new_state)
-            msg = f"Step {self.step_count}: Placed queen at row {self.current_row}, col {col}."
-            self.current_row += 1
-            if self.current_row == BOARD_SIZE:
-                h = attacking_pairs(self.current_state)
-                if h == 0:
-                    self.solved = True
-                    return self.current_state, f"Step {self.step_count}: Solution found!", True
-                else:
-                    self.stuck = True
-                    return self.current_state, "Unexpected conflict at full placement.", True
-            return self.current_state, msg, False
+            event = self._step_deterministic()
+        elif self.mode == 'minconflicts':
+            event = self._step_minconflicts()
+        elif self.mode == 'forward':
+            event = self._step_forward()
+        elif self.mode == 'beam':
+            event = self._step_beam()
+        elif self.mode == 'idastar':
+            event = self._step_idastar()
+        else:
+            event = self._step_astar()
+        if self.on_step is not None:
+            self.on_step(event, self.stats)
+        return event
+
+    def _finish(self, row: int = -1, col: int = -1) -> StepEvent:
+        """Validate a fully placed board and end the search"""
+        if attacking_pairs(self.current_state, self.n) == 0:
+            self.solved = True
+            return StepEvent('solved', self.step_count, row, col)
+        self.stuck = True
+        return StepEvent('conflict', self.step_count, row, col)
+
+    def _step_deterministic(self) -> StepEvent:
+        if not _has_solution(self.n):
+            self.stuck = True
+            return StepEvent('no_solution', self.step_count, info=self.n)
+        # If all rows placed, validate and finish
+        if self.current_row >= self.n:
+            return self._finish()
+
+        row = self.current_row
+        fixed = self._indexed_solution()
+        if fixed is not None:
+            col = fixed[row]
+        else:
+            if self._placements is None:
+                # created on first use, so a resumed checkpoint starts at its row
+                self._placements = constructive_placements(self.n, row)
+            _, col = next(self._placements)
+        if self.profile:
+            t0 = perf_counter()
+        self.board = self.board.place(row, col)
+        if self._dirty is not None:
+            self._dirty.append(row)
+        self.current_row += 1
+        stats = self.stats
+        stats.nodes_generated += 1
+        stats.nodes_expanded += 1
+        if self.profile:
+            stats.time_expansion += perf_counter() - t0
+        if self.current_row == self.n:
+            return self._finish(row, col)
+        return StepEvent('place', self.step_count, row, col)
+
+    def _indexed_solution(self) -> Optional[List[int]]:
+        """First solution from the solution index, or None without one"""
+        if not self._index_checked:
+            self._index_checked = True
+            index = load_index(self.n)
+            first = index.first() if index is not None else None
+            self.fixed_solution = list(first) if first is not None else None
+        return self.fixed_solution
 
+    def _step_astar(self) -> StepEvent:
         # A* frontier (no backtracking)
         if not self.open_list:
             self.stuck = True
-            return self.current_state, "Frontier exhausted. No solution found (no backtracking).", True
+            return StepEvent('exhausted', self.step_count)
 
+        stats = self.stats
+        timed = self.profile
+        if timed:
+            t0 = perf_counter()
         # pop node with smallest f
-        self.open_list.sort(key=lambda x: x[0])
-        f, g, state, row = self.open_list.pop(0)
-        self.current_state = state
+        node, row = self._unpack_key(heapq.heappop(self.open_list))
+        board = self._node_board(node, row)
+        self.board = board
         self.current_row = row
+        if timed:
+            t1 = perf_counter()
+            stats.time_selection += t1 - t0
 
-        if row >= BOARD_SIZE and attacking_pairs(state) == 0:
+        if row >= self.n and attacking_pairs(board.queens, self.n) == 0:
             self.solved = True
-            return self.current_state, f"Step {self.step_count}: Solution found!", True
+            return StepEvent('solved', self.step_count, row, frontier=len(self.open_list))
 
-        valid_cols = self.get_valid_columns(state, row)
+        stats.nodes_expanded += 1
+        if timed:
+            h_before = stats.time_heuristic
+        if self.cache is None:
+            valid_cols, h_children = self._score_children(board, row)
+        else:
+            valid_cols, h_children = self._cached_children(board, row)
         if not valid_cols:
-            return self.current_state, f"Step {self.step_count}: Dead end at row {row}. Exploring other candidates...", False
-
-        children: List[Tuple[int, int, Tuple[int, ...], int]] = []
-        for col in valid_cols:
-            child_state = list(state)
-            child_state[row] = col
-            child_state_t = tuple(child_state)
-            g_child = row + 1
-            h_child = self.calculate_future_conflicts(child_state_t, row + 1)
+            stats.dead_ends += 1
+            if timed:
+                stats.time_expansion += perf_counter() - t1 - (stats.time_heuristic - h_before)
+            return StepEvent('dead_end', self.step_count, row, frontier=len(self.open_list))
+
+        best = None
+        g_child = row + 1
+        for col, h_child in zip(valid_cols, h_children):
             f_child = g_child + h_child
-            node = (f_child, g_child, child_state_t, row + 1)
-            children.append(node)
-            self.open_list.append(node)
-
-        # For visualization choose best child to display now
-        children.sort(key=lambda x: x[0])
-        best = children[0]
-        _, _, best_state, best_row = best
-        placed_col = [c for c in range(BOARD_SIZE) if best_state[best_row - 1] == c][0]
-        self.current_state = best_state
-        self.current_row = best_row
-        msg = f"Step {self.step_count}: Expanded row {row}, placed queen at col {placed_col}. Open list size: {len(self.open_list)}"
-        return self.current_state, msg, False
-    
+            self._push_node(f_child, g_child, node, col)
+            # For visualization keep the first child with the smallest f
+            if best is None or f_child < best[0]:
+                best = (f_child, col)
+
+        best_col = best[1]
+        self.board = board.place(row, best_col)
+        self.current_row = g_child
+        if timed:
+            # everything after selection except the scoring itself
+            stats.time_expansion += perf_counter() - t1 - (stats.time_heuristic - h_before)
+        return StepEvent('expand', self.step_count, row, best_col, len(self.open_list))
+
+    def _score_children(self, board: Board, row: int) -> Tuple[List[int], List[int]]:
+        """Valid columns of `row` and the heuristic of each child. Every queen
+        on an A* board sits above `row`, so the masks give the valid columns
+        directly."""
+        valid_cols = board.valid_columns(row)
+        if not valid_cols:
+            return valid_cols, []
+        stats = self.stats
+        if self.profile:
+            t0 = perf_counter()
+        if self.vectorized:
+            from queen8_batch import child_heuristics_batch  # NumPy is optional
+            h_children = child_heuristics_batch(board.queens, row, valid_cols).tolist()
+        else:
+            h_children = self.child_heuristics(board, row, valid_cols)
+        stats.heuristic_calls += len(valid_cols)
+        if self.profile:
+            stats.time_heuristic += perf_counter() - t0
+        return valid_cols, h_children
+
+    def _cached_children(self, board: Board, row: int) -> Tuple[List[int], List[int]]:
+        """_score_children() through the prefix cache. Entries are stored for
+        the canonical prefix; a mirrored hit maps columns back with c -> n-1-c
+        and reverses both lists, so columns stay ascending."""
+        n = self.n
+        prefix, mirrored = canonical_prefix(board.queens[:row], n)
+        key = (_CACHE_EXPAND, n, prefix)
+        entry = self.cache.get(key)
+        if entry is None:
+            canonical = Board.from_state(prefix, n) if mirrored else board
+            cols, h_children = self._score_children(canonical, row)
+            entry = (tuple(cols), tuple(h_children))
+            self.cache.put(key, entry)
+        cols, h_children = entry
+        if mirrored:
+            return [n - 1 - c for c in reversed(cols)], list(reversed(h_children))
+        return list(cols), list(h_children)
+
+    def _push_node(self, f: int, g: int, parent: int, col: int):
+        node = len(self.node_col)
+        self.node_parent.append(parent)
+        self.node_col.append(col)
+        span = self.n + 1
+        key = ((f * span + (span - 1 - g)) << NODE_ID_BITS) | node
+        open_list = self.open_list
+        heapq.heappush(open_list, key)
+        stats = self.stats
+        stats.nodes_generated += 1
+        if len(open_list) > stats.peak_frontier:
+            stats.peak_frontier = len(open_list)
+
+    def _unpack_key(self, key: int) -> Tuple[int, int]:
+        """(node id, g) of a heap key"""
+        span = self.n + 1
+        node = key & ((1 << NODE_ID_BITS) - 1)
+        g = span - 1 - (key >> NODE_ID_BITS) % span
+        return node, g
+
+    def _node_board(self, node: int, depth: int) -> Board:
+        """Rebuild a node's board by walking its parent chain"""
+        cols = [-1] * depth
+        parent, col = self.node_parent, self.node_col
+        for row in range(depth - 1, -1, -1):
+            cols[row] = col[node]
+            node = parent[node]
+        return Board.from_state(cols, self.n)
+
+    # ---------------- Beam search ---------------- #
+
+    def _beam_init(self):
+        """Beam search expands one depth at a time. `_beam` holds the nodes
+        of the current depth still to expand as (f, tie, board), best last;
+        children go into `_beam_next`, a heap of (-f, -tie, board) capped at
+        beam_width, so its top is the worst child and memory stays
+        O(width) boards. The heuristic rarely separates siblings, so ties
+        on f are broken at random (from `seed`, with a sequence number in
+        the low bits); ranked in generation order the beam would fill with
+        near-copies of its first few nodes."""
+        h0 = self.calculate_future_conflicts(self.board.queens, 0)
+        self.stats.heuristic_calls += 1
+        self._beam: List[Tuple[int, int, Board]] = [(h0, 0, self.board)]
+        self._beam_next: List[Tuple[int, int, Board]] = []
+        self._beam_depth = 0
+        self._beam_seq = 1
+        self._rng = random.Random(self.seed)
+
+    def _step_beam(self) -> StepEvent:
+        stats = self.stats
+        timed = self.profile
+        if timed:
+            t0 = perf_counter()
+        if not self._beam:
+            if not self._beam_next:
+                self.stuck = True
+                return StepEvent('exhausted', self.step_count)
+            # next depth: best first, ties in generation order
+            self._beam = sorted(((-nf, -ns, b) for nf, ns, b in self._beam_next),
+                                key=lambda node: (node[0], node[1]), reverse=True)
+            self._beam_next = []
+            self._beam_depth += 1
+        _, _, board = self._beam.pop()
+        row = self._beam_depth
+        self.board = board
+        self.current_row = row
+        frontier = len(self._beam) + len(self._beam_next)
+        if timed:
+            t1 = perf_counter()
+            stats.time_selection += t1 - t0
+
+        if row >= self.n and attacking_pairs(board.queens, self.n) == 0:
+            self.solved = True
+            return StepEvent('solved', self.step_count, row, frontier=frontier)
+
+        stats.nodes_expanded += 1
+        if timed:
+            h_before = stats.time_heuristic
+        if self.cache is None:
+            valid_cols, h_children = self._score_children(board, row)
+        else:
+            valid_cols, h_children = self._cached_children(board, row)
+        if not valid_cols:
+            stats.dead_ends += 1
+            if timed:
+                stats.time_expansion += perf_counter() - t1 - (stats.time_heuristic - h_before)
+            return StepEvent('dead_end', self.step_count, row, frontier=frontier)
+
+        best = None
+        g_child = row + 1
+        width, layer = self.beam_width, self._beam_next
+        rng = self._rng
+        for col, h_child in zip(valid_cols, h_children):
+            f_child = g_child + h_child
+            stats.nodes_generated += 1
+            if best is None or f_child < best[0]:
+                best = (f_child, col)
+            node = (-f_child, -((rng.getrandbits(30) << 32) | self._beam_seq), None)
+            self._beam_seq += 1
+            if len(layer) >= width:
+                if node[:2] <= layer[0][:2]:
+                    continue  # no better than the worst child kept
+                heapq.heappop(layer)
+            heapq.heappush(layer, (node[0], node[1], board.place(row, col)))
+        frontier = len(self._beam) + len(layer)
+        if frontier > stats.peak_frontier:
+            stats.peak_frontier = frontier
+
+        best_col = best[1]
+        self.board = board.place(row, best_col)
+        self.current_row = g_child
+        if timed:
+            stats.time_expansion += perf_counter() - t1 - (stats.time_heuristic - h_before)
+        return StepEvent('expand', self.step_count, row, best_col, frontier)
+
+    # ---------------- IDA* ---------------- #
+
+    def _ida_init(self):
+        """IDA* runs depth-first passes under a growing bound on f = g + h,
+        the same f as A*. Each pass keeps one frame per placed row: [cols,
+        diags, antis, next column to try, largest f on the path], so memory
+        is O(N) frames however long the search runs. A pass that runs out of
+        nodes raises the bound to the smallest f it cut off."""
+        self.queens = [-1] * self.n
+        self._ida_stack: List[List[int]] = []
+        self._ida_bound = -1           # bound of the current pass; -1 before the first
+        self._ida_prev_bound = -1      # paths within it were seen in an earlier pass
+        self._ida_next_bound = -1      # smallest f over the bound this pass, -1 = none
+        self._ida_h0 = 0
+        self._ida_found = 0
+
+    def _step_idastar(self) -> StepEvent:
+        """One IDA* step: place the next child within the bound, back out of
+        a row with no such child left, or start the next pass."""
+        stats = self.stats
+        timed = self.profile
+        stack = self._ida_stack
+        n = self.n
+        if not stack:
+            if self._ida_bound == -1:
+                self._ida_h0 = self.calculate_future_conflicts(self.queens, 0)
+                stats.heuristic_calls += 1
+                self._ida_bound = self._ida_h0
+            elif self._ida_next_bound == -1:
+                # the last pass cut nothing off: the whole tree has been seen
+                self.stuck = True
+                if self._ida_found:
+                    return StepEvent('exhausted', self.step_count)
+                return StepEvent('no_solution', self.step_count, info=n)
+            else:
+                self._ida_prev_bound = self._ida_bound
+                self._ida_bound = self._ida_next_bound
+            self._ida_next_bound = -1
+            stack.append([0, 0, 0, 0, self._ida_h0])
+            stats.nodes_expanded += 1
+            return StepEvent('deepen', self.step_count, info=self._ida_bound)
+
+        if timed:
+            t0 = perf_counter()
+        frame = stack[-1]
+        row = len(stack) - 1
+        cols, diags, antis, next_col, path_f = frame
+        board = Board(n, None, cols, diags, antis) if row < n else None
+        free = board.free_mask(row) >> next_col << next_col if board is not None else 0
+        bound = self._ida_bound
+        masks = None  # the parent's row masks, built once per step
+        while free:
+            low = free & -free
+            free ^= low
+            col = low.bit_length() - 1
+            if timed:
+                t_h = perf_counter()
+            if masks is None:
+                masks = self.row_masks(board, row)
+            f_child = row + 1 + self.child_heuristics(board, row, [col], masks)[0]
+            if timed:
+                stats.time_heuristic += perf_counter() - t_h
+            stats.nodes_generated += 1
+            stats.heuristic_calls += 1
+            if f_child > bound:
+                if self._ida_next_bound == -1 or f_child < self._ida_next_bound:
+                    self._ida_next_bound = f_child
+                continue
+            frame[3] = col + 1
+            self.queens[row] = col
+            if self._dirty is not None:
+                self._dirty.append(row)
+            stack.append([cols | low, diags | (1 << (col - row + n - 1)), antis | (1 << (row + col)),
+                          0, max(path_f, f_child)])
+            self.current_row = row + 1
+            stats.nodes_expanded += 1
+            if len(stack) - 1 > stats.peak_frontier:
+                stats.peak_frontier = len(stack) - 1
+            if timed:
+                stats.time_expansion += perf_counter() - t0
+            # a goal whose whole path fit an earlier bound was already reported
+            if row + 1 == n and max(path_f, f_child) > self._ida_prev_bound:
+                self._ida_found += 1
+                return self._finish(row, col)
+            return StepEvent('place', self.step_count, row, col)
+
+        stack.pop()
+        if row > 0:
+            self.queens[row - 1] = -1
+            if self._dirty is not None:
+                self._dirty.append(row - 1)
+        self.current_row = row - 1 if row > 0 else 0
+        stats.dead_ends += 1
+        if timed:
+            stats.time_expansion += perf_counter() - t0
+        return StepEvent('backtrack', self.step_count, row, frontier=len(stack))
+
+    # ---------------- Forward checking ---------------- #
+
+    def _fc_init(self):
+        """Forward checking keeps a bitset domain of still-possible columns
+        per row, narrowed after every placement. Each branching row has a
+        frame [row, untried columns, trail length]; the trail records (row,
+        previous domain) so pruning is undone on backtrack."""
+        self.queens = [-1] * self.n
+        self._domains = [(1 << self.n) - 1] * self.n
+        self._unplaced: Set[int] = set(range(self.n))
+        self._fc_stack: List[List[int]] = []
+        self._trail: List[Tuple[int, int]] = []
+        self._fc_descend = True  # next step opens a new row (else retries the top one)
+
+    def _fc_select(self) -> int:
+        """Unplaced row with the smallest domain (MRV), lowest row on ties"""
+        domains = self._domains
+        best_row, best_count = -1, self.n + 1
+        for r in sorted(self._unplaced):
+            count = _popcount(domains[r])
+            if count < best_count:
+                best_row, best_count = r, count
+                if count <= 1:
+                    break
+        self.stats.heuristic_calls += 1
+        return best_row
+
+    def _fc_place(self, row: int, col: int) -> int:
+        """Place a queen and prune the domains of every unplaced row. Returns
+        the lowest row whose domain became empty, or -1."""
+        self.queens[row] = col
+        if self._dirty is not None:
+            self._dirty.append(row)
+        self._unplaced.discard(row)
+        domains, trail = self._domains, self._trail
+        wiped = -1
+        for r in self._unplaced:
+            d = r - row if r > row else row - r
+            old = domains[r]
+            new = old & ~((1 << col) | (1 << (col + d)) | ((1 << (col - d)) if col >= d else 0))
+            if new != old:
+                trail.append((r, old))
+                domains[r] = new
+                if new == 0 and (wiped == -1 or r < wiped):
+                    wiped = r
+        return wiped
+
+    def _fc_undo(self, row: int, trail_len: int):
+        """Take back row's queen and restore domains pruned since trail_len"""
+        self.queens[row] = -1
+        if self._dirty is not None:
+            self._dirty.append(row)
+        self._unplaced.add(row)
+        domains, trail = self._domains, self._trail
+        while len(trail) > trail_len:
+            r, old = trail.pop()
+            domains[r] = old
+
+    def _step_forward(self) -> StepEvent:
+        """One forward-checking step: open the MRV row and place its first
+        column, try the next column of the current row after a wipe-out, or
+        back out of a row with no columns left."""
+        stats = self.stats
+        timed = self.profile
+        stack = self._fc_stack
+        if self._fc_descend:
+            if timed:
+                t0 = perf_counter()
+            row = self._fc_select()
+            stack.append([row, self._domains[row], len(self._trail)])
+            if len(stack) > stats.peak_frontier:
+                stats.peak_frontier = len(stack)
+            if timed:
+                stats.time_selection += perf_counter() - t0
+        if timed:
+            t0 = perf_counter()
+        if not stack:
+            self.stuck = True
+            return StepEvent('no_solution', self.step_count, info=self.n)
+        frame = stack[-1]
+        row, untried, trail_len = frame
+        if self.queens[row] != -1:
+            self._fc_undo(row, trail_len)
+        if not untried:
+            stack.pop()
+            self._fc_descend = False
+            stats.dead_ends += 1
+            if not stack:
+                self.stuck = True
+                return StepEvent('no_solution', self.step_count, info=self.n)
+            return StepEvent('backtrack', self.step_count, row, frontier=len(stack))
+        low = untried & -untried
+        frame[1] = untried ^ low
+        col = low.bit_length() - 1
+        wiped = self._fc_place(row, col)
+        self.current_row = row
+        stats.nodes_generated += 1
+        if timed:
+            stats.time_expansion += perf_counter() - t0
+        if wiped != -1:
+            # fail fast: some unplaced row has no column left
+            self._fc_descend = False
+            stats.dead_ends += 1
+            return StepEvent('dead_end', self.step_count, wiped, col, len(stack))
+        stats.nodes_expanded += 1
+        self._fc_descend = True
+        if not self._unplaced:
+            return self._finish(row, col)
+        return StepEvent('place', self.step_count, row, col)
+
+    # ---------------- Min-conflicts local search ---------------- #
+
+    def _mc_restart(self):
+        """Clear the board and shuffle the column permutation used for the
+        initial placement"""
+        self._mc_clear()
+        self._rng.shuffle(self._perm)
+
+    def _mc_clear(self):
+        """Empty board, counters and bookkeeping; the permutation is identity"""
+        n = self.n
+        self.queens: List[int] = [-1] * n
+        self._dirty_all = True
+        self._col_count = [0] * n
+        self._diag_count = [0] * (2 * n - 1)
+        self._anti_count = [0] * (2 * n - 1)
+        # Sum of the rows on each line: when a line holds exactly two queens,
+        # the other queen's row is the sum minus our own
+        self._col_rows = [0] * n
+        self._diag_rows = [0] * (2 * n - 1)
+        self._anti_rows = [0] * (2 * n - 1)
+        self._free_cols: Set[int] = set(range(n))
+        self._perm = list(range(n))
+        self._conflicted: List[int] = []
+        self._placed = 0  # rows filled by the initial placement so far
+        self._moves_since_restart = 0
+
+    def _mc_add(self, row: int, col: int):
+        self.queens[row] = col
+        if self._dirty is not None:
+            self._dirty.append(row)
+        d = col - row + self.n - 1
+        a = row + col
+        self._col_count[col] += 1
+        self._diag_count[d] += 1
+        self._anti_count[a] += 1
+        self._col_rows[col] += row
+        self._diag_rows[d] += row
+        self._anti_rows[a] += row
+        self._free_cols.discard(col)
+
+    def _mc_remove(self, row: int):
+        col = self.queens[row]
+        self.queens[row] = -1
+        if self._dirty is not None:
+            self._dirty.append(row)
+        d = col - row + self.n - 1
+        a = row + col
+        self._col_count[col] -= 1
+        self._diag_count[d] -= 1
+        self._anti_count[a] -= 1
+        self._col_rows[col] -= row
+        self._diag_rows[d] -= row
+        self._anti_rows[a] -= row
+        if self._col_count[col] == 0:
+            self._free_cols.add(col)
+
+    def _mc_conflicts(self, row: int, col: int) -> int:
+        """Queens attacking (row, col), not counting a queen already there"""
+        conflicts = (self._col_count[col] + self._diag_count[col - row + self.n - 1]
+                     + self._anti_count[row + col])
+        if self.queens[row] == col:
+            conflicts -= 3
+        return conflicts
+
+    def _mc_place_next(self) -> Tuple[int, int]:
+        """Initial placement of the next row: draw a few columns not yet used
+        in earlier rows and keep the one with the fewest diagonal conflicts.
+        Columns stay a permutation, so only diagonals can conflict."""
+        n = self.n
+        row = self._placed
+        perm = self._perm
+        diag_count = self._diag_count
+        anti_count = self._anti_count
+        rand = self._rng.random  # much cheaper than randrange in this hot loop
+        span = n - row
+        best_j, best_conf = row, None
+        for _ in range(MC_INIT_TRIES):
+            j = row + int(rand() * span)
+            col = perm[j]
+            conf = diag_count[col - row + n - 1] + anti_count[row + col]
+            if best_conf is None or conf < best_conf:
+                best_j, best_conf = j, conf
+                if conf == 0:
+                    break
+        perm[row], perm[best_j] = perm[best_j], perm[row]
+        col = perm[row]
+        self._mc_add(row, col)
+        self._placed += 1
+        self.current_row = row
+        if self._placed == n:
+            self._conflicted = self._mc_scan()
+        return row, col
+
+    def _mc_scan(self) -> List[int]:
+        """All rows whose queen is attacked, in random order (O(N))"""
+        rows = [r for r in range(self.n) if self._mc_conflicts(r, self.queens[r]) > 0]
+        self._rng.shuffle(rows)
+        return rows
+
+    def _mc_attackers(self, row: int) -> List[int]:
+        """Rows whose queens attack the queen in `row`. A line shared with a
+        single other queen is resolved in O(1) from the row sums; only lines
+        with three or more queens are walked."""
+        n = self.n
+        queens = self.queens
+        col = queens[row]
+        d = col - row + n - 1
+        a = row + col
+        rows = []
+        k = self._col_count[col]
+        if k == 2:
+            rows.append(self._col_rows[col] - row)
+        elif k > 2:
+            rows.extend(r for r, c in enumerate(queens) if c == col and r != row)
+        k = self._diag_count[d]
+        if k == 2:
+            rows.append(self._diag_rows[d] - row)
+        elif k > 2:
+            shift = col - row
+            rows.extend(r for r in range(max(0, -shift), min(n, n - shift))
+                        if r != row and queens[r] == r + shift)
+        k = self._anti_count[a]
+        if k == 2:
+            rows.append(self._anti_rows[a] - row)
+        elif k > 2:
+            rows.extend(r for r in range(max(0, a - n + 1), min(n, a + 1))
+                        if r != row and queens[r] == a - r)
+        return rows
+
+    def _mc_candidates(self, row: int) -> List[int]:
+        n = self.n
+        if n <= MC_FULL_SCAN:
+            return list(range(n))
+        rng = self._rng
+        cols = [rng.randrange(n) for _ in range(MC_SAMPLE)]
+        cols.append(self.queens[row])
+        free = self._free_cols
+        if len(free) <= MC_SAMPLE:
+            cols.extend(sorted(free))  # set order depends on history; keep runs reproducible
+        else:
+            cols.extend(rng.sample(sorted(free), MC_SAMPLE))
+        return cols
+
+    def _mc_repair(self) -> Optional[Tuple[int, int, int]]:
+        """Move one conflicted queen to its least conflicted column (random
+        tie-break). Returns (row, old_col, new_col), or None once no queen is
+        attacked. The conflicted list is maintained lazily: rows are picked
+        at random and re-checked, and a full rescan runs when it runs dry."""
+        conflicted = self._conflicted
+        rng = self._rng
+        stats = self.stats
+        timed = self.profile
+        if timed:
+            t0 = perf_counter()
+        while True:
+            if not conflicted:
+                conflicted.extend(self._mc_scan())
+                if not conflicted:
+                    return None
+            i = rng.randrange(len(conflicted))
+            conflicted[i], conflicted[-1] = conflicted[-1], conflicted[i]
+            row = conflicted.pop()
+            if self._mc_conflicts(row, self.queens[row]) > 0:
+                break
+        old_col = self.queens[row]
+        if timed:
+            t1 = perf_counter()
+            stats.time_selection += t1 - t0
+        best_cols: List[int] = []
+        best_conf = None
+        candidates = self._mc_candidates(row)
+        for col in candidates:
+            conf = self._mc_conflicts(row, col)
+            if best_conf is None or conf < best_conf:
+                best_cols, best_conf = [col], conf
+            elif conf == best_conf:
+                best_cols.append(col)
+        stats.nodes_generated += len(candidates)
+        stats.heuristic_calls += len(candidates)
+        if timed:
+            t2 = perf_counter()
+            stats.time_heuristic += t2 - t1
+        new_col = rng.choice(best_cols)
+        if new_col != old_col:
+            self._mc_remove(row)
+            self._mc_add(row, new_col)
+        if best_conf > 0:
+            # still attacked: this row and its attackers stay candidates
+            conflicted.append(row)
+            conflicted.extend(self._mc_attackers(row))
+        self._moves_since_restart += 1
+        stats.nodes_expanded += 1
+        if len(conflicted) > stats.peak_frontier:
+            stats.peak_frontier = len(conflicted)
+        if timed:
+            stats.time_expansion += perf_counter() - t2
+        return row, old_col, new_col
+
+    def _step_minconflicts(self) -> StepEvent:
+        if not _has_solution(self.n):
+            self.stuck = True
+            return StepEvent('no_solution', self.step_count, info=self.n)
+        if self.max_steps is not None and self.step_count > self.max_steps:
+            self.stuck = True
+            return StepEvent('budget', self.step_count, info=self.restarts)
+
+        if self._placed < self.n:
+            row, col = self._mc_place_next()
+            if self._placed < self.n:
+                return StepEvent('place', self.step_count, row, col)
+            if self._conflicted:
+                return StepEvent('placed_all', self.step_count, row, col, len(self._conflicted))
+
+        if self._moves_since_restart >= self.restart_after:
+            self.restarts += 1
+            self.stats.dead_ends += 1
+            self._mc_restart()
+            return StepEvent('restart', self.step_count, info=self.restarts)
+
+        move = self._mc_repair()
+        if move is None:
+            return self._finish()
+        row, old_col, new_col = move
+        self.current_row = row
+        return StepEvent('move', self.step_count, row, new_col, len(self._conflicted), old_col)
+
+    def solve(self) -> bool:
+        """Run the search to completion without building per-step messages
+        or events where the mode allows it (not when an on_step callback is
+        set, since it needs every event). Returns True if solved."""
+        if self.mode == 'deterministic' and self.on_step is None:
+            return self._solve_deterministic()
+        if self.mode != 'minconflicts' or self.on_step is not None:
+            for _ in self.steps():
+                pass
+            return self.solved
+
+        n = self.n
+        if self.solved or self.stuck or not _has_solution(n):
+            self.next_step()
+            return self.solved
+        while True:
+            if self.max_steps is not None and self.step_count >= self.max_steps:
+                break
+            self.step_count += 1
+            if self._placed < n:
+                self._mc_place_next()
+            elif self._moves_since_restart >= self.restart_after:
+                self.restarts += 1
+                self.stats.dead_ends += 1
+                self._mc_restart()
+            elif self._mc_repair() is None:
+                break
+        if self._placed == n and attacking_pairs(self.current_state, n) == 0:
+            self.solved = True
+        else:
+            self.stuck = True
+        return self.solved
+
     # Note: choose_best_column/backtrack removed in new modes. Kept get_valid_columns for constraint filtering.
     
+    def _solve_deterministic(self) -> bool:
+        """Place every remaining row at once, from the index or the closed
+        form, in O(N); counters end as if each row had been a step"""
+        n = self.n
+        if self.solved or self.stuck or not _has_solution(n) or self.current_row >= n:
+            for _ in self.steps():
+                pass
+            return self.solved
+        fixed = self._indexed_solution()
+        solution = fixed if fixed is not None else constructive_solution(n)
+        placed = n - self.current_row
+        self.board = Board.from_state(tuple(solution), n)
+        self._dirty_all = True
+        self.current_row = n
+        self._placements = None
+        self.step_count += placed
+        self.stats.nodes_generated += placed
+        self.stats.nodes_expanded += placed
+        self._finish()
+        return self.solved
+
+    def row_masks(self, board: Board, row: int) -> Tuple[List[int], List[int]]:
+        """Free-column masks and their popcounts for the rows below `row`,
+        the parent data child_heuristics() scores children against"""
+        free = [board.free_mask(r) for r in range(row + 1, self.n)]
+        return free, [_popcount(mask) for mask in free]
+
+    def child_heuristics(self, board: Board, row: int, cols: List[int],
+                         masks: Optional[Tuple[List[int], List[int]]] = None) -> List[int]:
+        """Heuristic of each child board.place(row, c) for c in cols, equal to
+        calculate_future_conflicts(child, row + 1). The parent's free columns
+        and availability counts for rows below are computed once (or passed
+        in as `masks` from row_masks()); each child then only checks the (up
+        to) three cells per row its queen attacks, O(N) per child.
+        Assumes every queen on `board` sits above `row`, as in A*."""
+        n = self.n
+        free, avail = masks if masks is not None else self.row_masks(board, row)
+        h_children = []
+        for col in cols:
+            conflicts = 0
+            for i, mask in enumerate(free):
+                diag_offset = i + 1
+                available = avail[i]
+                if mask >> col & 1:
+                    available -= 1
+                if col - diag_offset >= 0 and mask >> (col - diag_offset) & 1:
+                    available -= 1
+                if col + diag_offset < n and mask >> (col + diag_offset) & 1:
+                    available -= 1
+                if available == 0:
+                    conflicts += 10
+                else:
+                    conflicts += max(0, 1 - available)
+            h_children.append(conflicts)
+        return h_children
+
     def calculate_future_conflicts(self, state: Tuple[int, ...], from_row: int) -> int:
-        """Calculate potential future conflicts for remaining rows"""
+        """Calculate potential future conflicts for remaining rows.
+        Reference implementation: A* scores children with child_heuristics(),
+        which must agree with this function exactly."""
+        if self.cache is not None:
+            n = self.n
+            prefix, _ = canonical_prefix(state[:from_row], n)  # mirror-invariant
+            key = (_CACHE_H, n, prefix)
+            conflicts = self.cache.get(key)
+            if conflicts is None:
+                conflicts = self._future_conflicts(prefix, from_row)
+                self.cache.put(key, conflicts)
+            return conflicts
+        return self._future_conflicts(state, from_row)
+
+    def _future_conflicts(self, state: Tuple[int, ...], from_row: int) -> int:
         conflicts = 0
         placed_queens = [(r, state[r]) for r in range(from_row) if state[r] != -1]
         
         # For each remaining row, count how many columns are blocked
-        for row in range(from_row, BOARD_SIZE):
+        n = self.n
+        for row in range(from_row, n):
             blocked_cols = set()
             for r, c in placed_queens:
                 # Column conflict
                 blocked_cols.add(c)
                 # Diagonal conflicts
                 diag_offset = row - r
-                if 0 <= c - diag_offset < BOARD_SIZE:
+                if 0 <= c - diag_offset < n:
                     blocked_cols.add(c - diag_offset)
-                if 0 <= c + diag_offset < BOARD_SIZE:
+                if 0 <= c + diag_offset < n:
                     blocked_cols.add(c + diag_offset)
             
-            available = BOARD_SIZE - len(blocked_cols)
+            available = n - len(blocked_cols)
             if available == 0:
                 conflicts += 10  # Heavy penalty for impossible rows
             else:
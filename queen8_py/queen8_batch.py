@@ -0,0 +1,130 @@
+from typing import Sequence
+
+import numpy as np
+
+# ---------------------------- Batched scoring (NumPy) ---------------------------- #
+#
+# Vectorized versions of attacking_pairs() and calculate_future_conflicts()
+# that score many boards per call. Boards are rows of a (k, N) integer array
+# using the same encoding as `state`: column of the queen in each row, -1 if
+# empty.
+
+# Upper bound on index-array elements materialized per chunk of boards
+_CHUNK_ELEMENTS = 1 << 22
+
+
+def _as_states(states) -> np.ndarray:
+    arr = np.asarray(states, dtype=np.int64)
+    if arr.ndim != 2:
+        raise ValueError(f"states must be a 2-D (k, N) array, got shape {arr.shape}")
+    n = arr.shape[1]
+    if arr.size and (arr.min() < -1 or arr.max() >= n):
+        raise ValueError(f"columns must be in [-1, {n}), got values in [{arr.min()}, {arr.max()}]")
+    return arr
+
+
+def _line_pairs(line_index: np.ndarray, placed: np.ndarray, lines: int) -> np.ndarray:
+    """Per-board sum of h*(h-1)/2 over a histogram of line indices"""
+    k = line_index.shape[0]
+    flat = (np.arange(k)[:, None] * lines + line_index)[placed]
+    hist = np.bincount(flat, minlength=k * lines).reshape(k, lines)
+    return (hist * (hist - 1) // 2).sum(axis=1)
+
+
+def attacking_pairs_batch(states) -> np.ndarray:
+    """attacking_pairs() for every row of a (k, N) array, as a length-k array.
+    Uses per-board column and diagonal histograms: O(k * N) work in NumPy,
+    in chunks of boards so memory stays bounded for millions of boards."""
+    arr = _as_states(states)
+    k, n = arr.shape
+    if k == 0:
+        return np.zeros(0, dtype=np.int64)
+    rows = np.arange(n)[None, :]
+    per_board = 5 * n  # histogram bins: N columns + 2 x (2N - 1) diagonals
+    chunk = max(1, _CHUNK_ELEMENTS // per_board)
+
+    out = np.empty(k, dtype=np.int64)
+    for start in range(0, k, chunk):
+        block = arr[start:start + chunk]
+        placed = block != -1
+        cols = np.where(placed, block, 0)
+        pairs = _line_pairs(cols, placed, n)
+        pairs += _line_pairs(cols - rows + n - 1, placed, 2 * n - 1)
+        pairs += _line_pairs(cols + rows, placed, 2 * n - 1)
+        out[start:start + block.shape[0]] = pairs
+    return out
+
+
+def _row_penalty(available: np.ndarray) -> np.ndarray:
+    # same scoring as calculate_future_conflicts: 10 for an impossible row,
+    # max(0, 1 - available) otherwise
+    return np.where(available == 0, 10, np.maximum(0, 1 - available))
+
+
+def future_conflicts_batch(states, from_row: int) -> np.ndarray:
+    """calculate_future_conflicts(state, from_row) for every row of a (k, N)
+    array. Only queens in rows above `from_row` block cells, as in the
+    reference function."""
+    arr = _as_states(states)
+    k, n = arr.shape
+    remaining = n - from_row
+    if k == 0 or remaining <= 0:
+        return np.zeros(k, dtype=np.int64)
+
+    queen_rows = np.arange(from_row)
+    target_rows = np.arange(from_row, n)
+    offsets = target_rows[None, :] - queen_rows[:, None]           # (q, R)
+    per_board = max(1, 3 * from_row * remaining)
+    chunk = max(1, _CHUNK_ELEMENTS // per_board)
+
+    out = np.empty(k, dtype=np.int64)
+    for start in range(0, k, chunk):
+        block = arr[start:start + chunk, :from_row]                # (b, q)
+        b = block.shape[0]
+        blocked = np.zeros((b, remaining, n), dtype=bool)
+        placed = (block != -1)[:, :, None]                         # (b, q, 1)
+        board_idx = np.broadcast_to(np.arange(b)[:, None, None], (b, from_row, remaining))
+        row_idx = np.broadcast_to(np.arange(remaining)[None, None, :], (b, from_row, remaining))
+        for delta in (0, -1, 1):
+            cells = block[:, :, None] + delta * offsets[None, :, :]
+            ok = placed & (cells >= 0) & (cells < n)
+            blocked[board_idx[ok], row_idx[ok], cells[ok]] = True
+        available = n - blocked.sum(axis=2)
+        out[start:start + b] = _row_penalty(available).sum(axis=1)
+    return out
+
+
+def child_heuristics_batch(state: Sequence[int], row: int, cols: Sequence[int]) -> np.ndarray:
+    """Heuristic of every child of an A* node in one shot: the value of
+    calculate_future_conflicts(child, row + 1) where child places a queen at
+    (row, c) for each c in cols. The parent's blocked cells are built once;
+    each child only adds the three cells per later row its queen attacks."""
+    n = len(state)
+    cols_arr = np.asarray(cols, dtype=np.int64)
+    remaining = n - row - 1
+    if cols_arr.size == 0 or remaining <= 0:
+        return np.zeros(cols_arr.size, dtype=np.int64)
+
+    parent = np.asarray(state[:row], dtype=np.int64)
+    queen_rows = np.nonzero(parent != -1)[0]
+    queen_cols = parent[queen_rows]
+    target_rows = np.arange(row + 1, n)
+    blocked = np.zeros((remaining, n), dtype=bool)
+    offsets = target_rows[None, :] - queen_rows[:, None]           # (q, R)
+    row_idx = np.broadcast_to(np.arange(remaining)[None, :], offsets.shape)
+    for delta in (0, -1, 1):
+        cells = queen_cols[:, None] + delta * offsets
+        ok = (cells >= 0) & (cells < n)
+        blocked[row_idx[ok], cells[ok]] = True
+    available = n - blocked.sum(axis=1)                            # (R,)
+
+    distance = np.arange(1, remaining + 1)[None, :]                # (1, R)
+    newly = np.zeros((cols_arr.size, remaining), dtype=np.int64)
+    rows_b = np.broadcast_to(np.arange(remaining)[None, :], newly.shape)
+    for delta in (0, -1, 1):
+        cells = cols_arr[:, None] + delta * distance
+        ok = (cells >= 0) & (cells < n)
+        hit = np.zeros(newly.shape, dtype=bool)
+        hit[ok] = ~blocked[rows_b[ok], cells[ok]]
+        newly += hit
+    return _row_penalty(available[None, :] - newly).sum(axis=1)
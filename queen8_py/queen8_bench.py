@@ -0,0 +1,345 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+from queen8_algorithm import (BEAM_WIDTH, CACHE_SIZE, Board, PrefixCache, StepByStepAStar, _complete_dfs, attacking_pairs,
+                              constructive_placements, constructive_solution)
+from queen8_enumerate import count_solutions
+from queen8_index import load_index
+from queen8_trace import KEYFRAME_EVERY, Trace, record_trace
+
+# ---------------------------- Benchmarks ---------------------------- #
+
+def bench_frontier(sizes: List[int]) -> None:
+    """Expansions per second of an A* solve while the open list already holds
+    `size` extra nodes. The padding nodes carry a huge f, so they are never
+    popped and only make the frontier bigger."""
+    print(f"{'frontier':>10} {'steps':>8} {'seconds':>9} {'exp/s':>10}")
+    for size in sizes:
+        search = StepByStepAStar()
+        search.set_mode('astar')
+        for i in range(size):
+            search._push_node(10 ** 9, 0, 0, 0)
+
+        start = time.perf_counter()
+        done = False
+        while not done:
+            _, _, done = search.next_step()
+        elapsed = time.perf_counter() - start
+        rate = search.step_count / elapsed if elapsed > 0 else float('inf')
+        print(f"{size:>10} {search.step_count:>8} {elapsed:>9.3f} {rate:>10.0f}")
+
+
+def bench_minconflicts(sizes: List[int], seed: int) -> None:
+    """Wall time of a headless min-conflicts solve for each board size"""
+    print(f"{'N':>10} {'steps':>10} {'restarts':>9} {'seconds':>9} {'solved':>7}")
+    for n in sizes:
+        search = StepByStepAStar(n, seed=seed)
+        search.set_mode('minconflicts')
+        start = time.perf_counter()
+        solved = search.solve()
+        elapsed = time.perf_counter() - start
+        print(f"{n:>10} {search.step_count:>10} {search.restarts:>9} {elapsed:>9.2f} {str(solved):>7}")
+
+
+def bench_enumerate(n: int, workers: List[int]) -> None:
+    """All-solutions count for one N across different process-pool sizes"""
+    print(f"{'workers':>8} {'solutions':>10} {'seconds':>9} {'speedup':>8}")
+    base = None
+    for w in workers:
+        start = time.perf_counter()
+        total = count_solutions(n, workers=w)
+        elapsed = time.perf_counter() - start
+        if base is None:
+            base = elapsed
+        print(f"{w:>8} {total:>10} {elapsed:>9.2f} {base / elapsed:>7.2f}x")
+
+
+def bench_batch(n: int, boards: int, seed: int) -> None:
+    """Per-board attacking_pairs() versus one attacking_pairs_batch() call,
+    and per-node A* child scoring with and without NumPy"""
+    import numpy as np
+    from queen8_batch import attacking_pairs_batch, child_heuristics_batch
+
+    states = np.random.default_rng(seed).integers(0, n, (boards, n))
+    as_tuples = [tuple(s) for s in states.tolist()]
+    start = time.perf_counter()
+    loop = [attacking_pairs(s, n) for s in as_tuples]
+    t_loop = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = attacking_pairs_batch(states)
+    t_batch = time.perf_counter() - start
+    assert batch.tolist() == loop
+    print(f"attacking_pairs  N={n} boards={boards}: loop {t_loop:.3f}s  batch {t_batch:.3f}s")
+
+    rng = random.Random(seed)
+    for size in (16, 64, 256, 1024):
+        board = Board(size)
+        row = size // 2
+        for r in range(row):
+            cols = board.valid_columns(r)
+            board = board.place(r, rng.choice(cols) if cols else rng.randrange(size))
+        search = StepByStepAStar(size)
+        cols = list(range(size))
+        start = time.perf_counter()
+        search.child_heuristics(board, row, cols)
+        t_inc = time.perf_counter() - start
+        start = time.perf_counter()
+        child_heuristics_batch(board.queens, row, cols)
+        t_vec = time.perf_counter() - start
+        print(f"child scoring    N={size:<5} incremental {t_inc * 1000:8.2f} ms  numpy {t_vec * 1000:8.2f} ms")
+
+
+def bench_memory(sizes: List[int], modes: List[str], max_steps: int, beam_width: int) -> None:
+    """tracemalloc peak and node counts of a solve per mode and board size.
+    Runs are cut off after `max_steps` steps; 'no' marks a run that did not
+    finish with a solution."""
+    print(f"{'mode':>8} {'N':>4} {'solved':>6} {'steps':>8} {'expanded':>9} {'generated':>10} "
+          f"{'peak':>8} {'peak MiB':>9} {'seconds':>8}")
+    for mode in modes:
+        for n in sizes:
+            search = StepByStepAStar(n, seed=0, beam_width=beam_width)
+            search.set_mode(mode)
+            tracemalloc.start()
+            start = time.perf_counter()
+            for _ in search.steps():
+                if search.step_count >= max_steps:
+                    break
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            st = search.stats
+            solved = 'yes' if search.solved else 'no'
+            print(f"{mode:>8} {n:>4} {solved:>6} {search.step_count:>8} {st.nodes_expanded:>9} "
+                  f"{st.nodes_generated:>10} {st.peak_frontier:>8} {peak / 2 ** 20:>9.2f} {elapsed:>8.2f}")
+
+
+def bench_stats(sizes: List[int], mode: str) -> None:
+    """Search counters and phase timers of a solve per board size, and the
+    wall time with the timers off versus on"""
+    print(f"{'N':>4} {'expanded':>9} {'generated':>10} {'dead':>6} {'peak':>8} {'h calls':>9} "
+          f"{'select':>7} {'expand':>7} {'heur':>7} {'off s':>7} {'on s':>7}")
+    for n in sizes:
+        times = []
+        for profile in (False, True):
+            search = StepByStepAStar(n, seed=0, profile=profile)
+            search.set_mode(mode)
+            start = time.perf_counter()
+            search.solve()
+            times.append(time.perf_counter() - start)
+        st = search.stats
+        print(f"{n:>4} {st.nodes_expanded:>9} {st.nodes_generated:>10} {st.dead_ends:>6} "
+              f"{st.peak_frontier:>8} {st.heuristic_calls:>9} {st.time_selection:>7.3f} "
+              f"{st.time_expansion:>7.3f} {st.time_heuristic:>7.3f} {times[0]:>7.3f} {times[1]:>7.3f}")
+
+
+def bench_forward(sizes: List[int], astar_budget: int) -> None:
+    """Nodes and wall time of forward checking versus A* per board size. A*
+    is stopped after `astar_budget` steps; '-' marks a run that hit it."""
+    print(f"{'N':>4} {'fc gen':>8} {'fc exp':>8} {'fc dead':>8} {'fc s':>7} "
+          f"{'A* gen':>9} {'A* exp':>9} {'A* s':>7}")
+    for n in sizes:
+        row = []
+        for mode in ('forward', 'astar'):
+            search = StepByStepAStar(n)
+            search.set_mode(mode)
+            start = time.perf_counter()
+            solved = False
+            for event in search.steps():
+                if event.kind == 'solved':
+                    solved = True
+                if mode == 'astar' and search.step_count >= astar_budget:
+                    break
+            row.append((search.stats, time.perf_counter() - start, solved))
+        (fc, t_fc, _), (astar, t_astar, astar_solved) = row
+        mark = '' if astar_solved else '-'
+        print(f"{n:>4} {fc.nodes_generated:>8} {fc.nodes_expanded:>8} {fc.dead_ends:>8} {t_fc:>7.3f} "
+              f"{str(astar.nodes_generated) + mark:>9} {str(astar.nodes_expanded) + mark:>9} {t_astar:>7.2f}")
+
+
+def bench_cache(sizes: List[int], repeats: int, maxsize: int) -> None:
+    """A* solve time without a cache, with a fresh cache (mirror hits only)
+    and on repeated solves sharing one cache"""
+    print(f"{'N':>4} {'none s':>8} {'cold s':>8} {'warm s':>8} {'speedup':>8} {'hit rate':>9} {'evicted':>8}")
+    for n in sizes:
+        def solve(cache):
+            search = StepByStepAStar(n, cache=cache)
+            search.set_mode('astar')
+            start = time.perf_counter()
+            search.solve()
+            return time.perf_counter() - start
+
+        t_none = solve(None)
+        cache = PrefixCache(maxsize)
+        t_cold = solve(cache)
+        t_warm = sum(solve(cache) for _ in range(repeats)) / repeats
+        print(f"{n:>4} {t_none:>8.3f} {t_cold:>8.3f} {t_warm:>8.3f} {t_none / t_warm:>7.2f}x "
+              f"{cache.hit_rate:>9.1%} {cache.evictions:>8}")
+
+
+def bench_index(sizes: List[int], queries: int, seed: int) -> None:
+    """Prefix completion by solution-index lookup versus complete_board()'s
+    search with the index bypassed, on random valid half-filled prefixes"""
+    print(f"{'N':>4} {'solutions':>10} {'load ms':>8} {'index us':>9} {'search us':>10} {'agree':>6}")
+    rng = random.Random(seed)
+    for n in sizes:
+        start = time.perf_counter()
+        index = load_index(n)
+        t_load = time.perf_counter() - start
+        if index is None:
+            print(f"{n:>4} no index (python queen8_index.py build --max-n {n})")
+            continue
+        prefixes = []
+        while len(prefixes) < queries:
+            board = Board(n)
+            for r in range(n // 2):
+                cols = board.valid_columns(r)
+                if not cols:
+                    break
+                board = board.place(r, rng.choice(cols))
+            else:
+                prefixes.append(board.queens[:n // 2])
+        start = time.perf_counter()
+        found = [index.first(p) for p in prefixes]
+        t_index = time.perf_counter() - start
+        start = time.perf_counter()
+        searched = [_complete_dfs(p + (-1,) * (n - len(p)), n, 1 << 62, None)[0] for p in prefixes]
+        t_search = time.perf_counter() - start
+        agree = all((a is None) == (b is None) for a, b in zip(found, searched))
+        print(f"{n:>4} {len(index):>10} {t_load * 1000:>8.2f} {t_index / queries * 1e6:>9.1f} "
+              f"{t_search / queries * 1e6:>10.1f} {str(agree):>6}")
+
+
+def bench_construct(sizes: List[int]) -> None:
+    """Closed-form solution for large N: the bulk call, the per-row
+    generator, and the attacking_pairs() check of the bulk board"""
+    print(f"{'N':>10} {'bulk s':>8} {'generator s':>12} {'check s':>8} {'pairs':>6}")
+    for n in sizes:
+        start = time.perf_counter()
+        board = constructive_solution(n)
+        t_bulk = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in constructive_placements(n):
+            pass
+        t_gen = time.perf_counter() - start
+        start = time.perf_counter()
+        pairs = attacking_pairs(board, n)
+        t_check = time.perf_counter() - start
+        print(f"{n:>10} {t_bulk:>8.3f} {t_gen:>12.3f} {t_check:>8.3f} {pairs:>6}")
+
+
+def bench_trace(n: int, mode: str, steps: int, seeks: int, keyframe_every: int) -> None:
+    """Record a long run, then compare random trace seeks with re-solving
+    up to the same step"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "run.q8t")
+        search = StepByStepAStar(n, seed=0)
+        search.set_mode(mode)
+        start = time.perf_counter()
+        recorded = record_trace(search, path, keyframe_every, steps)
+        t_record = time.perf_counter() - start
+        size = os.path.getsize(path)
+        trace = Trace(path)
+        targets = random.Random(0).choices(range(recorded + 1), k=seeks)
+        start = time.perf_counter()
+        for t in targets:
+            trace.seek(t)
+        t_seek = (time.perf_counter() - start) / seeks
+        start = time.perf_counter()
+        for _ in trace.replay():
+            pass
+        t_replay = time.perf_counter() - start
+        trace.close()
+    print(f"N={n} {mode}: {recorded} steps, {size / 1e6:.2f} MB ({size / max(1, recorded):.1f} B/step), "
+          f"keyframe every {keyframe_every}")
+    print(f"  record        {t_record:8.2f} s")
+    print(f"  seek          {t_seek * 1000:8.3f} ms   (re-solving to a random step: ~{t_record / 2:.2f} s)")
+    print(f"  full replay   {t_replay:8.2f} s   ({recorded / max(t_replay, 1e-9) / 1e6:.2f} M steps/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="N-Queens search benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("frontier", help="A* expansions/sec as the frontier grows")
+    p.add_argument("--sizes", type=int, nargs="+", default=[0, 1000, 10000, 100000, 300000])
+
+    p = sub.add_parser("minconflicts", help="min-conflicts solve time for large N")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("enumerate", help="all-solutions count scaling across workers")
+    p.add_argument("--n", type=int, default=14)
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+
+    p = sub.add_parser("batch", help="NumPy batched scoring versus per-board calls")
+    p.add_argument("--n", type=int, default=64)
+    p.add_argument("--boards", type=int, default=100000)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("memory", help="tracemalloc peak and node counts per search mode")
+    p.add_argument("--sizes", type=int, nargs="+", default=[8, 10, 12, 16, 20])
+    p.add_argument("--modes", nargs="+", default=["astar", "beam", "idastar", "forward"],
+                   choices=["deterministic", "astar", "minconflicts", "forward", "beam", "idastar"])
+    p.add_argument("--max-steps", type=int, default=20000, help="step cap per run")
+    p.add_argument("--beam-width", type=int, default=BEAM_WIDTH)
+
+    p = sub.add_parser("stats", help="search counters and phase timers")
+    p.add_argument("--sizes", type=int, nargs="+", default=[8, 9, 10, 11])
+    p.add_argument("--mode", default="astar", choices=["deterministic", "astar", "minconflicts", "forward", "beam", "idastar"])
+
+    p = sub.add_parser("forward", help="forward checking with MRV versus A*")
+    p.add_argument("--sizes", type=int, nargs="+", default=[8, 10, 12, 14, 16, 20, 25, 30])
+    p.add_argument("--astar-budget", type=int, default=20000, help="A* step cap per size")
+
+    p = sub.add_parser("cache", help="A* solves with the symmetry-aware prefix cache")
+    p.add_argument("--sizes", type=int, nargs="+", default=[8, 9, 10, 11])
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--maxsize", type=int, default=CACHE_SIZE)
+
+    p = sub.add_parser("index", help="solution-index prefix lookups versus search")
+    p.add_argument("--sizes", type=int, nargs="+", default=[8, 10, 12, 14])
+    p.add_argument("--queries", type=int, default=1000)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("construct", help="closed-form solution for N in the millions")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000, 10000000])
+
+    p = sub.add_parser("trace", help="step-trace size, seek and replay versus re-solving")
+    p.add_argument("--n", type=int, default=14)
+    p.add_argument("--mode", default="idastar", choices=["deterministic", "astar", "minconflicts", "forward", "beam", "idastar"])
+    p.add_argument("--steps", type=int, default=2000000)
+    p.add_argument("--seeks", type=int, default=1000)
+    p.add_argument("--keyframe-every", type=int, default=KEYFRAME_EVERY)
+
+    args = parser.parse_args()
+    if args.bench == "frontier":
+        bench_frontier(args.sizes)
+    elif args.bench == "minconflicts":
+        bench_minconflicts(args.sizes, args.seed)
+    elif args.bench == "enumerate":
+        bench_enumerate(args.n, args.workers)
+    elif args.bench == "memory":
+        bench_memory(args.sizes, args.modes, args.max_steps, args.beam_width)
+    elif args.bench == "batch":
+        bench_batch(args.n, args.boards, args.seed)
+    elif args.bench == "stats":
+        bench_stats(args.sizes, args.mode)
+    elif args.bench == "forward":
+        bench_forward(args.sizes, args.astar_budget)
+    elif args.bench == "cache":
+        bench_cache(args.sizes, args.repeats, args.maxsize)
+    elif args.bench == "index":
+        bench_index(args.sizes, args.queries, args.seed)
+    elif args.bench == "construct":
+        bench_construct(args.sizes)
+    elif args.bench == "trace":
+        bench_trace(args.n, args.mode, args.steps, args.seeks, args.keyframe_every)
+
+
+if __name__ == "__main__":
+    main()
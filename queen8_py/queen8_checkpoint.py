@@ -0,0 +1,290 @@
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from typing import Dict
+
+from queen8_algorithm import MODES, Board, StepByStepAStar
+
+# ---------------------------- Checkpoint file format ---------------------------- #
+#
+# One fixed little-endian header, a section table, then raw array data.
+# Every section starts on an 8-byte boundary, so the frontier and node
+# arrays are copied straight out of a memory map with array.frombytes()
+# instead of being parsed element by element.
+#
+#   header    CHECKPOINT_MAGIC, version, mode, flags, configuration,
+#             step/restart counters and SearchStats
+#   table     (name, typecode, itemsize, count, offset) per section
+#   data      board  - displayed board (A* / deterministic)
+#             open   - A* heap keys, already in heap order
+#             parent - A* node_parent
+#             col    - A* node_col
+#             queens, perm, conflict - min-conflicts board and bookkeeping
+#             colc, diagc, antic, colr, diagr, antir - min-conflicts line
+#                      counts and row sums, stored so resuming a 1M-queen
+#                      board does not replay every placement
+#             rng    - Mersenne Twister state words (min-conflicts, beam)
+#             queens, fcrows, fcfree - forward-checking board, the row of
+#                      each search frame and its untried-column bitset
+#                      (ceil(N/8) bytes per frame); domains and the undo
+#                      trail are rebuilt by replaying the frames
+#             beam, beamkey, next, nextkey - beam layers: N columns and
+#                      (f, tie) per node; bmeta - depth, sequence number
+#             queens, idaframe, idameta - IDA* board, (next column, path f)
+#                      per frame and the bounds; frame masks are rebuilt
+#                      from the board
+
+CHECKPOINT_MAGIC = b'Q8CK'
+CHECKPOINT_VERSION = 2
+
+_HEADER = struct.Struct('<4sHBBqqqqqqqqqqqqqqqdddqdH')
+_SECTION = struct.Struct('<8scBqq')
+_ALIGN = 8
+
+# header flag bits
+(_SOLVED, _STUCK, _VECTORIZED, _PROFILE, _HAS_SEED, _HAS_BUDGET, _HAS_GAUSS,
+ _FC_DESCEND) = (1 << i for i in range(8))
+
+
+def _int_array(typecode: str, values) -> array:
+    arr = array(typecode, values)
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+def _native(arr: array) -> array:
+    """`arr` itself on little-endian hosts, a byteswapped copy otherwise"""
+    if sys.byteorder == 'little':
+        return arr
+    arr = array(arr.typecode, arr)
+    arr.byteswap()
+    return arr
+
+
+def _sections(search: StepByStepAStar) -> Dict[bytes, array]:
+    sections = {}
+    if search.mode == 'minconflicts':
+        sections[b'queens'] = _int_array('q', search.queens)
+        sections[b'perm'] = _int_array('q', search._perm)
+        sections[b'conflict'] = _int_array('q', search._conflicted)
+        # counts fit in 32 bits, row sums may not
+        for name, values in ((b'colc', search._col_count), (b'diagc', search._diag_count),
+                             (b'antic', search._anti_count)):
+            sections[name] = _int_array('i', values)
+        for name, values in ((b'colr', search._col_rows), (b'diagr', search._diag_rows),
+                             (b'antir', search._anti_rows)):
+            sections[name] = _int_array('q', values)
+        sections[b'rng'] = _int_array('Q', search._rng.getstate()[1])
+    elif search.mode == 'beam':
+        sections[b'board'] = _int_array('q', search.board.queens)
+        sections[b'beam'] = _int_array('q', [c for _, _, b in search._beam for c in b.queens])
+        sections[b'beamkey'] = _int_array('q', [v for f, tie, _ in search._beam for v in (f, tie)])
+        sections[b'next'] = _int_array('q', [c for _, _, b in search._beam_next for c in b.queens])
+        sections[b'nextkey'] = _int_array('q', [v for f, tie, _ in search._beam_next for v in (f, tie)])
+        sections[b'bmeta'] = _int_array('q', (search._beam_depth, search._beam_seq))
+        sections[b'rng'] = _int_array('Q', search._rng.getstate()[1])
+    elif search.mode == 'idastar':
+        sections[b'queens'] = _int_array('q', search.queens)
+        sections[b'idaframe'] = _int_array('q', [v for frame in search._ida_stack for v in frame[3:]])
+        sections[b'idameta'] = _int_array('q', (search._ida_bound, search._ida_prev_bound,
+                                                search._ida_next_bound, search._ida_h0, search._ida_found))
+    elif search.mode == 'forward':
+        width = (search.n + 7) // 8
+        sections[b'queens'] = _int_array('q', search.queens)
+        sections[b'fcrows'] = _int_array('q', [frame[0] for frame in search._fc_stack])
+        sections[b'fcfree'] = array('B', b''.join(frame[1].to_bytes(width, 'little')
+                                                     for frame in search._fc_stack))
+    else:
+        sections[b'board'] = _int_array('q', search.board.queens)
+    if search.mode == 'astar':
+        sections[b'open'] = _int_array('Q', search.open_list)
+        sections[b'parent'] = _native(search.node_parent)
+        sections[b'col'] = _native(search.node_col)
+    return sections
+
+
+def save_checkpoint(search: StepByStepAStar, path: str):
+    """Write the full search state of `search` to `path`. The file is
+    written next to `path` and renamed into place, so a crash mid-write
+    leaves the previous checkpoint intact. Callbacks and caches are not
+    saved."""
+    seed = search.seed
+    has_seed = isinstance(seed, int) and -(1 << 63) <= seed < (1 << 63)
+    flags = ((_SOLVED if search.solved else 0) | (_STUCK if search.stuck else 0)
+             | (_VECTORIZED if search.vectorized else 0) | (_PROFILE if search.profile else 0)
+             | (_HAS_SEED if has_seed else 0) | (_HAS_BUDGET if search.max_steps is not None else 0))
+    rng_version, gauss = 0, 0.0
+    restarts = placed = moves = 0
+    if search.mode in ('minconflicts', 'beam'):
+        rng_version, _, gauss_next = search._rng.getstate()
+        if gauss_next is not None:
+            flags |= _HAS_GAUSS
+            gauss = gauss_next
+    if search.mode == 'minconflicts':
+        restarts, placed, moves = search.restarts, search._placed, search._moves_since_restart
+    elif search.mode == 'forward' and search._fc_descend:
+        flags |= _FC_DESCEND
+
+    sections = _sections(search)
+    st = search.stats
+    header = _HEADER.pack(
+        CHECKPOINT_MAGIC, CHECKPOINT_VERSION, MODES.index(search.mode), flags,
+        search.n, search.step_count, search.current_row,
+        seed if has_seed else 0, search.max_steps if search.max_steps is not None else 0,
+        search.restart_after, search.beam_width, restarts, placed, moves,
+        st.nodes_generated, st.nodes_expanded, st.dead_ends, st.peak_frontier, st.heuristic_calls,
+        st.time_selection, st.time_expansion, st.time_heuristic,
+        rng_version, gauss, len(sections))
+
+    offset = _HEADER.size + _SECTION.size * len(sections)
+    table, layout = [], []
+    for name, arr in sections.items():
+        offset += -offset % _ALIGN
+        table.append(_SECTION.pack(name, arr.typecode.encode(), arr.itemsize, len(arr), offset))
+        layout.append((offset, arr))
+        offset += len(arr) * arr.itemsize
+
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        f.write(b''.join(table))
+        for start, arr in layout:
+            f.write(b'\0' * (start - f.tell()))
+            arr.tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _read_sections(buf: mmap.mmap, count: int) -> Dict[bytes, array]:
+    sections = {}
+    view = memoryview(buf)
+    try:
+        for i in range(count):
+            name, typecode, itemsize, length, offset = _SECTION.unpack_from(buf, _HEADER.size + i * _SECTION.size)
+            arr = array(typecode.decode())
+            if arr.itemsize != itemsize:
+                raise ValueError(f"checkpoint section {name.rstrip(bytes(1))!r} has {itemsize}-byte items, "
+                                 f"expected {arr.itemsize}")
+            end = offset + length * itemsize
+            if end > len(buf):
+                raise ValueError("checkpoint file is truncated")
+            arr.frombytes(view[offset:end])
+            if sys.byteorder != 'little':
+                arr.byteswap()
+            sections[name.rstrip(b'\0')] = arr
+    finally:
+        view.release()
+    return sections
+
+
+def _load_forward(search: StepByStepAStar, sections: Dict[bytes, array], descend: bool):
+    """Replay the saved frames in order: each one re-places its queen, which
+    prunes the domains and refills the trail exactly as the original run"""
+    search._fc_init()
+    width = (search.n + 7) // 8
+    queens = sections[b'queens']
+    untried = sections[b'fcfree'].tobytes()
+    for i, row in enumerate(sections[b'fcrows']):
+        frame = [row, int.from_bytes(untried[i * width:(i + 1) * width], 'little'), len(search._trail)]
+        search._fc_stack.append(frame)
+        if queens[row] != -1:
+            search._fc_place(row, queens[row])
+    search._fc_descend = descend
+
+
+def _load_beam(search: StepByStepAStar, sections: Dict[bytes, array]):
+    n = search.n
+    search._beam_depth, search._beam_seq = sections[b'bmeta']
+    search.board = Board.from_state(tuple(sections[b'board']), n)
+    for name, layer in ((b'beam', '_beam'), (b'next', '_beam_next')):
+        queens, keys = sections[name], sections[name + b'key']
+        # the heap and the sorted list keep their saved order, so no re-heapify
+        setattr(search, layer, [(keys[2 * i], keys[2 * i + 1], Board.from_state(tuple(queens[i * n:(i + 1) * n]), n))
+                                for i in range(len(keys) // 2)])
+
+
+def _load_idastar(search: StepByStepAStar, sections: Dict[bytes, array]):
+    n = search.n
+    queens = sections[b'queens'].tolist()
+    search.queens = queens
+    (search._ida_bound, search._ida_prev_bound, search._ida_next_bound,
+     search._ida_h0, search._ida_found) = sections[b'idameta']
+    frames = sections[b'idaframe']
+    stack = []
+    for depth in range(len(frames) // 2):
+        board = Board.from_state(tuple(queens[:depth]), n)
+        stack.append([board.cols, board.diags, board.antis, frames[2 * depth], frames[2 * depth + 1]])
+    search._ida_stack = stack
+
+
+def load_checkpoint(path: str) -> StepByStepAStar:
+    """Rebuild a StepByStepAStar from a save_checkpoint() file; stepping it
+    continues exactly where the saved engine stopped"""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if len(buf) < _HEADER.size:
+                raise ValueError(f"{path} is not a checkpoint file")
+            fields = _HEADER.unpack_from(buf, 0)
+            magic, version = fields[0], fields[1]
+            if magic != CHECKPOINT_MAGIC:
+                raise ValueError(f"{path} is not a checkpoint file")
+            if version != CHECKPOINT_VERSION:
+                raise ValueError(f"unsupported checkpoint version {version}")
+            sections = _read_sections(buf, fields[-1])
+
+    (_, _, mode_index, flags, n, step_count, current_row, seed, max_steps,
+     restart_after, beam_width, restarts, placed, moves, generated, expanded, dead_ends,
+     peak_frontier, heuristic_calls, t_select, t_expand, t_heur,
+     rng_version, gauss, _) = fields
+
+    search = StepByStepAStar(n, seed=seed if flags & _HAS_SEED else None,
+                             max_steps=max_steps if flags & _HAS_BUDGET else None,
+                             restart_after=restart_after, beam_width=beam_width,
+                             vectorized=bool(flags & _VECTORIZED), profile=bool(flags & _PROFILE))
+    search.mode = MODES[mode_index]
+    search.step_count = step_count
+    search.current_row = current_row
+    search.solved = bool(flags & _SOLVED)
+    search.stuck = bool(flags & _STUCK)
+
+    st = search.stats
+    st.nodes_generated, st.nodes_expanded, st.dead_ends = generated, expanded, dead_ends
+    st.peak_frontier, st.heuristic_calls = peak_frontier, heuristic_calls
+    st.time_selection, st.time_expansion, st.time_heuristic = t_select, t_expand, t_heur
+
+    if search.mode in ('minconflicts', 'beam'):
+        search._rng = random.Random()
+        search._rng.setstate((rng_version, tuple(sections[b'rng']),
+                              gauss if flags & _HAS_GAUSS else None))
+    if search.mode == 'minconflicts':
+        search.restarts = restarts
+        search.queens = sections[b'queens'].tolist()
+        search._col_count = sections[b'colc'].tolist()
+        search._diag_count = sections[b'diagc'].tolist()
+        search._anti_count = sections[b'antic'].tolist()
+        search._col_rows = sections[b'colr'].tolist()
+        search._diag_rows = sections[b'diagr'].tolist()
+        search._anti_rows = sections[b'antir'].tolist()
+        search._free_cols = {c for c, k in enumerate(search._col_count) if k == 0}
+        search._perm = sections[b'perm'].tolist()
+        search._conflicted = sections[b'conflict'].tolist()
+        search._placed = placed
+        search._moves_since_restart = moves
+    elif search.mode == 'forward':
+        _load_forward(search, sections, bool(flags & _FC_DESCEND))
+    elif search.mode == 'beam':
+        _load_beam(search, sections)
+    elif search.mode == 'idastar':
+        _load_idastar(search, sections)
+    else:
+        search.board = Board.from_state(tuple(sections[b'board']), n)
+    if search.mode == 'astar':
+        search.open_list = sections[b'open'].tolist()
+        search.node_parent = sections[b'parent']
+        search.node_col = sections[b'col']
+    return search
@@ -0,0 +1,101 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+# ---------------------------- All-solutions enumeration ---------------------------- #
+#
+# The search tree is split into independent subtrees by the queens in rows 0
+# and 1. By left-right mirror symmetry only the left half of row 0 is
+# searched (for odd N the middle column is searched with row 1 restricted to
+# its left half), and every subtree found stands for itself plus its mirror.
+
+def _subtrees(n: int) -> List[Tuple[int, int]]:
+    """(row 0 column, row 1 column) pairs covering one mirror half of the
+    search tree; row 1 is -1 when N == 1"""
+    if n == 1:
+        return [(0, -1)]
+    half = n // 2
+    tasks = []
+    for c0 in range(half + (n % 2)):
+        c1_limit = half if c0 == half else n  # middle column: mirror row 1 too
+        for c1 in range(c1_limit):
+            if abs(c1 - c0) > 1:
+                tasks.append((c0, c1))
+    return tasks
+
+
+def _search(n: int, c0: int, c1: int, collect: bool) -> Tuple[int, List[Tuple[int, ...]]]:
+    """Count (and optionally collect) the solutions with queens at (0, c0) and
+    (1, c1). Bitmask DFS: bit c of `cols` is column c, `left`/`right` hold the
+    diagonals projected onto the current row."""
+    full = (1 << n) - 1
+    placed = [c0] if c1 == -1 else [c0, c1]
+    cols = left = right = 0
+    for c in placed:
+        bit = 1 << c
+        cols |= bit
+        left = ((left | bit) << 1) & full
+        right = (right | bit) >> 1
+    solutions: List[Tuple[int, ...]] = []
+
+    def dfs(cols: int, left: int, right: int) -> int:
+        if cols == full:
+            if collect:
+                solutions.append(tuple(placed))
+            return 1
+        total = 0
+        avail = full & ~(cols | left | right)
+        while avail:
+            bit = avail & -avail
+            avail ^= bit
+            if collect:
+                placed.append(bit.bit_length() - 1)
+            total += dfs(cols | bit, ((left | bit) << 1) & full, (right | bit) >> 1)
+            if collect:
+                placed.pop()
+        return total
+
+    return dfs(cols, left, right), solutions
+
+
+def _count_task(args: Tuple[int, int, int]) -> int:
+    n, c0, c1 = args
+    return _search(n, c0, c1, False)[0]
+
+
+def _collect_task(args: Tuple[int, int, int]) -> List[Tuple[int, ...]]:
+    n, c0, c1 = args
+    return _search(n, c0, c1, True)[1]
+
+
+def _run(fn, n: int, workers: Optional[int]) -> list:
+    tasks = [(n, c0, c1) for c0, c1 in _subtrees(n)]
+    if workers == 1:
+        return [fn(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, tasks))
+
+
+def count_solutions(n: int, workers: Optional[int] = None) -> int:
+    """Number of N-Queens solutions, searched in parallel across `workers`
+    processes (None = one per CPU, 1 = in this process)"""
+    if n < 1:
+        raise ValueError(f"board size must be at least 1, got {n}")
+    if n == 1:
+        return 1
+    return 2 * sum(_run(_count_task, n, workers))
+
+
+def enumerate_solutions(n: int, workers: Optional[int] = None) -> List[Tuple[int, ...]]:
+    """Every N-Queens solution as a state tuple (state[r] = column of row r),
+    in lexicographic order"""
+    if n < 1:
+        raise ValueError(f"board size must be at least 1, got {n}")
+    if n == 1:
+        return [(0,)]
+    solutions = []
+    for part in _run(_collect_task, n, workers):
+        for sol in part:
+            solutions.append(sol)
+            solutions.append(tuple(n - 1 - c for c in sol))
+    solutions.sort()
+    return solutions
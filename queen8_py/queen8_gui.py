@@ -1,23 +1,106 @@
+import queue
+import threading
+import time
 import tkinter as tk
-from typing import Tuple
-from queen8_algorithm import StepByStepAStar, attacking_pairs, BOARD_SIZE
+from tkinter import filedialog
+from typing import Iterator, List, Optional, Tuple
+from queen8_algorithm import StepByStepAStar, StepEvent, attacking_pairs, BOARD_SIZE
+from queen8_trace import Trace
 
 # ---------------------------- GUI constants ---------------------------- #
-CELL = 60
-BOARD_W = BOARD_SIZE * CELL
-BOARD_H = BOARD_SIZE * CELL
+BOARD_PX = 480  # canvas size; cells shrink as N grows
+BOARD_SIZES = ("4", "5", "6", "8", "10", "12", "16", "32", "64", "200", "500", "1000")
 PADDING = 16
+FRAME_MS = 33  # redraw at most ~30 times a second however fast the search runs
+
+# Level of detail: up to LOD_GLYPH_MAX the board is one rectangle per square
+# with crown glyphs; beyond it the squares are one checkerboard image and
+# queens are plain rectangles; once a cell is under a pixel (N > BOARD_PX)
+# queens are single pixels in an image.
+LOD_GLYPH_MAX = 32
+SIDE_PANEL_ROWS = 32  # rows listed in the queen positions panel
+# Largest N where A* finishes in seconds; "Run simulation" from deterministic
+# mode uses min-conflicts above it
+ASTAR_MAX_N = 12
+COL_QUEEN = "#8B4513"
 
 COL_LIGHT = "#d4b896"  # light brown/tan
 COL_DARK = "#2f6f62"   # teal
 COL_MSG = "#a24e21"
 
+# ---------------------------- Search worker ---------------------------- #
+
+class Snapshot:
+    """Everything the GUI draws for one published search step"""
+
+    __slots__ = ('state', 'message', 'done', 'solved', 'steps', 'expanded', 'peak_frontier')
+
+    def __init__(self, search: StepByStepAStar, message: str, done: bool):
+        self.state = search.current_state
+        self.message = message
+        self.done = done
+        self.solved = search.solved
+        self.steps = search.step_count
+        self.expanded = search.stats.nodes_expanded
+        self.peak_frontier = search.stats.peak_frontier
+
+
+class SearchWorker(threading.Thread):
+    """Runs the engine off the Tk main loop and puts Snapshots on `frames`.
+    With a step delay (seconds) every step is published; at full speed
+    (delay 0) at most one snapshot per frame, plus the final one. The GUI
+    must not touch the engine until the worker has been stopped or is done."""
+
+    def __init__(self, search: StepByStepAStar, frames: queue.Queue, delay: float):
+        super().__init__(daemon=True)
+        self.search = search
+        self.frames = frames
+        self.delay = delay
+        self._halt = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    def run(self):
+        frame = FRAME_MS / 1000
+        last = 0.0
+        for event in self.search.steps():
+            if self._halt.is_set():
+                return
+            now = time.perf_counter()
+            if self.delay > 0 or event.done or now - last >= frame:
+                last = now
+                self.frames.put(Snapshot(self.search, event.message, event.done))
+            if event.done:
+                return
+            if self.delay > 0:
+                self._halt.wait(self.delay)
+            self._running.wait()
+            if self._halt.is_set():
+                return
+        # steps() yielded nothing: the search had already finished
+        self.frames.put(Snapshot(self.search, "Search finished.", True))
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def stop(self):
+        """Stop after the current step and wait for the thread to exit"""
+        self._halt.set()
+        self._running.set()
+        self.join()
+
 # ---------------------------- GUI ---------------------------- #
 
 class EightQueensGUI:
-    def __init__(self, root):
+    def __init__(self, root, n: int = BOARD_SIZE):
         self.root = root
-        root.title("8-Queens — Step-by-Step A* Search")
+        self.n = n
+        self.cell = BOARD_PX // n
+        self.board_key = None  # (n, cell) the persistent canvas items were built for
+        root.title("N-Queens — Step-by-Step A* Search")
         root.configure(bg="black")  # Light gray background
 
         # Layout frames
@@ -31,7 +114,7 @@ class EightQueensGUI:
         row_frame.grid(row=0, column=0, sticky="nw")
         
         # Board canvas
-        self.canvas = tk.Canvas(row_frame, width=BOARD_W, height=BOARD_H)
+        self.canvas = tk.Canvas(row_frame, width=BOARD_PX, height=BOARD_PX)
         self.canvas.grid(row=0, column=0, padx=(0, 12), sticky="nw")
 
         # Controls column (stacked vertically) - to the right of the board
@@ -41,35 +124,53 @@ class EightQueensGUI:
         # Mode selector
         tk.Label(ctrls, text="Mode:", font=("Arial", 10, "bold"), bg="black", fg="white").grid(row=0, column=0, sticky="we", pady=(0, 4))
         self.mode_var = tk.StringVar(value="deterministic")
-        self.mode_menu = tk.OptionMenu(ctrls, self.mode_var, "deterministic", "astar", command=lambda _: self.on_mode_change())
+        self.mode_menu = tk.OptionMenu(ctrls, self.mode_var, "deterministic", "astar", "minconflicts", "forward", "beam", "idastar", command=lambda _: self.on_mode_change())
         self.mode_menu.configure(font=("Arial", 10), highlightthickness=0)
         self.mode_menu.grid(row=1, column=0, sticky="we", pady=(0, 8))
 
+        # Board size selector
+        tk.Label(ctrls, text="Board size:", font=("Arial", 10, "bold"), bg="black", fg="white").grid(row=2, column=0, sticky="we", pady=(0, 4))
+        self.size_var = tk.StringVar(value=str(n))
+        self.size_menu = tk.OptionMenu(ctrls, self.size_var, *BOARD_SIZES, command=lambda _: self.on_size_change())
+        self.size_menu.configure(font=("Arial", 10), highlightthickness=0)
+        self.size_menu.grid(row=3, column=0, sticky="we", pady=(0, 8))
+
         # Buttons
         self.start_btn = tk.Button(ctrls, text="Start", command=self.start_search, bd=0, font=("Arial", 10, "bold"), bg="white", fg="black")
-        self.start_btn.grid(row=2, column=0, sticky="we", pady=(0, 6))
+        self.start_btn.grid(row=4, column=0, sticky="we", pady=(0, 6))
 
         self.run_btn = tk.Button(ctrls, text="Run simulation", command=self.run_simulation, bd=0, font=("Arial", 10, "bold"), bg="white", fg="black")
-        self.run_btn.grid(row=3, column=0, sticky="we", pady=(0, 6))
+        self.run_btn.grid(row=5, column=0, sticky="we", pady=(0, 6))
+
+        self.complete_btn = tk.Button(ctrls, text="Run to completion", command=self.run_to_completion, bd=0, font=("Arial", 10, "bold"), bg="white", fg="black")
+        self.complete_btn.grid(row=6, column=0, sticky="we", pady=(0, 6))
 
         self.pause_btn = tk.Button(ctrls, text="Pause", command=self.toggle_pause_resume, state="disabled", bd=0, font=("Arial", 10, "bold"), bg="white", fg="black")
-        self.pause_btn.grid(row=4, column=0, sticky="we", pady=(0, 6))
+        self.pause_btn.grid(row=7, column=0, sticky="we", pady=(0, 6))
 
         self.next_btn = tk.Button(ctrls, text="Next Step", command=self.next_step, bd=0, font=("Arial", 10, "bold"), state="disabled", bg="white", fg="black")
-        self.next_btn.grid(row=5, column=0, sticky="we", pady=(0, 6))
+        self.next_btn.grid(row=8, column=0, sticky="we", pady=(0, 6))
 
-        tk.Label(ctrls, text="Speed:", font=("Arial", 10, "bold"), bg="black", fg="white").grid(row=6, column=0, sticky="we", pady=(6, 4))
+        tk.Label(ctrls, text="Speed:", font=("Arial", 10, "bold"), bg="black", fg="white").grid(row=9, column=0, sticky="we", pady=(6, 4))
         self.speed_var = tk.StringVar(value="150")
         self.speed_menu = tk.OptionMenu(ctrls, self.speed_var, "400", "150", "50", command=lambda _: self.on_speed_change())
         self.speed_menu.configure(font=("Arial", 10), highlightthickness=0)
-        self.speed_menu.grid(row=7, column=0, sticky="we", pady=(0, 8))
+        self.speed_menu.grid(row=10, column=0, sticky="we", pady=(0, 8))
 
         self.restart_btn = tk.Button(ctrls, text="Restart", command=self.restart, bd=0, font=("Arial", 10, "bold"), bg="white", fg="black")
-        self.restart_btn.grid(row=8, column=0, sticky="we", pady=(0, 6))
+        self.restart_btn.grid(row=11, column=0, sticky="we", pady=(0, 6))
+
+        # Trace replay: open a recorded run and scrub through it
+        self.trace_btn = tk.Button(ctrls, text="Open trace...", command=self.open_trace, bd=0, font=("Arial", 10, "bold"), bg="white", fg="black")
+        self.trace_btn.grid(row=12, column=0, sticky="we", pady=(0, 6))
+        self.trace_scale = tk.Scale(ctrls, from_=0, to=0, orient="horizontal", showvalue=False, command=self.on_trace_scale,
+                                    bg="black", fg="white", highlightthickness=0, troughcolor="#f0f0f0")
+        self.trace_scale.grid(row=13, column=0, sticky="we", pady=(0, 6))
+        self.trace_scale.grid_remove()
 
         # Grouped Status Box
         status_box = tk.Frame(ctrls, bg="black")
-        status_box.grid(row=9, column=0, sticky="we", pady=(8, 0))
+        status_box.grid(row=14, column=0, sticky="we", pady=(8, 0))
 
         # Status message
         self.msg = tk.StringVar()
@@ -98,20 +199,23 @@ class EightQueensGUI:
 
         # Queens array panel
         tk.Label(self.left, text="Queen positions:", font=("Georgia", 12, "bold"), bg="black", fg="white").grid(row=0, column=0, sticky="w", pady=(0, 6))
-        self.qvars = [tk.StringVar() for _ in range(BOARD_SIZE)]
+        self.qvars = []
         self.qlabels = []
-        for r in range(BOARD_SIZE):
-            sv = self.qvars[r]
-            lbl = tk.Label(self.left, textvariable=sv, font=("Courier New", 12), bg="black", fg="white")
-            lbl.grid(row=r + 1, column=0, sticky="w")
-            self.qlabels.append(lbl)
+        self.build_side_panel()
 
         # Initialize A* search
-        self.astar_search = StepByStepAStar()
+        self.astar_search = StepByStepAStar(n)
         self.state = self.astar_search.current_state
         self.search_started = False
-        self.timer_id = None
+        self.frames: queue.Queue = queue.Queue()
+        self.worker: Optional[SearchWorker] = None
+        self.poll_id = None
         self.is_paused = False
+        self.trace: Optional[Trace] = None
+        self.trace_step = 0
+        self.trace_replay: Optional[Iterator[Tuple[StepEvent, List[int]]]] = None
+        self.trace_play_id = None
+        self.trace_full_speed = False
 
         self.draw_board()
         self.update_side_panel()
@@ -121,47 +225,160 @@ class EightQueensGUI:
         self.update_message("Click 'Start' to begin the A* search algorithm.")
 
     # ---------------- Drawing ---------------- #
+    def build_side_panel(self):
+        """(Re)create the position labels for the current board size; large
+        boards list their first SIDE_PANEL_ROWS rows"""
+        for lbl in self.qlabels:
+            lbl.destroy()
+        shown = min(self.n, SIDE_PANEL_ROWS)
+        self.qvars = [tk.StringVar() for _ in range(shown)]
+        self.qlabels = []
+        for r in range(shown):
+            sv = self.qvars[r]
+            lbl = tk.Label(self.left, textvariable=sv, font=("Courier New", 12), bg="black", fg="white")
+            lbl.grid(row=r + 1, column=0, sticky="w")
+            self.qlabels.append(lbl)
+        if self.n > shown:
+            lbl = tk.Label(self.left, text=f"... {self.n - shown} more rows", font=("Courier New", 12), bg="black", fg="white")
+            lbl.grid(row=shown + 1, column=0, sticky="w")
+            self.qlabels.append(lbl)
+
+    def lod(self) -> str:
+        """Level of detail for the current board size: glyph, block or pixel"""
+        if self.n <= LOD_GLYPH_MAX:
+            return "glyph"
+        if self.cell >= 1:
+            return "block"
+        return "pixel"
+
+    def row_span(self, r: int) -> Tuple[int, int]:
+        """Top and bottom y of row r on the canvas"""
+        if self.cell >= 1:
+            return r * self.cell, (r + 1) * self.cell
+        y = r * BOARD_PX // self.n
+        return y, y + 1
+
+    def build_board(self):
+        """Create the persistent canvas items for the current board size: the
+        squares (or a board image) and a hidden row highlight. Queens are
+        added later by draw_board()."""
+        canvas = self.canvas
+        canvas.delete("all")
+        n, cell = self.n, self.cell
+        self.board_key = (n, cell)
+        self.queen_items = {}      # row -> canvas item ids of its queen
+        self.drawn = [-1] * n      # column currently drawn in each row
+        self.board_image = None    # keep a reference or Tk drops the image
+        lod = self.lod()
+        if lod == "glyph":
+            for r in range(n):
+                for c in range(n):
+                    x0, y0 = c * cell, r * cell
+                    x1, y1 = x0 + cell, y0 + cell
+                    fill = COL_LIGHT if (r + c) % 2 == 0 else COL_DARK
+                    canvas.create_rectangle(x0, y0, x1, y1, fill=fill, width=0)
+        elif lod == "block":
+            # one pixel per square, then scaled up to the cell size
+            image = tk.PhotoImage(width=n, height=n)
+            rows = []
+            for r in range(n):
+                rows.append("{" + " ".join(COL_LIGHT if (r + c) % 2 == 0 else COL_DARK for c in range(n)) + "}")
+            image.put(" ".join(rows))
+            self.board_image = image.zoom(cell)
+            canvas.create_image(0, 0, image=self.board_image, anchor="nw")
+        else:
+            self.board_image = tk.PhotoImage(width=BOARD_PX, height=BOARD_PX)
+            self.board_image.put(COL_LIGHT, to=(0, 0, BOARD_PX, BOARD_PX))
+            self.pixel_queens = {}  # (x, y) -> queens drawn on that pixel
+            canvas.create_image(0, 0, image=self.board_image, anchor="nw")
+        self.border_width = max(1, min(4, cell // 4)) if cell >= 1 else 1
+        self.highlight_id = canvas.create_rectangle(0, 0, 0, 0, fill="", outline="red", width=self.border_width,
+                                                    state="hidden", tags="highlight")
+
     def draw_board(self):
-        self.canvas.delete("all")
-        # squares
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                x0, y0 = c * CELL, r * CELL
-                x1, y1 = x0 + CELL, y0 + CELL
-                fill = COL_LIGHT if (r + c) % 2 == 0 else COL_DARK
-                self.canvas.create_rectangle(x0, y0, x1, y1, fill=fill, width=0)
-        
-        # queens (draw first)
-        for r in range(BOARD_SIZE):
-            c = self.state[r]
-            if c == -1:
+        """Bring the canvas in line with self.state. The squares are built
+        once per board size; only queens in rows that changed since the last
+        draw are moved, added or removed, and the highlight is moved."""
+        if self.board_key != (self.n, self.cell):
+            self.build_board()
+        pixel = self.lod() == "pixel"
+        drawn = self.drawn
+        for r, c in enumerate(self.state):
+            old = drawn[r]
+            if c == old:
                 continue
-            self.draw_queen(r, c)
-        
-        # Highlight the row where the most recent queen was placed - draw after queens
-        if (self.search_started and not self.astar_search.solved):
-            # Find the highest row with a placed queen (most recently placed)
-            last_placed_row = -1
-            for r in range(BOARD_SIZE):
-                if self.state[r] != -1:
-                    last_placed_row = r
-            
-            # Highlight the row with the most recent queen placement
-            if last_placed_row >= 0:
-                y0 = last_placed_row * CELL
-                # Create border highlight with padding to prevent clipping
-                border_width = 4
-                padding = border_width // 2
-                self.canvas.create_rectangle(padding, y0 + padding, BOARD_W - padding, y0 + CELL - padding, fill="", outline="red", width=border_width, tags="highlight")
-                
+            if old != -1 and (c == -1 or pixel):
+                self.erase_queen(r, old)
+            if c != -1:
+                self.draw_queen(r, c)
+            drawn[r] = c
+
+        # Highlight the row where the most recent queen was placed - drawn above queens
+        last_placed_row = self.last_placed_row()
+        if self.search_started and not self.astar_search.solved and last_placed_row >= 0:
+            y0, y1 = self.row_span(last_placed_row)
+            board_w = self.n * self.cell if self.cell >= 1 else BOARD_PX
+            # inset by half the border width to prevent clipping
+            padding = self.border_width // 2
+            self.canvas.coords(self.highlight_id, padding, y0 + padding, board_w - padding, y1 - padding)
+            self.canvas.itemconfigure(self.highlight_id, state="normal")
+            self.canvas.tag_raise(self.highlight_id)
+        else:
+            self.canvas.itemconfigure(self.highlight_id, state="hidden")
 
     def draw_queen(self, r: int, c: int):
-        x = c * CELL + CELL // 2
-        y = r * CELL + CELL // 2
+        """Draw row r's queen at column c, moving its items if it has some"""
+        lod = self.lod()
+        if lod == "pixel":
+            x, y = c * BOARD_PX // self.n, r * BOARD_PX // self.n
+            count = self.pixel_queens.get((x, y), 0)
+            if count == 0:
+                self.board_image.put(COL_QUEEN, to=(x, y, x + 1, y + 1))
+            self.pixel_queens[(x, y)] = count + 1
+            return
+        cell = self.cell
+        items = self.queen_items.get(r)
+        if lod == "block":
+            x0, y0 = c * cell, r * cell
+            if items:
+                self.canvas.coords(items[0], x0, y0, x0 + cell, y0 + cell)
+            else:
+                self.queen_items[r] = (self.canvas.create_rectangle(x0, y0, x0 + cell, y0 + cell, fill=COL_QUEEN, width=0),)
+            return
+        x = c * cell + cell // 2
+        y = r * cell + cell // 2
+        radius = int(cell * 0.3)
+        if items:
+            oval, text = items
+            self.canvas.coords(oval, x - radius, y - radius, x + radius, y + radius)
+            self.canvas.coords(text, x, y)
+            return
         # Add white background circle for better visibility on highlights
-        self.canvas.create_oval(x - 18, y - 18, x + 18, y + 18, fill="white", outline="#8B4513", width=2)
+        oval = self.canvas.create_oval(x - radius, y - radius, x + radius, y + radius, fill="white", outline=COL_QUEEN, width=2)
         # Draw queen crown symbol
-        self.canvas.create_text(x, y, text="♛", font=("Segoe UI Symbol", int(CELL * 0.7)), fill="#8B4513")
+        text = self.canvas.create_text(x, y, text="♛", font=("Segoe UI Symbol", int(cell * 0.7)), fill=COL_QUEEN)
+        self.queen_items[r] = (oval, text)
+
+    def erase_queen(self, r: int, c: int):
+        """Remove row r's queen, drawn at column c"""
+        if self.lod() == "pixel":
+            x, y = c * BOARD_PX // self.n, r * BOARD_PX // self.n
+            count = self.pixel_queens.get((x, y), 0) - 1
+            if count <= 0:
+                self.pixel_queens.pop((x, y), None)
+                self.board_image.put(COL_LIGHT, to=(x, y, x + 1, y + 1))
+            else:
+                self.pixel_queens[(x, y)] = count
+            return
+        for item in self.queen_items.pop(r, ()):
+            self.canvas.delete(item)
+
+    def last_placed_row(self) -> int:
+        """Highest row with a placed queen (the most recently placed), or -1"""
+        for r in range(self.n - 1, -1, -1):
+            if self.state[r] != -1:
+                return r
+        return -1
 
     # ---------------- Interaction ---------------- #
     def start_search(self):
@@ -171,6 +388,7 @@ class EightQueensGUI:
         self.next_btn.config(state="normal")
         # disable mode switching during run
         self.mode_menu.config(state="disabled")
+        self.size_menu.config(state="disabled")
         
         # Immediately perform the first step to place the first queen
         new_state, message, is_complete = self.astar_search.next_step()
@@ -190,9 +408,13 @@ class EightQueensGUI:
                 self.next_btn.config(state="disabled")
                 self.update_message("Search failed - no solution found.")
             self.mode_menu.config(state="normal")
+            self.size_menu.config(state="normal")
     
     def next_step(self):
         """Perform the next step of A* search"""
+        if self.trace is not None:
+            self.show_trace_step(min(self.trace_step + 1, len(self.trace)))
+            return
         new_state, message, is_complete = self.astar_search.next_step()
         self.state = new_state
         
@@ -210,18 +432,25 @@ class EightQueensGUI:
                 self.next_btn.config(state="disabled")
                 self.update_message("Search failed - no solution found.")
             self.mode_menu.config(state="normal")
+            self.size_menu.config(state="normal")
 
     def restart(self):
         """Reset the search to start over"""
-        self.stop_timer()
+        if self.trace is not None:
+            self.stop_trace()
+            self.show_trace_step(0)
+            return
+        self.stop_worker()
         self.astar_search.reset()
         self.state = self.astar_search.current_state
         self.search_started = False
         self.start_btn.config(state="normal")
         self.next_btn.config(state="disabled")
         self.run_btn.config(state="normal", text="Run simulation")
+        self.complete_btn.config(state="normal")
         self.pause_btn.config(state="disabled", text="Pause")
         self.mode_menu.config(state="normal")
+        self.size_menu.config(state="normal")
         self.update_side_panel()
         self.update_placed_display()
         self.update_step_display()
@@ -237,128 +466,327 @@ class EightQueensGUI:
             return 150
 
     def on_speed_change(self):
-        if self.timer_id is not None and not self.is_paused:
-            self.stop_timer()
-            self.start_timer()
-
-    def start_timer(self):
-        delay = self.get_delay_ms()
-        self.timer_id = self.root.after(delay, self.tick_sim)
-
-    def stop_timer(self):
-        if self.timer_id is not None:
-            self.root.after_cancel(self.timer_id)
-            self.timer_id = None
-
-    def tick_sim(self):
-        new_state, message, is_complete = self.astar_search.next_step()
-        self.state = new_state
+        if self.worker is not None and self.worker.delay > 0:
+            self.worker.delay = self.get_delay_ms() / 1000
+
+    def start_worker(self, delay: float):
+        """Run the search in a SearchWorker and start polling its frames"""
+        self.stop_worker()
+        self.worker = SearchWorker(self.astar_search, self.frames, delay)
+        self.worker.start()
+        self.poll_id = self.root.after(FRAME_MS, self.poll_frames)
+
+    def stop_worker(self):
+        if self.poll_id is not None:
+            self.root.after_cancel(self.poll_id)
+            self.poll_id = None
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+        # discard frames of the stopped run
+        while True:
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                break
+
+    def poll_frames(self):
+        """Drain the frame queue and draw only the latest snapshot"""
+        self.poll_id = None
+        latest = None
+        while True:
+            try:
+                latest = self.frames.get_nowait()
+            except queue.Empty:
+                break
+        if latest is not None:
+            self.show_snapshot(latest)
+            if latest.done:
+                self.worker = None
+                self.finish_run()
+                return
+        self.poll_id = self.root.after(FRAME_MS, self.poll_frames)
+
+    def show_snapshot(self, snap: Snapshot):
+        self.state = snap.state
         self.update_side_panel()
         self.update_placed_display()
-        self.update_step_display()
+        self.step_var.set(self.step_text(snap.steps, snap.expanded, snap.peak_frontier))
         self.draw_board()
-        self.update_message(message)
+        self.update_message(snap.message)
 
-        if is_complete:
-            self.stop_timer()
-            self.next_btn.config(state="disabled")
-            self.run_btn.config(state="normal", text="Run simulation")
-            self.mode_menu.config(state="normal")
-            self.pause_btn.config(state="disabled", text="Pause")
-            # finalize message clarity
-            if self.astar_search.solved:
-                self.update_message("Solution found! All queens placed without conflicts.")
-            else:
-                self.update_message("Search failed - no solution found.")
+    def finish_run(self):
+        self.next_btn.config(state="disabled")
+        self.run_btn.config(state="normal", text="Run simulation")
+        self.complete_btn.config(state="normal")
+        self.mode_menu.config(state="normal")
+        self.size_menu.config(state="normal")
+        self.pause_btn.config(state="disabled", text="Pause")
+        # finalize message clarity
+        if self.astar_search.solved:
+            self.update_message("Solution found! All queens placed without conflicts.")
         else:
-            # schedule next tick if not paused
-            if not self.is_paused:
-                self.start_timer()
-
-    def run_simulation(self):
-        # ensure A* frontier mode
-        if self.mode_var.get() != "astar":
-            self.mode_var.set("astar")
+            self.update_message("Search failed - no solution found.")
+
+    def run_simulation(self, full_speed: bool = False):
+        if self.trace is not None:
+            self.play_trace(full_speed)
+            return
+        # ensure a searching mode (deterministic runs switch to A* frontier,
+        # or to min-conflicts on boards too large for A* to finish)
+        if self.mode_var.get() == "deterministic":
+            self.mode_var.set("astar" if self.n <= ASTAR_MAX_N else "minconflicts")
             self.on_mode_change()
         else:
             if not self.search_started:
-                self.astar_search.set_mode("astar")
+                self.astar_search.set_mode(self.mode_var.get())
                 self.state = self.astar_search.current_state
 
         self.search_started = True
         self.start_btn.config(state="disabled")
         self.next_btn.config(state="disabled")
         self.run_btn.config(state="disabled", text="Running...")
+        self.complete_btn.config(state="disabled")
         self.mode_menu.config(state="disabled")
+        self.size_menu.config(state="disabled")
         self.pause_btn.config(state="normal", text="Pause")
         self.is_paused = False
-        self.stop_timer()
-        self.start_timer()
+        if full_speed:
+            self.update_message("Solving at full speed...")
+        self.start_worker(0.0 if full_speed else self.get_delay_ms() / 1000)
+
+    def run_to_completion(self):
+        """Solve without a step delay; the board refreshes at the frame rate
+        and shows the result when the search ends"""
+        self.run_simulation(full_speed=True)
 
     def toggle_pause_resume(self):
-        if self.pause_btn["state"] == "disabled":
+        if self.trace is not None and self.trace_replay is not None:
+            self.toggle_trace_pause()
+            return
+        if self.pause_btn["state"] == "disabled" or self.worker is None:
             return
         if self.is_paused:
             # resume
             self.is_paused = False
             self.pause_btn.config(text="Pause")
-            self.start_timer()
+            self.worker.resume()
         else:
             # pause
             self.is_paused = True
             self.pause_btn.config(text="Resume")
-            self.stop_timer()
+            self.worker.pause()
+
+    # ---------------- Trace replay ---------------- #
+    def open_trace(self):
+        """Load a recorded trace (queen8_trace.py record) and show its first
+        step. The board, mode and size follow the trace; the step buttons
+        and the slider then move through the recording instead of a search."""
+        path = filedialog.askopenfilename(title="Open step trace", filetypes=[("Step traces", "*.q8t"), ("All files", "*")])
+        if not path:
+            return
+        try:
+            trace = Trace(path)
+        except (OSError, ValueError) as e:
+            self.update_message(f"Cannot open trace: {e}")
+            return
+        self.stop_worker()
+        self.close_trace()
+        self.trace = trace
+        if trace.n != self.n:
+            self.n = trace.n
+            self.cell = BOARD_PX // trace.n
+            self.size_var.set(str(trace.n))
+            self.build_side_panel()
+        self.mode_var.set(trace.mode)
+        self.astar_search = StepByStepAStar(trace.n)
+        self.astar_search.set_mode(trace.mode)
+        self.search_started = True
+        self.start_btn.config(state="disabled")
+        self.next_btn.config(state="normal")
+        self.run_btn.config(state="normal", text="Play trace")
+        self.complete_btn.config(state="normal")
+        self.pause_btn.config(state="disabled", text="Pause")
+        self.trace_scale.config(to=len(trace))
+        self.trace_scale.grid()
+        self.update_mode_indicator()
+        self.show_trace_step(0)
+
+    def close_trace(self):
+        """Leave replay and go back to live search"""
+        if self.trace is None:
+            return
+        self.stop_trace()
+        self.trace.close()
+        self.trace = None
+        self.trace_scale.grid_remove()
+        self.run_btn.config(state="normal", text="Run simulation")
+
+    def show_trace_step(self, step: int):
+        """Seek the trace to `step` (keyframe bisection) and draw it"""
+        state, event = self.trace.seek(step)
+        self.show_trace_state(step, state, event)
+
+    def show_trace_state(self, step: int, state: Tuple[int, ...], event: Optional[StepEvent]):
+        self.trace_step = step
+        self.state = state
+        self.trace_scale.set(step)
+        self.update_side_panel()
+        self.update_placed_display()
+        text = f"Trace step: {step}/{len(self.trace)}"
+        if event is not None and self.trace.mode != "deterministic":
+            text += f"  |  Frontier: {event.frontier}"
+        self.step_var.set(text)
+        self.draw_board()
+        if event is None:
+            self.update_message(f"Trace of {len(self.trace)} steps loaded. Play it or drag the slider.")
+        else:
+            self.update_message(event.message)
+        self.next_btn.config(state="normal" if step < len(self.trace) else "disabled")
+
+    def on_trace_scale(self, value: str):
+        step = int(float(value))
+        if self.trace is not None and step != self.trace_step:
+            playing = self.trace_replay is not None and not self.is_paused
+            self.stop_trace()
+            self.show_trace_step(step)
+            if playing:
+                self.play_trace(self.trace_full_speed)
+
+    def play_trace(self, full_speed: bool = False):
+        """Play the trace from the current step: one step per speed-menu
+        delay, or at full speed as many steps as fit in a frame"""
+        self.stop_trace()
+        if self.trace_step >= len(self.trace):
+            self.show_trace_step(0)
+        self.trace_full_speed = full_speed
+        self.trace_replay = self.trace.replay(self.trace_step)
+        self.is_paused = False
+        self.run_btn.config(state="disabled", text="Playing...")
+        self.complete_btn.config(state="disabled")
+        self.next_btn.config(state="disabled")
+        self.pause_btn.config(state="normal", text="Pause")
+        self.trace_play_id = self.root.after(0, self.trace_tick)
+
+    def trace_tick(self):
+        self.trace_play_id = None
+        deadline = time.perf_counter() + (FRAME_MS / 1000 if self.trace_full_speed else 0)
+        event = state = None
+        for event, state in self.trace_replay:
+            if time.perf_counter() >= deadline:
+                break
+        if event is not None:
+            self.show_trace_state(event.step, tuple(state), event)
+        if event is None or event.step >= len(self.trace):
+            self.stop_trace()
+            return
+        delay = FRAME_MS if self.trace_full_speed else self.get_delay_ms()
+        self.trace_play_id = self.root.after(delay, self.trace_tick)
+
+    def toggle_trace_pause(self):
+        if self.is_paused:
+            self.is_paused = False
+            self.pause_btn.config(text="Pause")
+            self.trace_play_id = self.root.after(0, self.trace_tick)
+        else:
+            self.is_paused = True
+            self.pause_btn.config(text="Resume")
+            if self.trace_play_id is not None:
+                self.root.after_cancel(self.trace_play_id)
+                self.trace_play_id = None
+
+    def stop_trace(self):
+        """Stop playback, keeping the current step"""
+        if self.trace_play_id is not None:
+            self.root.after_cancel(self.trace_play_id)
+            self.trace_play_id = None
+        self.trace_replay = None
+        self.is_paused = False
+        self.run_btn.config(state="normal", text="Play trace")
+        self.complete_btn.config(state="normal")
+        self.pause_btn.config(state="disabled", text="Pause")
+        self.next_btn.config(state="normal" if self.trace_step < len(self.trace) else "disabled")
 
     # ---------------- UI updates ---------------- #
+    def on_size_change(self):
+        n = int(self.size_var.get())
+        if n == self.n:
+            return
+        self.stop_worker()
+        self.close_trace()
+        self.n = n
+        self.cell = BOARD_PX // n
+        self.astar_search = StepByStepAStar(n)
+        self.astar_search.set_mode(self.mode_var.get())
+        self.build_side_panel()
+        self.on_mode_change()
+
+    def mode_text(self, mode: str) -> str:
+        if mode == "deterministic":
+            return f"Deterministic ({self.n} steps)"
+        if mode == "minconflicts":
+            return "Min-conflicts (local search)"
+        if mode == "forward":
+            return "Forward checking (MRV, backtracking)"
+        if mode == "beam":
+            return f"Beam search (width {self.astar_search.beam_width})"
+        if mode == "idastar":
+            return "IDA* (iterative f-bounds)"
+        return "A* Frontier (no backtracking)"
+
     def on_mode_change(self):
         mode = self.mode_var.get()
+        self.stop_worker()
+        self.close_trace()
         self.astar_search.set_mode(mode)
         self.state = self.astar_search.current_state
         self.search_started = False
         self.start_btn.config(state="normal")
         self.next_btn.config(state="disabled")
         self.run_btn.config(state="normal", text="Run simulation")
+        self.complete_btn.config(state="normal")
         self.pause_btn.config(state="disabled", text="Pause")
         self.update_side_panel()
         self.update_placed_display()
         self.update_step_display()
         self.update_mode_indicator()
         self.draw_board()
-        label = "Deterministic (8 steps)" if mode == "deterministic" else "A* Frontier (no backtracking)"
-        self.update_message(f"Mode changed to {label}. Click 'Start' to begin.")
+        text = f"Mode changed to {self.mode_text(mode)}. Click 'Start' to begin."
+        if mode in ("astar", "idastar") and self.n > ASTAR_MAX_N:
+            text += f" It rarely finishes above N={ASTAR_MAX_N}; min-conflicts or forward checking will."
+        self.update_message(text)
 
     def update_side_panel(self):
-        for r in range(BOARD_SIZE):
+        # Highlight the row where the most recent queen was placed
+        current = -1
+        if self.search_started and not self.astar_search.solved:
+            current = self.last_placed_row()
+        for r in range(len(self.qvars)):
             val = self.state[r]
             if val == -1:
                 txt = f"Row {r}: not placed"
             else:
                 txt = f"Row {r}: column {val}"
             self.qvars[r].set(txt)
-            
-            # Highlight the row where the most recent queen was placed
-            is_current = False
-            if self.search_started and not self.astar_search.solved:
-                # Find the highest row with a placed queen (most recently placed)
-                last_placed_row = -1
-                for row in range(BOARD_SIZE):
-                    if self.state[row] != -1:
-                        last_placed_row = row
-                is_current = (r == last_placed_row and last_placed_row >= 0)
-            
-            self.qlabels[r].configure(fg="#cc6a00" if is_current else "white")
-    
+            self.qlabels[r].configure(fg="#cc6a00" if r == current else "white")
+
     def update_placed_display(self):
         placed_queens = sum(1 for c in self.state if c != -1)
-        self.placed_var.set(f"Queens placed: {placed_queens}/{BOARD_SIZE}")
+        self.placed_var.set(f"Queens placed: {placed_queens}/{self.n}")
+
+    def step_text(self, steps: int, expanded: int, peak_frontier: int) -> str:
+        text = f"Algorithm steps: {steps}"
+        if self.astar_search.mode != "deterministic":
+            text += f"  |  Expanded: {expanded}  |  Peak frontier: {peak_frontier}"
+        return text
 
     def update_step_display(self):
-        self.step_var.set(f"Algorithm steps: {self.astar_search.step_count}")
+        search = self.astar_search
+        stats = search.stats
+        self.step_var.set(self.step_text(search.step_count, stats.nodes_expanded, stats.peak_frontier))
 
     def update_mode_indicator(self):
-        mode = self.astar_search.mode
-        label = "Deterministic (8 steps)" if mode == "deterministic" else "A* Frontier (no backtracking)"
-        self.mode_indicator.set(f"Mode: {label}")
+        self.mode_indicator.set(f"Mode: {self.mode_text(self.astar_search.mode)}")
 
     def update_message(self, text: str):
         self.msg.set(text)
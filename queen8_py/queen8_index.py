@@ -0,0 +1,212 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Dict, Optional, Set, Tuple
+
+from queen8_enumerate import enumerate_solutions
+
+# ---------------------------- Solution index ---------------------------- #
+#
+# Every solution of one board size, sorted, in a file that is memory-mapped
+# and binary-searched in place:
+#
+#   header    INDEX_MAGIC, version, N, solution count
+#   keys      one little-endian uint64 per solution, 8-byte aligned. Row r's
+#             column is the 4-bit digit at bits 60 - 4r, so row 0 is the
+#             most significant digit and numeric order is lexicographic order
+#
+# All completions of a prefix are then one contiguous run of keys, found
+# with two bisections: O(log S) for S solutions, with no parsing at load.
+# N=14 (365,596 solutions) is 2.8 MiB.
+
+INDEX_MAGIC = b'Q8IX'
+INDEX_VERSION = 1
+INDEX_MAX_N = 16  # 4-bit digits, 16 per key
+
+# load_index() builds missing indexes up to this size on the fly (well under
+# a second); larger ones come from `python queen8_index.py build`
+INDEX_AUTO_BUILD = 10
+
+# Index files live in the user cache directory unless QUEEN8_INDEX_DIR is
+# set, so importing the engine never writes into the source tree
+INDEX_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                         'queen8', 'index')
+
+_HEADER = struct.Struct('<4sHHq')
+_KEYS_AT = _HEADER.size + (-_HEADER.size % 8)
+
+_loaded: Dict[Tuple[str, int], 'SolutionIndex'] = {}
+_missing: Set[Tuple[str, int]] = set()  # sizes with no index file, not retried
+
+
+def _key(prefix: Tuple[int, ...]) -> int:
+    key = 0
+    for c in prefix:
+        key = (key << 4) | c
+    return key << 4 * (INDEX_MAX_N - len(prefix))
+
+
+def _unkey(key: int, n: int) -> Tuple[int, ...]:
+    return tuple((key >> 4 * (INDEX_MAX_N - 1 - r)) & 0xF for r in range(n))
+
+
+class SolutionIndex:
+    """Sorted solutions of one board size over a read-only buffer (a memory
+    map of an index file, or bytes). Indexing and iteration yield state
+    tuples in lexicographic order."""
+
+    def __init__(self, buf):
+        if len(buf) < _HEADER.size:
+            raise ValueError("not a solution index")
+        magic, version, n, count = _HEADER.unpack_from(buf, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError("not a solution index")
+        if version != INDEX_VERSION:
+            raise ValueError(f"unsupported solution index version {version}")
+        if len(buf) < _KEYS_AT + 8 * count:
+            raise ValueError("solution index is truncated")
+        self.n = n
+        self._buf = buf
+        view = memoryview(buf)[_KEYS_AT:_KEYS_AT + 8 * count]
+        if sys.byteorder == 'little':
+            self._keys = view.cast('Q')
+        else:
+            self._keys = array('Q', view)
+            self._keys.byteswap()
+
+    @classmethod
+    def open(cls, path: str) -> 'SolutionIndex':
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __getitem__(self, i: int) -> Tuple[int, ...]:
+        return _unkey(self._keys[i], self.n)
+
+    def __iter__(self):
+        for key in self._keys:
+            yield _unkey(key, self.n)
+
+    def span(self, prefix: Tuple[int, ...]) -> Tuple[int, int]:
+        """[start, end) positions of the solutions beginning with `prefix`"""
+        if len(prefix) > self.n or any(not 0 <= c < self.n for c in prefix):
+            return 0, 0
+        low = _key(prefix)
+        high = low + (1 << 4 * (INDEX_MAX_N - len(prefix)))
+        return bisect_left(self._keys, low), bisect_left(self._keys, high)
+
+    def first(self, prefix: Tuple[int, ...] = ()) -> Optional[Tuple[int, ...]]:
+        """Lexicographically first solution extending `prefix`, or None"""
+        start, end = self.span(prefix)
+        return self[start] if start < end else None
+
+    def count(self, prefix: Tuple[int, ...] = ()) -> int:
+        """Number of solutions extending `prefix`"""
+        start, end = self.span(prefix)
+        return end - start
+
+    def close(self):
+        if isinstance(self._keys, memoryview):
+            self._keys.release()
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+
+def index_path(n: int, directory: Optional[str] = None) -> str:
+    if directory is None:
+        directory = os.environ.get('QUEEN8_INDEX_DIR', INDEX_DIR)
+    return os.path.join(directory, f"queens{n:02d}.q8ix")
+
+
+def _encode(n: int, workers: Optional[int]) -> bytes:
+    if not 1 <= n <= INDEX_MAX_N:
+        raise ValueError(f"solution index supports 1 <= N <= {INDEX_MAX_N}, got {n}")
+    keys = array('Q', (_key(s) for s in enumerate_solutions(n, workers=workers)))
+    if sys.byteorder != 'little':
+        keys.byteswap()
+    header = _HEADER.pack(INDEX_MAGIC, INDEX_VERSION, n, len(keys))
+    return header + bytes(_KEYS_AT - _HEADER.size) + keys.tobytes()
+
+
+def build_index(n: int, directory: Optional[str] = None, workers: Optional[int] = None) -> str:
+    """Enumerate every solution of size `n` (on `workers` processes) and
+    write the index file. Written next to the target and renamed into place,
+    so concurrent builders and readers never see a partial file."""
+    data = _encode(n, workers)
+    path = index_path(n, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _missing.discard((path, n))
+    return path
+
+
+def load_index(n: int, directory: Optional[str] = None) -> Optional[SolutionIndex]:
+    """The solution index for size `n`, opened once per process and shared.
+    A missing index is built when n <= INDEX_AUTO_BUILD (in memory if the
+    index directory is not writable); otherwise returns None, and the miss
+    is remembered until build_index() writes that size."""
+    path = index_path(n, directory)
+    key = (path, n)
+    index = _loaded.get(key)
+    if index is not None:
+        return index
+    if not 1 <= n <= INDEX_MAX_N or key in _missing:
+        return None
+    try:
+        index = SolutionIndex.open(path)
+    except (OSError, ValueError):
+        if n > INDEX_AUTO_BUILD:
+            _missing.add(key)
+            return None
+        try:
+            index = SolutionIndex.open(build_index(n, directory, workers=1))
+        except OSError:
+            index = SolutionIndex(_encode(n, workers=1))
+    _loaded[key] = index
+    return index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or query N-Queens solution indexes")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("build", help="enumerate and write the indexes for a range of N")
+    p.add_argument("--max-n", type=int, default=14)
+    p.add_argument("--min-n", type=int, default=1)
+    p.add_argument("--workers", type=int, default=None, help="enumeration processes (default: one per CPU)")
+    p.add_argument("--dir", default=None, help="index directory (default: $QUEEN8_INDEX_DIR or ~/.cache/queen8/index)")
+
+    p = sub.add_parser("query", help="first completion and completion count of a prefix")
+    p.add_argument("n", type=int)
+    p.add_argument("prefix", type=int, nargs="*", help="columns of rows 0, 1, ...")
+    p.add_argument("--dir", default=None)
+
+    args = parser.parse_args()
+    if args.command == "build":
+        for n in range(args.min_n, args.max_n + 1):
+            path = build_index(n, args.dir, args.workers)
+            index = SolutionIndex.open(path)
+            print(f"N={n:>2} {len(index):>9} solutions  {path}")
+            index.close()
+    else:
+        index = load_index(args.n, args.dir)
+        if index is None:
+            sys.exit(f"no index for N={args.n}; run: python queen8_index.py build --max-n {args.n}")
+        prefix = tuple(args.prefix)
+        print(f"completions: {index.count(prefix)}")
+        print(f"first: {index.first(prefix)}")
+
+
+if __name__ == "__main__":
+    main()
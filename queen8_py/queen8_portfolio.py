@@ -0,0 +1,124 @@
+import argparse
+import logging
+import multiprocessing
+import queue
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from queen8_algorithm import BOARD_SIZE, MODES, StepByStepAStar, attacking_pairs
+
+# ---------------------------- Portfolio solving ---------------------------- #
+#
+# Which mode is fastest depends on N: deterministic is instant wherever there
+# is a solution index or the closed form, min-conflicts scales to huge
+# boards, forward checking wins at medium sizes and A* only on small ones.
+# solve() races several modes, each in its own process with its own seed,
+# takes the first board that checks out with attacking_pairs(), terminates
+# the other processes and logs the winner to this module's logger.
+
+PORTFOLIO = ('deterministic', 'astar', 'minconflicts', 'forward')
+
+logger = logging.getLogger(__name__)
+
+
+def _race(entry: int, mode: str, n: int, seed: int, max_steps: Optional[int], results) -> None:
+    """Process target: solve with one mode and report (entry, mode, seed,
+    board or None, steps, seconds)"""
+    start = time.perf_counter()
+    board = None
+    steps = 0
+    try:
+        search = StepByStepAStar(n, seed=seed, max_steps=max_steps)
+        search.set_mode(mode)
+        if max_steps is None or mode == 'minconflicts' or (mode == 'deterministic' and max_steps >= n):
+            search.solve()  # min-conflicts enforces max_steps itself; deterministic takes exactly N
+        else:
+            for _ in search.steps():
+                if search.step_count >= max_steps:
+                    break
+        if search.solved:
+            board = search.current_state
+        steps = search.step_count
+    finally:
+        results.put((entry, mode, seed, board, steps, time.perf_counter() - start))
+
+
+def solve(n: int = BOARD_SIZE, portfolio: Sequence[str] = PORTFOLIO, seed: int = 0,
+          timeout: Optional[float] = None, max_steps: Optional[int] = None) -> Optional[Tuple[int, ...]]:
+    """First valid solution found by racing the `portfolio` modes, one process
+    each; entry i runs with seed `seed + i`, so a mode listed twice races
+    itself with different random choices. The losing processes are
+    terminated as soon as a winner is in. Returns None when every entry
+    finishes without a solution or `timeout` seconds pass. `max_steps`
+    bounds each entry's steps (min-conflicts otherwise restarts forever on
+    a hard instance)."""
+    if n < 1:
+        raise ValueError(f"board size must be at least 1, got {n}")
+    if not portfolio:
+        raise ValueError("portfolio is empty")
+    for mode in portfolio:
+        if mode not in MODES:
+            raise ValueError(f"unknown mode {mode!r}, expected one of {', '.join(MODES)}")
+
+    results = multiprocessing.Queue()
+    racers: List[multiprocessing.Process] = []
+    for i, mode in enumerate(portfolio):
+        p = multiprocessing.Process(target=_race, args=(i, mode, n, seed + i, max_steps, results), daemon=True)
+        p.start()
+        racers.append(p)
+
+    start = time.perf_counter()
+    deadline = None if timeout is None else start + timeout
+    pending = set(range(len(racers)))
+    board = None
+    try:
+        while pending:
+            wait = 0.1 if deadline is None else min(0.1, deadline - time.perf_counter())
+            if wait <= 0:
+                logger.info("portfolio N=%d: no solution within %.3f s (%s)", n, timeout, ", ".join(portfolio))
+                break
+            try:
+                entry, mode, entry_seed, found, steps, seconds = results.get(timeout=wait)
+            except queue.Empty:
+                # a racer that died (killed, out of memory) never reports
+                pending -= {i for i in pending if not racers[i].is_alive() and racers[i].exitcode != 0}
+                continue
+            pending.discard(entry)
+            if found is None:
+                logger.debug("portfolio N=%d: %s (seed %d) finished unsolved after %d steps in %.3f s",
+                             n, mode, entry_seed, steps, seconds)
+                continue
+            if len(found) != n or -1 in found or attacking_pairs(found, n) != 0:
+                logger.warning("portfolio N=%d: %s (seed %d) returned an invalid board %s", n, mode, entry_seed, found)
+                continue
+            board = found
+            logger.info("portfolio N=%d: %s (seed %d) won in %.3f s after %d steps, racing %s",
+                        n, mode, entry_seed, time.perf_counter() - start, steps, ", ".join(portfolio))
+            break
+        else:
+            logger.info("portfolio N=%d: no entry found a solution (%s)", n, ", ".join(portfolio))
+    finally:
+        for p in racers:
+            if p.is_alive():
+                p.terminate()
+        for p in racers:
+            p.join()
+        results.close()
+    return board
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Race several search modes and keep the first solution")
+    parser.add_argument("--n", type=int, default=BOARD_SIZE)
+    parser.add_argument("--portfolio", nargs="+", default=list(PORTFOLIO), choices=list(MODES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--max-steps", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    board = solve(args.n, args.portfolio, args.seed, args.timeout, args.max_steps)
+    print(board if board is not None else "no solution")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+import argparse
+import asyncio
+import json
+import mimetypes
+import multiprocessing
+import os
+import signal
+import socket
+import struct
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress
+from operator import ne
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from queen8 import DEFAULT_MAX_NODES, _solve
+from queen8_algorithm import MODES, StepByStepAStar
+from queen8_trace import TRACE_KINDS
+
+# ---------------------------- Solver service ---------------------------- #
+#
+#   python queen8_server.py [--port 8765] [--workers W] [--max-n 1000]
+#                           [--max-steps 200000] [--max-seconds 30]
+#                           [--complete-workers 2]
+#
+# Serves queen8_web/ and runs the Python engine for it, so the page only
+# renders. Stdlib only: HTTP/1.1 on asyncio streams, steps pushed as
+# server-sent events.
+#
+#   GET /api/health                        {"modes": [...]}
+#   GET /api/stream?n=8&mode=astar&seed=0  event stream of one search run:
+#       event: steps  {"start": s, "events": [[kind, row, col, frontier,
+#                      info, [r, c, r, c, ...]], ...]}   kind indexes
+#                      TRACE_KINDS; the list holds the rows that changed
+#                      and their new columns; event i is step s + i
+#       event: done   {"solved", "steps", "state", "truncated"}
+#   GET /api/complete?n=8&prefix=0,4       complete_board() of the prefix:
+#                                          {"status", "state", "error"}
+#
+# Each run executes once in the process pool and streams its steps back in
+# batches over a socket pair. Every viewer of the same (N, mode, seed)
+# follows that one run, replaying the batches already sent when it joins
+# late, and finished runs stay cached for the next viewer. A run ends after
+# --max-steps steps or --max-seconds of solving, and is cancelled when its
+# last viewer leaves. Completions run in a pool of their own, so they never
+# wait behind long runs, and are cached by (N, prefix). Both endpoints
+# answer 400 for N above the --max-n cap, and any other failure while
+# handling a request is a 500.
+
+SERVER_PORT = 8765
+WEB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'queen8_web')
+
+# A batch goes out when it holds this many steps or is this old
+BATCH_STEPS = 512
+BATCH_MS = 33
+
+# Steps streamed and seconds spent per run; longer runs end with "truncated"
+STREAM_MAX_STEPS = 200_000
+STREAM_MAX_SECONDS = 30
+
+# Processes for /api/complete, apart from the run pool
+COMPLETE_WORKERS = 2
+
+# Largest board either endpoint accepts (the GUI's largest size)
+SERVER_MAX_N = 1000
+
+# Finished runs and completions kept for new viewers (runs still going are
+# never evicted)
+RUN_CACHE_SIZE = 32
+COMPLETE_CACHE_SIZE = 4096
+
+RunKey = Tuple[int, str, int]  # (n, mode, seed)
+
+FRAME = struct.Struct('<I')  # length prefix of each message on a run's socket
+
+
+def _stream_run(n: int, mode: str, seed: int, max_steps: int, max_seconds: float,
+                sock: socket.socket) -> None:
+    """Pool job: run one search and send its steps over `sock` as
+    length-prefixed batch messages, then the final message. Stops early when
+    the server closes its end of the socket."""
+    def send(name: str, data: dict):
+        message = _sse(name, data)
+        sock.sendall(FRAME.pack(len(message)) + message)
+
+    try:
+        search = StepByStepAStar(n, seed=seed)
+        search.set_mode(mode)
+        search.track_changes()
+        prev = list(search.current_state)
+        events: List[list] = []
+        start = 1
+        started = flushed = time.perf_counter()
+        truncated = True
+        for event in search.steps():
+            changes: List[int] = []
+            rows = search.row_changes()
+            if rows is None:  # whole board may differ: diff it
+                state = search.current_state
+                rows = [(r, state[r]) for r in compress(range(n), map(ne, prev, state))] \
+                    if list(state) != prev else []
+            for r, c in rows:
+                if prev[r] != c:
+                    changes += (r, c)
+                    prev[r] = c
+            events.append([TRACE_KINDS.index(event.kind), event.row, event.col, event.frontier, event.info, changes])
+            now = time.perf_counter()
+            if len(events) >= BATCH_STEPS or event.done or now - flushed >= BATCH_MS / 1000:
+                send('steps', {'start': start, 'events': events})
+                start += len(events)
+                events = []
+                flushed = now
+            if event.done:
+                truncated = False
+                break
+            if search.step_count >= max_steps or now - started >= max_seconds:
+                break
+        else:
+            truncated = False
+        if events:
+            send('steps', {'start': start, 'events': events})
+        send('done', {'solved': search.solved, 'steps': search.step_count,
+                      'state': list(search.current_state), 'truncated': truncated})
+    except ConnectionError:
+        pass  # cancelled: nobody is watching
+    except Exception as e:  # the viewers see the failure instead of a stalled stream
+        try:
+            send('done', {'solved': False, 'steps': 0, 'state': [], 'truncated': False, 'error': str(e)})
+        except ConnectionError:
+            pass
+    finally:
+        sock.close()
+
+
+def _sse(name: str, data: dict) -> bytes:
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+def _pool(workers: Optional[int]) -> ProcessPoolExecutor:
+    # spawned, not forked: a worker forked inside a request handler would
+    # inherit that viewer's socket and keep its stream from ever closing.
+    # Ctrl-C goes to the server only, which shuts the pool down itself.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=signal.signal, initargs=(signal.SIGINT, signal.SIG_IGN))
+
+
+class Run:
+    """One search run's event-stream chunks, shared by all of its viewers"""
+
+    def __init__(self, key: RunKey):
+        self.key = key
+        self.chunks: List[bytes] = []
+        self.done = False
+        self.viewers = 0
+        self.producer: Optional[asyncio.Task] = None
+        self._more = asyncio.Event()
+
+    def append(self, chunk: bytes):
+        self.chunks.append(chunk)
+        self._wake()
+
+    def finish(self):
+        self.done = True
+        self._wake()
+
+    def _wake(self):
+        more, self._more = self._more, asyncio.Event()
+        more.set()
+
+    async def follow(self) -> AsyncIterator[bytes]:
+        """Every chunk from the first, waiting for new ones until the run ends"""
+        i = 0
+        while True:
+            while i < len(self.chunks):
+                yield self.chunks[i]
+                i += 1
+            if self.done:
+                return
+            await self._more.wait()
+
+
+class SolverService:
+    def __init__(self, workers: Optional[int] = None, max_steps: int = STREAM_MAX_STEPS,
+                 max_n: int = SERVER_MAX_N, max_seconds: float = STREAM_MAX_SECONDS,
+                 complete_workers: int = COMPLETE_WORKERS):
+        self.pool = _pool(workers)
+        self.complete_pool = _pool(complete_workers)
+        self.max_steps = max_steps
+        self.max_seconds = max_seconds
+        self.max_n = max_n
+        self.runs: 'OrderedDict[RunKey, Run]' = OrderedDict()
+        self.completions: 'OrderedDict[Tuple[int, Tuple[int, ...]], asyncio.Future]' = OrderedDict()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+        self.complete_pool.shutdown(cancel_futures=True)
+
+    # ---------------- Runs and caches ---------------- #
+    def run(self, key: RunKey) -> Run:
+        """The run for `key`: cached, in progress, or started now"""
+        run = self.runs.get(key)
+        if run is not None:
+            self.runs.move_to_end(key)
+            return run
+        run = Run(key)
+        self.runs[key] = run
+        run.producer = asyncio.get_running_loop().create_task(self._produce(run))
+        finished = [k for k, r in self.runs.items() if r.done]
+        for k in finished[:max(0, len(self.runs) - RUN_CACHE_SIZE)]:
+            del self.runs[k]
+        return run
+
+    def leave(self, run: Run):
+        """A viewer stopped following `run`; the last one out cancels it"""
+        run.viewers -= 1
+        if not run.viewers and not run.done:
+            if self.runs.get(run.key) is run:
+                del self.runs[run.key]
+            run.producer.cancel()
+
+    async def _produce(self, run: Run):
+        loop = asyncio.get_running_loop()
+        ours, theirs = socket.socketpair()
+        n, mode, seed = run.key
+        job = loop.run_in_executor(self.pool, _stream_run, n, mode, seed, self.max_steps, self.max_seconds, theirs)
+        # The worker gets its own copy of `theirs`; once the job is over, ours
+        # goes too, so the stream hits EOF even if the worker died mid-run
+        job.add_done_callback(lambda _: theirs.close())
+        reader, writer = await asyncio.open_connection(sock=ours)
+        try:
+            while True:
+                try:
+                    size, = FRAME.unpack(await reader.readexactly(FRAME.size))
+                    run.append(await reader.readexactly(size))
+                except asyncio.IncompleteReadError:
+                    break
+            try:
+                await job
+            except Exception as e:
+                run.append(_sse('done', {'solved': False, 'steps': 0, 'state': [], 'truncated': False, 'error': str(e)}))
+                if self.runs.get(run.key) is run:
+                    del self.runs[run.key]  # retry on the next request
+            run.finish()
+        finally:
+            writer.close()  # when cancelled, the worker's next send fails and it stops
+            job.cancel()  # or it never starts, if still queued
+
+    async def complete(self, n: int, prefix: Tuple[int, ...]) -> dict:
+        key = (n, prefix)
+        future = self.completions.get(key)
+        if future is None:
+            state = prefix + (-1,) * (n - len(prefix))
+            future = asyncio.ensure_future(asyncio.get_running_loop().run_in_executor(
+                self.complete_pool, _solve, (state, DEFAULT_MAX_NODES)))
+            self.completions[key] = future
+            while len(self.completions) > COMPLETE_CACHE_SIZE:
+                self.completions.popitem(last=False)
+        else:
+            self.completions.move_to_end(key)
+        try:
+            status, board, error = await asyncio.shield(future)
+        except Exception as e:
+            self.completions.pop(key, None)  # retry on the next request
+            return {'status': 'error', 'state': None, 'error': str(e)}
+        return {'status': status, 'state': board, 'error': error}
+
+    # ---------------- HTTP ---------------- #
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass  # headers are not needed
+            parts = request.decode('latin-1').split()
+            if len(parts) < 2 or parts[0] != 'GET':
+                await self._send(writer, 405, b'method not allowed\n', 'text/plain')
+                return
+            url = urlsplit(parts[1])
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            if url.path == '/api/health':
+                await self._json(writer, 200, {'modes': list(MODES)})
+            elif url.path == '/api/stream':
+                await self._stream(writer, query)
+            elif url.path == '/api/complete':
+                await self._complete(writer, query)
+            else:
+                await self._static(writer, unquote(url.path))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # the viewer went away
+        except Exception as e:
+            try:
+                await self._json(writer, 500, {'error': str(e) or type(e).__name__})
+            except Exception:
+                pass  # headers may already be out, or the viewer is gone
+        finally:
+            writer.close()
+
+    async def _stream(self, writer: asyncio.StreamWriter, query: Dict[str, str]):
+        try:
+            n = int(query.get('n', '8'))
+            seed = int(query.get('seed', '0'))
+        except ValueError:
+            await self._json(writer, 400, {'error': 'n and seed must be integers'})
+            return
+        mode = query.get('mode', 'astar')
+        if mode not in MODES:
+            await self._json(writer, 400, {'error': f"mode must be one of {', '.join(MODES)}"})
+            return
+        if not await self._check_n(writer, n):
+            return
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n'
+                     b'Access-Control-Allow-Origin: *\r\nConnection: close\r\n\r\n')
+        run = self.run((n, mode, seed))
+        run.viewers += 1
+        try:
+            async for chunk in run.follow():
+                writer.write(chunk)
+                await writer.drain()
+        finally:
+            self.leave(run)
+
+    async def _complete(self, writer: asyncio.StreamWriter, query: Dict[str, str]):
+        try:
+            n = int(query.get('n', '8'))
+            prefix = tuple(int(c) for c in query.get('prefix', '').split(',') if c.strip())
+        except ValueError:
+            await self._json(writer, 400, {'error': 'n and prefix must be integers'})
+            return
+        if not await self._check_n(writer, n):
+            return
+        if len(prefix) > n:
+            await self._json(writer, 400, {'error': 'prefix is longer than the board'})
+            return
+        await self._json(writer, 200, await self.complete(n, prefix))
+
+    async def _check_n(self, writer: asyncio.StreamWriter, n: int) -> bool:
+        if 1 <= n <= self.max_n:
+            return True
+        await self._json(writer, 400, {'error': f"n must be between 1 and {self.max_n}"})
+        return False
+
+    async def _static(self, writer: asyncio.StreamWriter, path: str):
+        name = os.path.normpath(path.lstrip('/') or 'index.html')
+        file = os.path.join(WEB_DIR, name)
+        if name.startswith('..') or os.path.isabs(name) or not os.path.isfile(file):
+            await self._send(writer, 404, b'not found\n', 'text/plain')
+            return
+        with open(file, 'rb') as f:
+            body = f.read()
+        await self._send(writer, 200, body, mimetypes.guess_type(file)[0] or 'application/octet-stream')
+
+    async def _json(self, writer: asyncio.StreamWriter, status: int, data: dict):
+        await self._send(writer, status, json.dumps(data).encode(), 'application/json')
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, body: bytes, content_type: str):
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                  500: 'Internal Server Error'}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\nAccess-Control-Allow-Origin: *\r\n"
+                     f"Connection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+
+
+async def serve(host: str, port: int, workers: Optional[int], max_steps: int, max_n: int,
+                max_seconds: float = STREAM_MAX_SECONDS, complete_workers: int = COMPLETE_WORKERS) -> None:
+    service = SolverService(workers, max_steps, max_n, max_seconds, complete_workers)
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Serving queen8_web on http://{host}:{port}/", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve the web front end with the Python solver behind it")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="solver processes (default: one per CPU)")
+    parser.add_argument("--max-steps", type=int, default=STREAM_MAX_STEPS,
+                        help=f"steps streamed per run (default: {STREAM_MAX_STEPS})")
+    parser.add_argument("--max-seconds", type=float, default=STREAM_MAX_SECONDS,
+                        help=f"solving time per run (default: {STREAM_MAX_SECONDS})")
+    parser.add_argument("--max-n", type=int, default=SERVER_MAX_N,
+                        help=f"largest board size accepted (default: {SERVER_MAX_N})")
+    parser.add_argument("--complete-workers", type=int, default=COMPLETE_WORKERS,
+                        help=f"processes for /api/complete (default: {COMPLETE_WORKERS})")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_steps, args.max_n,
+                          args.max_seconds, args.complete_workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
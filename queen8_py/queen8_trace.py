@@ -0,0 +1,329 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import compress
+from operator import ne
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from queen8_algorithm import MODES, StepByStepAStar, StepEvent
+
+# ---------------------------- Step trace file format ---------------------------- #
+#
+# A recorded run, replayable and seekable without re-solving. Little-endian:
+#
+#   header    TRACE_MAGIC, version, mode, flags, N, step count, keyframe
+#             interval, keyframe count, keyframe table offset
+#   events    one variable-length record per step, from byte _EVENTS_AT:
+#               kind                     1 byte, index into TRACE_KINDS
+#               row + 1, col + 1         unsigned LEB128 varints
+#               frontier                 zigzag varint, delta from the
+#                                        previous step's frontier
+#               info                     zigzag varint
+#               changed rows             varint count, then per changed row
+#                                        (row - previous changed row - 1,
+#                                        new column + 1) as varints
+#   keyframes 8-byte aligned arrays: steps ('q'), event byte offsets ('q'),
+#             frontiers ('q') and boards ('i', N columns each). Keyframe k is
+#             the board and frontier after steps[k] steps and the offset of
+#             the next record.
+#
+# Only the rows that changed are stored per step, so an A* or min-conflicts
+# step costs a few bytes. Seeking to step t bisects the keyframe steps
+# (O(log t)) and decodes at most keyframe-interval records forward.
+
+TRACE_MAGIC = b'Q8TR'
+TRACE_VERSION = 1
+
+# A keyframe every this many steps: seeks decode at most this many records
+KEYFRAME_EVERY = 4096
+
+# StepEvent kinds in record order; the web replayer keeps the same table
+TRACE_KINDS = ('place', 'placed_all', 'expand', 'dead_end', 'backtrack', 'deepen', 'move', 'restart',
+               'solved', 'conflict', 'exhausted', 'budget', 'no_solution')
+_KIND_INDEX = {kind: i for i, kind in enumerate(TRACE_KINDS)}
+
+_HEADER = struct.Struct('<4sHBBIqqqq')
+_EVENTS_AT = _HEADER.size + (-_HEADER.size % 8)
+_ALIGN = 8
+
+# header flag bits
+_SOLVED = 1
+
+
+def _uvarint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def _read_uvarint(buf, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+class TraceWriter:
+    """Append StepEvents and the board after each of them to a trace file.
+    The file is written next to `path` and renamed into place by close()."""
+
+    def __init__(self, path: str, n: int, mode: str, initial: Tuple[int, ...],
+                 keyframe_every: int = KEYFRAME_EVERY):
+        if keyframe_every < 1:
+            raise ValueError(f"keyframe interval must be at least 1, got {keyframe_every}")
+        self.path = path
+        self.n = n
+        self.mode = mode
+        self.keyframe_every = keyframe_every
+        self.steps = 0
+        self.solved = False
+        self._tmp = f"{path}.tmp"
+        self._file = open(self._tmp, 'wb')
+        self._file.write(bytes(_EVENTS_AT))
+        self._offset = _EVENTS_AT
+        self._buf = bytearray()
+        self._state = list(initial)
+        self._frontier = 0
+        self._kf_steps = array('q')
+        self._kf_offsets = array('q')
+        self._kf_frontiers = array('q')
+        self._kf_boards = array('i')
+        self._keyframe()  # step 0, so even a trace with no steps can be opened
+
+    def _keyframe(self):
+        self._kf_steps.append(self.steps)
+        self._kf_offsets.append(self._offset + len(self._buf))
+        self._kf_frontiers.append(self._frontier)
+        self._kf_boards.extend(self._state)
+
+    def add(self, event: StepEvent, state: Optional[Sequence[int]] = None,
+            changes: Optional[List[Tuple[int, int]]] = None):
+        """Append one step. Pass the board after it as `state`, or the
+        engine's row_changes() as `changes` to skip diffing all N rows."""
+        if self.steps and self.steps % self.keyframe_every == 0:
+            self._keyframe()
+        out = self._buf
+        out.append(_KIND_INDEX[event.kind])
+        _uvarint(out, event.row + 1)
+        _uvarint(out, event.col + 1)
+        _uvarint(out, _zigzag(event.frontier - self._frontier))
+        _uvarint(out, _zigzag(event.info))
+        self._frontier = event.frontier
+        old = self._state
+        if changes is None:
+            changes = [(r, state[r]) for r in compress(range(self.n), map(ne, old, state))] \
+                if old != list(state) else []
+        changed = [(r, c) for r, c in changes if old[r] != c]
+        _uvarint(out, len(changed))
+        prev = -1
+        for r, c in changed:
+            _uvarint(out, r - prev - 1)
+            _uvarint(out, c + 1)
+            old[r] = c
+            prev = r
+        self.steps += 1
+        if event.kind == 'solved':
+            self.solved = True
+        if len(out) >= 1 << 16:
+            self._flush()
+
+    def _flush(self):
+        self._file.write(self._buf)
+        self._offset += len(self._buf)
+        self._buf = bytearray()
+
+    def close(self):
+        self._flush()
+        f = self._file
+        table = self._offset + (-self._offset % _ALIGN)
+        f.write(bytes(table - self._offset))
+        for arr in (self._kf_steps, self._kf_offsets, self._kf_frontiers, self._kf_boards):
+            if sys.byteorder != 'little':
+                arr = array(arr.typecode, arr)
+                arr.byteswap()
+            arr.tofile(f)
+        f.seek(0)
+        f.write(_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, MODES.index(self.mode),
+                             _SOLVED if self.solved else 0, self.n, self.steps,
+                             self.keyframe_every, len(self._kf_steps), table))
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        os.replace(self._tmp, self.path)
+
+
+def record_trace(search: StepByStepAStar, path: str, keyframe_every: int = KEYFRAME_EVERY,
+                 max_steps: Optional[int] = None) -> int:
+    """Run `search` from its current state, writing every step to a trace
+    file; stops when the search ends or after `max_steps` steps. Returns the
+    number of steps recorded."""
+    writer = TraceWriter(path, search.n, search.mode, search.current_state, keyframe_every)
+    search.track_changes()
+    try:
+        for event in search.steps():
+            changes = search.row_changes()
+            if changes is None:
+                writer.add(event, search.current_state)
+            else:
+                writer.add(event, changes=changes)
+            if max_steps is not None and writer.steps >= max_steps:
+                break
+    except BaseException:
+        writer._file.close()
+        os.remove(writer._tmp)
+        raise
+    finally:
+        search.track_changes(False)
+    writer.close()
+    return writer.steps
+
+
+class Trace:
+    """A recorded trace, memory-mapped. Step t means "after t steps": step 0
+    is the board before the first event and event_at(t) is the t-th event."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = self._buf
+        if len(buf) < _EVENTS_AT:
+            raise ValueError(f"{path} is not a trace file")
+        (magic, version, mode_index, flags, n, steps, keyframe_every,
+         keyframes, table) = _HEADER.unpack_from(buf, 0)
+        if magic != TRACE_MAGIC:
+            raise ValueError(f"{path} is not a trace file")
+        if version != TRACE_VERSION:
+            raise ValueError(f"unsupported trace version {version}")
+        if keyframes == 0 or table + keyframes * (24 + 4 * n) > len(buf):
+            raise ValueError(f"{path} is truncated")
+        self.n = n
+        self.mode = MODES[mode_index]
+        self.solved = bool(flags & _SOLVED)
+        self.steps = steps
+        self.keyframe_every = keyframe_every
+        self._kf_steps = self._array('q', table, keyframes)
+        self._kf_offsets = self._array('q', table + 8 * keyframes, keyframes)
+        self._kf_frontiers = self._array('q', table + 16 * keyframes, keyframes)
+        self._boards_at = table + 24 * keyframes
+
+    def _array(self, typecode: str, offset: int, count: int) -> array:
+        arr = array(typecode)
+        arr.frombytes(self._buf[offset:offset + count * arr.itemsize])
+        if sys.byteorder != 'little':
+            arr.byteswap()
+        return arr
+
+    def __len__(self) -> int:
+        return self.steps
+
+    def close(self):
+        self._buf.close()
+
+    def _decode(self, pos: int, state: List[int], frontier: int, step: int) -> Tuple[StepEvent, int, int]:
+        """Decode the record at `pos` (step number `step`), applying its
+        changed rows to `state`. Returns (event, next position, frontier)."""
+        buf = self._buf
+        kind = TRACE_KINDS[buf[pos]]
+        row, pos = _read_uvarint(buf, pos + 1)
+        col, pos = _read_uvarint(buf, pos)
+        delta, pos = _read_uvarint(buf, pos)
+        info, pos = _read_uvarint(buf, pos)
+        count, pos = _read_uvarint(buf, pos)
+        r = -1
+        for _ in range(count):
+            gap, pos = _read_uvarint(buf, pos)
+            c, pos = _read_uvarint(buf, pos)
+            r += gap + 1
+            state[r] = c - 1
+        frontier += _unzigzag(delta)
+        return StepEvent(kind, step, row - 1, col - 1, frontier, _unzigzag(info)), pos, frontier
+
+    def _start(self, step: int) -> Tuple[int, List[int], int, int]:
+        """(step, board, record offset, frontier) of the last keyframe at or
+        before `step`"""
+        k = bisect_right(self._kf_steps, step) - 1
+        board = self._array('i', self._boards_at + 4 * self.n * k, self.n).tolist()
+        return self._kf_steps[k], board, self._kf_offsets[k], self._kf_frontiers[k]
+
+    def seek(self, step: int) -> Tuple[Tuple[int, ...], Optional[StepEvent]]:
+        """Board after `step` steps and the event of that step (None at step
+        0), decoding forward from the nearest keyframe"""
+        if not 0 <= step <= self.steps:
+            raise IndexError(f"step {step} is outside a trace of {self.steps} steps")
+        at, state, pos, frontier = self._start(step - 1 if step else 0)
+        event = None
+        for t in range(at + 1, step + 1):
+            event, pos, frontier = self._decode(pos, state, frontier, t)
+        return tuple(state), event
+
+    def state_at(self, step: int) -> Tuple[int, ...]:
+        return self.seek(step)[0]
+
+    def event_at(self, step: int) -> StepEvent:
+        if step < 1:
+            raise IndexError("events are numbered from step 1")
+        return self.seek(step)[1]
+
+    def replay(self, start: int = 0) -> Iterator[Tuple[StepEvent, List[int]]]:
+        """Yield (event, board) for every step after `start`. The board is
+        one list updated in place; copy it to keep it."""
+        if not 0 <= start <= self.steps:
+            raise IndexError(f"step {start} is outside a trace of {self.steps} steps")
+        at, state, pos, frontier = self._start(start)
+        for t in range(at + 1, self.steps + 1):
+            event, pos, frontier = self._decode(pos, state, frontier, t)
+            if t > start:
+                yield event, state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record and inspect N-Queens step traces")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("record", help="solve and record every step")
+    p.add_argument("output")
+    p.add_argument("--n", type=int, default=8)
+    p.add_argument("--mode", default="astar", choices=list(MODES))
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--max-steps", type=int, default=None)
+    p.add_argument("--keyframe-every", type=int, default=KEYFRAME_EVERY)
+
+    p = sub.add_parser("show", help="board and event at one step")
+    p.add_argument("trace")
+    p.add_argument("step", type=int)
+
+    args = parser.parse_args()
+    if args.command == "record":
+        search = StepByStepAStar(args.n, seed=args.seed)
+        search.set_mode(args.mode)
+        steps = record_trace(search, args.output, args.keyframe_every, args.max_steps)
+        size = os.path.getsize(args.output)
+        print(f"{steps} steps, {size} bytes ({size / max(1, steps):.1f} B/step), solved: {search.solved}")
+    else:
+        trace = Trace(args.trace)
+        state, event = trace.seek(args.step)
+        print(f"N={trace.n} mode={trace.mode} steps={len(trace)}")
+        if event is not None:
+            print(event.message)
+        print(state)
+
+
+if __name__ == "__main__":
+    main()
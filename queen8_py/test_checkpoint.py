@@ -0,0 +1,62 @@
+import pytest
+
+from queen8_algorithm import MODES, StepByStepAStar
+
+# A checkpoint must resume exactly where the saved engine stopped: the next
+# steps of the loaded engine match the original's event for event, board
+# for board, counter for counter.
+
+NEXT_STEPS = 400
+
+
+def fields(search: StepByStepAStar, event):
+    stats = search.stats
+    return ((event.kind, event.step, event.row, event.col, event.frontier, event.info),
+            tuple(search.current_state), search.step_count, search.solved, search.stuck,
+            stats.nodes_generated, stats.nodes_expanded, stats.dead_ends, stats.peak_frontier,
+            stats.heuristic_calls)
+
+
+def advance(search: StepByStepAStar, steps: int) -> list:
+    trail = []
+    for event in search.steps():
+        trail.append(fields(search, event))
+        if len(trail) >= steps:
+            break
+    return trail
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("n, before", [(1, 0), (6, 0), (8, 37), (10, 250), (13, 900), (40, 60)])
+def test_resume_matches_uninterrupted_run(tmp_path, mode, n, before):
+    search = StepByStepAStar(n, seed=7, restart_after=50)
+    search.set_mode(mode)
+    advance(search, before)
+    path = str(tmp_path / "run.ckpt")
+    search.save_checkpoint(path)
+
+    resumed = StepByStepAStar.load_checkpoint(path)
+    assert resumed.mode == mode
+    assert tuple(resumed.current_state) == tuple(search.current_state)
+    assert (resumed.step_count, resumed.solved, resumed.stuck) == (search.step_count, search.solved, search.stuck)
+    assert advance(resumed, NEXT_STEPS) == advance(search, NEXT_STEPS)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_resume_after_the_search_ended(tmp_path, mode):
+    search = StepByStepAStar(6, seed=1)
+    search.set_mode(mode)
+    search.solve()
+    path = str(tmp_path / "done.ckpt")
+    search.save_checkpoint(path)
+    resumed = StepByStepAStar.load_checkpoint(path)
+    assert (resumed.solved, resumed.stuck) == (search.solved, search.stuck)
+    assert tuple(resumed.current_state) == tuple(search.current_state)
+    assert resumed.next_step() == search.next_step()
+
+
+def test_rejects_files_that_are_not_checkpoints(tmp_path):
+    path = tmp_path / "junk.ckpt"
+    path.write_bytes(b"not a checkpoint at all, just some bytes" * 4)
+    with pytest.raises(ValueError):
+        StepByStepAStar.load_checkpoint(str(path))
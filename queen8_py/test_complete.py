@@ -0,0 +1,70 @@
+import json
+import random
+
+import pytest
+
+from queen8 import _parse
+from queen8_algorithm import complete_board
+from queen8_enumerate import enumerate_solutions
+
+# complete_board() must find a completion exactly when one exists: checked
+# against the full list of solutions from enumerate_solutions() for small N.
+
+MAX_N = 9
+SOLUTIONS = {n: enumerate_solutions(n, workers=1) for n in range(1, MAX_N + 1)}
+
+
+def extends(solution, state) -> bool:
+    return all(c == -1 or c == s for c, s in zip(state, solution))
+
+
+def random_partial_boards(count: int, seed: int = 0):
+    """(n, state) pairs, a third each: rows blanked from a solution, a
+    filled prefix, and queens dropped at random (often attacking)"""
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        n = rng.randint(1, MAX_N)
+        kind = len(boards) % 3
+        if kind == 0 and SOLUTIONS[n]:
+            keep = rng.random()
+            state = tuple(c if rng.random() < keep else -1 for c in rng.choice(SOLUTIONS[n]))
+        elif kind == 1:
+            k = rng.randint(0, n)
+            state = tuple(rng.randrange(n) for _ in range(k)) + (-1,) * (n - k)
+        else:
+            state = tuple(rng.randrange(n) if rng.random() < 0.3 else -1 for _ in range(n))
+        boards.append((n, state))
+    return boards
+
+
+@pytest.mark.parametrize("n, state", random_partial_boards(600))
+def test_complete_board_matches_enumeration(n, state):
+    board = complete_board(state, n)
+    if any(extends(s, state) for s in SOLUTIONS[n]):
+        assert board in SOLUTIONS[n]
+        assert extends(board, state)
+    else:
+        assert board is None
+
+
+@pytest.mark.parametrize("n", range(1, MAX_N + 1))
+def test_empty_board_completes(n):
+    board = complete_board((-1,) * n, n)
+    assert (board in SOLUTIONS[n]) if SOLUTIONS[n] else board is None
+
+
+@pytest.mark.parametrize("state", [(0, 8, -1), (-2, -1, -1), (0, 1)])
+def test_rejects_bad_columns(state):
+    with pytest.raises(ValueError):
+        complete_board(state, 3)
+
+
+@pytest.mark.parametrize("state", [[], [True, -1, -1], [0.0, -1], "0,1", None, {"row": 0}])
+def test_parse_rejects_bad_states(state):
+    _, _, parsed, error = _parse(0, json.dumps({"id": "x", "state": state}))
+    assert parsed is None and error
+
+
+def test_parse_accepts_partial_board():
+    assert _parse(4, "[1, -1, -1, -1]") == (4, 4, (1, -1, -1, -1), None)
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from queen8_algorithm import Board, PrefixCache, StepByStepAStar
+
+# child_heuristics() and child_heuristics_batch() are the fast paths A* uses
+# to score children; calculate_future_conflicts() is the reference they must
+# match exactly, or the A* step sequence changes.
+
+EIGHT_QUEENS_STEPS = 1074
+EIGHT_QUEENS_SOLUTION = (0, 4, 7, 5, 2, 6, 1, 3)
+
+
+def random_partial_boards(count: int, seed: int = 0):
+    """(board, row) pairs: rows above `row` hold non-attacking queens placed
+    at random, the rest are empty, as on an A* node"""
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        n = rng.randint(4, 11)
+        board = Board(n)
+        row = 0
+        target = rng.randint(0, n - 1)
+        while row < target:
+            cols = board.valid_columns(row)
+            if not cols:
+                break
+            board = board.place(row, rng.choice(cols))
+            row += 1
+        boards.append((board, row))
+    return boards
+
+
+def reference(search: StepByStepAStar, board: Board, row: int, cols):
+    return [search.calculate_future_conflicts(board.place(row, c).queens, row + 1) for c in cols]
+
+
+@pytest.mark.parametrize("board, row", random_partial_boards(300))
+def test_child_heuristics_matches_reference(board, row):
+    search = StepByStepAStar(board.n)
+    cols = list(range(board.n))  # every column, not only the valid ones
+    assert search.child_heuristics(board, row, cols) == reference(search, board, row, cols)
+
+
+@pytest.mark.parametrize("board, row", random_partial_boards(300, seed=1))
+def test_child_heuristics_batch_matches_reference(board, row):
+    batch = pytest.importorskip("queen8_batch")
+    search = StepByStepAStar(board.n)
+    cols = board.valid_columns(row)
+    assert batch.child_heuristics_batch(board.queens, row, cols).tolist() == reference(search, board, row, cols)
+
+
+def test_cached_reference_matches_uncached():
+    cache = PrefixCache()  # keys include N, so one cache serves every size
+    for board, row in random_partial_boards(200, seed=2):
+        cached = StepByStepAStar(board.n, cache=cache)
+        plain = StepByStepAStar(board.n)
+        for c in board.valid_columns(row):
+            child = board.place(row, c).queens
+            assert cached.calculate_future_conflicts(child, row + 1) == plain.calculate_future_conflicts(child, row + 1)
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_eight_queens_astar_sequence(vectorized):
+    if vectorized:
+        pytest.importorskip("numpy")
+    search = StepByStepAStar(8, vectorized=vectorized)
+    search.set_mode('astar')
+    while True:
+        state, _, done = search.next_step()
+        if done:
+            break
+    assert search.solved
+    assert search.step_count == EIGHT_QUEENS_STEPS
+    assert tuple(state) == EIGHT_QUEENS_SOLUTION
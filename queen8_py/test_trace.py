@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+from queen8_algorithm import MODES, StepByStepAStar
+from queen8_trace import Trace, TraceWriter, record_trace
+
+# A recorded trace must reproduce the live run: seek(t) gives the board and
+# event of step t, and replay() walks the same steps, from any start.
+
+MAX_STEPS = 3000
+KEYFRAME_EVERY = 37  # small, so seeks cross many keyframes
+
+
+def event_fields(event):
+    if event is None:
+        return None
+    return event.kind, event.step, event.row, event.col, event.frontier, event.info
+
+
+def live_run(n: int, mode: str) -> list:
+    """[(event, board)] of a live run; entry 0 is (None, initial board)"""
+    search = StepByStepAStar(n, seed=3)
+    search.set_mode(mode)
+    run = [(None, tuple(search.current_state))]
+    for event in search.steps():
+        run.append((event_fields(event), tuple(search.current_state)))
+        if len(run) > MAX_STEPS:
+            break
+    return run
+
+
+@pytest.fixture
+def recorded(tmp_path, request):
+    n, mode = request.param
+    search = StepByStepAStar(n, seed=3)
+    search.set_mode(mode)
+    path = str(tmp_path / "run.q8t")
+    steps = record_trace(search, path, KEYFRAME_EVERY, MAX_STEPS)
+    trace = Trace(path)
+    yield live_run(n, mode), trace, steps
+    trace.close()
+
+
+CASES = [(n, mode) for mode in MODES for n in (1, 4, 8, 12)]
+
+
+@pytest.mark.parametrize("recorded", CASES, indirect=True, ids=lambda c: f"{c[1]}-{c[0]}")
+def test_seek_matches_live_run(recorded):
+    live, trace, steps = recorded
+    assert len(trace) == steps == len(live) - 1
+    rng = random.Random(0)
+    for t in [0, steps] + rng.sample(range(steps + 1), min(steps + 1, 150)):
+        state, event = trace.seek(t)
+        assert state == live[t][1]
+        assert event_fields(event) == live[t][0]
+
+
+@pytest.mark.parametrize("recorded", CASES, indirect=True, ids=lambda c: f"{c[1]}-{c[0]}")
+def test_replay_matches_live_run(recorded):
+    live, trace, steps = recorded
+    rng = random.Random(1)
+    for start in {0, steps, *rng.sample(range(steps + 1), min(steps + 1, 4))}:
+        replayed = [(event_fields(e), tuple(board)) for e, board in trace.replay(start)]
+        assert replayed == live[start + 1:]
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_row_changes_write_the_same_bytes_as_full_diffs(tmp_path, mode):
+    fast, slow = tmp_path / "fast.q8t", tmp_path / "slow.q8t"
+    search = StepByStepAStar(10, seed=5)
+    search.set_mode(mode)
+    record_trace(search, str(fast), KEYFRAME_EVERY, MAX_STEPS)
+
+    search = StepByStepAStar(10, seed=5)
+    search.set_mode(mode)
+    writer = TraceWriter(str(slow), search.n, search.mode, search.current_state, KEYFRAME_EVERY)
+    for event in search.steps():
+        writer.add(event, search.current_state)
+        if writer.steps >= MAX_STEPS:
+            break
+    writer.close()
+    assert fast.read_bytes() == slow.read_bytes()
+
+
+def test_empty_trace_opens(tmp_path):
+    path = str(tmp_path / "empty.q8t")
+    TraceWriter(path, 5, 'astar', (-1,) * 5).close()
+    trace = Trace(path)
+    assert len(trace) == 0
+    assert trace.seek(0) == ((-1,) * 5, None)
+    assert list(trace.replay()) == []
+    with pytest.raises(IndexError):
+        trace.seek(1)
+    trace.close()
+
+
+def test_rejects_truncated_file(tmp_path):
+    search = StepByStepAStar(8)
+    search.set_mode('astar')
+    path = tmp_path / "run.q8t"
+    record_trace(search, str(path))
+    path.write_bytes(path.read_bytes()[:-16])
+    with pytest.raises(ValueError):
+        Trace(str(path))
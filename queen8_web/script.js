@@ -1,24 +1,47 @@
 // Constants
-const BOARD_SIZE = 8;
+const BOARD_SIZE = 8; // default N; the board size is chosen at runtime
+const BOARD_MAX_N = 16; // largest size in the size menu; the board is one element per square
+const SIDE_PANEL_ROWS = 32; // rows listed in the queen positions panel
+
+// Closed-form N-Queens solution: evens then odds (1-based), with the
+// standard fix-ups for N mod 6 = 2 or 3. Returns null when none exists.
+function constructiveSolution(n) {
+    if (n === 1) return [0];
+    if (n < 4) return null;
+    let evens = [];
+    let odds = [];
+    for (let c = 2; c <= n; c += 2) evens.push(c);
+    for (let c = 1; c <= n; c += 2) odds.push(c);
+    if (n % 6 === 2) {
+        // swap 1 and 3, move 5 to the end
+        odds = [3, 1, ...odds.slice(3), 5];
+    } else if (n % 6 === 3) {
+        // move 2 to the end of the evens, 1 and 3 to the end of the odds
+        evens = [...evens.slice(1), 2];
+        odds = [...odds.slice(2), 1, 3];
+    }
+    return [...evens, ...odds].map(c => c - 1);
+}
 
 // A* Search Algorithm Class
 class StepByStepAStar {
-    constructor() {
+    constructor(n = BOARD_SIZE) {
+        this.n = n;
         this.mode = 'deterministic'; // 'deterministic' | 'astar'
         this.reset();
     }
     
     reset() {
-        this.currentState = new Array(BOARD_SIZE).fill(-1);
+        this.currentState = new Array(this.n).fill(-1);
         if (this.mode === 'astar') {
             // Open list for A*: frontier of partial boards (no backtracking)
             // Each node: { state, row, g, h, f }
             const h0 = this.calculateFutureConflicts(this.currentState, 0);
             this.openList = [{ state: [...this.currentState], row: 0, g: 0, h: h0, f: h0 }];
         } else {
-            // Deterministic minimal-steps solution for 8-Queens (one queen per row)
-            // 0-indexed columns for rows 0..7; this is a known valid solution
-            this.fixedSolution = [0, 4, 7, 5, 2, 6, 1, 3];
+            // Deterministic minimal-steps solution (one queen per row)
+            // 0-indexed columns; the classic 8-Queens answer or a constructed one
+            this.fixedSolution = this.n === 8 ? [0, 4, 7, 5, 2, 6, 1, 3] : constructiveSolution(this.n);
         }
         this.currentRow = 0; // for UI highlighting and placement
         this.solved = false;
@@ -34,7 +57,7 @@ class StepByStepAStar {
     
     getValidColumns(state, row) {
         const validCols = [];
-        for (let col = 0; col < BOARD_SIZE; col++) {
+        for (let col = 0; col < this.n; col++) {
             const tempState = [...state];
             tempState[row] = col;
             
@@ -74,8 +97,12 @@ class StepByStepAStar {
         // Increment step counter
         this.stepCount++;
         if (this.mode === 'deterministic') {
+            if (this.fixedSolution === null) {
+                this.stuck = true;
+                return [this.currentState, `No solution exists for N=${this.n}.`, true];
+            }
             // If all rows placed, validate and finish
-            if (this.currentRow >= BOARD_SIZE) {
+            if (this.currentRow >= this.n) {
                 const h = this.attackingPairs(this.currentState);
                 if (h === 0) {
                     this.solved = true;
@@ -93,7 +120,7 @@ class StepByStepAStar {
             this.currentRow += 1;
             
             // If this was the last placement, validate immediately and finish
-            const done = (this.currentRow === BOARD_SIZE);
+            const done = (this.currentRow === this.n);
             if (done) {
                 const h = this.attackingPairs(this.currentState);
                 if (h === 0) {
@@ -122,7 +149,7 @@ class StepByStepAStar {
             this.currentRow = node.row;
 
             // Goal test
-            if (node.row >= BOARD_SIZE) {
+            if (node.row >= this.n) {
                 if (this.attackingPairs(node.state) === 0) {
                     this.solved = true;
                     return [this.currentState, `Step ${this.stepCount}: Solution found!`, true];
@@ -168,7 +195,8 @@ class StepByStepAStar {
         }
         
         // For each remaining row, count how many columns are blocked
-        for (let row = fromRow; row < BOARD_SIZE; row++) {
+        const n = this.n;
+        for (let row = fromRow; row < n; row++) {
             const blockedCols = new Set();
             
             for (const [r, c] of placedQueens) {
@@ -177,15 +205,15 @@ class StepByStepAStar {
                 
                 // Diagonal conflicts
                 const diagOffset = row - r;
-                if (c - diagOffset >= 0 && c - diagOffset < BOARD_SIZE) {
+                if (c - diagOffset >= 0 && c - diagOffset < n) {
                     blockedCols.add(c - diagOffset);
                 }
-                if (c + diagOffset >= 0 && c + diagOffset < BOARD_SIZE) {
+                if (c + diagOffset >= 0 && c + diagOffset < n) {
                     blockedCols.add(c + diagOffset);
                 }
             }
             
-            const available = BOARD_SIZE - blockedCols.size;
+            const available = n - blockedCols.size;
             if (available === 0) {
                 conflicts += 10; // Heavy penalty for impossible rows
             } else {
@@ -230,14 +258,221 @@ class StepByStepAStar {
     }
 }
 
+// Step trace reader for files written by queen8_py/queen8_trace.py. The
+// layout (header, varint step records, keyframe table) is documented there.
+const TRACE_MAGIC = 'Q8TR';
+const TRACE_VERSION = 1;
+const TRACE_MODES = ['deterministic', 'astar', 'minconflicts', 'forward', 'beam', 'idastar'];
+const TRACE_KINDS = ['place', 'placed_all', 'expand', 'dead_end', 'backtrack', 'deepen', 'move', 'restart',
+                     'solved', 'conflict', 'exhausted', 'budget', 'no_solution'];
+const TRACE_EVENTS_AT = 48; // header size rounded up to 8 bytes
+
+function traceMessage(e) {
+    const step = e.step;
+    switch (e.kind) {
+        case 'place': return `Step ${step}: Placed queen at row ${e.row}, col ${e.col}.`;
+        case 'placed_all': return `Step ${step}: Placed queen at row ${e.row}, col ${e.col}. Initial board has ${e.frontier} attacked queens.`;
+        case 'expand': return `Step ${step}: Expanded row ${e.row}, placed queen at col ${e.col}. Open list size: ${e.frontier}`;
+        case 'dead_end': return `Step ${step}: Dead end at row ${e.row}. Exploring other candidates...`;
+        case 'backtrack': return `Step ${step}: No columns left in row ${e.row}, backtracking.`;
+        case 'deepen': return `Step ${step}: Nothing left within the f-bound, raising it to ${e.info}.`;
+        case 'move': return `Step ${step}: Moved queen in row ${e.row} from col ${e.info} to col ${e.col}.`;
+        case 'restart': return `Step ${step}: No solution found, restart ${e.info}.`;
+        case 'solved': return `Step ${step}: Solution found!`;
+        case 'conflict': return 'Unexpected conflict at full placement.';
+        case 'exhausted': return 'Frontier exhausted. No solution found (no backtracking).';
+        case 'budget': return `Step budget exhausted at step ${step - 1} after ${e.info} restarts.`;
+        case 'no_solution': return `No solution exists for N=${e.info}.`;
+        default: return `Step ${step}: ${e.kind}`;
+    }
+}
+
+class StepTrace {
+    constructor(buffer) {
+        this.bytes = new Uint8Array(buffer);
+        const view = new DataView(buffer);
+        const magic = String.fromCharCode(...this.bytes.subarray(0, 4));
+        if (buffer.byteLength < TRACE_EVENTS_AT || magic !== TRACE_MAGIC) {
+            throw new Error('not a trace file');
+        }
+        const version = view.getUint16(4, true);
+        if (version !== TRACE_VERSION) throw new Error(`unsupported trace version ${version}`);
+        this.mode = TRACE_MODES[view.getUint8(6)];
+        this.solved = (view.getUint8(7) & 1) !== 0;
+        this.n = view.getUint32(8, true);
+        this.steps = Number(view.getBigInt64(12, true));
+        this.keyframeEvery = Number(view.getBigInt64(20, true));
+        const keyframes = Number(view.getBigInt64(28, true));
+        const table = Number(view.getBigInt64(36, true));
+        if (keyframes === 0 || table + keyframes * (24 + 4 * this.n) > buffer.byteLength) {
+            throw new Error('trace file is truncated');
+        }
+        this.kfSteps = new Float64Array(keyframes);
+        this.kfOffsets = new Float64Array(keyframes);
+        this.kfFrontiers = new Float64Array(keyframes);
+        for (let k = 0; k < keyframes; k++) {
+            this.kfSteps[k] = Number(view.getBigInt64(table + 8 * k, true));
+            this.kfOffsets[k] = Number(view.getBigInt64(table + 8 * (keyframes + k), true));
+            this.kfFrontiers[k] = Number(view.getBigInt64(table + 8 * (2 * keyframes + k), true));
+        }
+        this.view = view;
+        this.boardsAt = table + 24 * keyframes;
+    }
+
+    // Last keyframe at or before `step` (binary search), as a decoding cursor
+    cursor(step) {
+        let lo = 0;
+        let hi = this.kfSteps.length - 1;
+        while (lo < hi) {
+            const mid = (lo + hi + 1) >> 1;
+            if (this.kfSteps[mid] <= step) lo = mid; else hi = mid - 1;
+        }
+        const state = new Array(this.n);
+        const at = this.boardsAt + 4 * this.n * lo;
+        for (let r = 0; r < this.n; r++) state[r] = this.view.getInt32(at + 4 * r, true);
+        return { step: this.kfSteps[lo], pos: this.kfOffsets[lo], frontier: this.kfFrontiers[lo], state };
+    }
+
+    // Decode the next record at the cursor, updating its board in place
+    advance(cur) {
+        const bytes = this.bytes;
+        let pos = cur.pos;
+        const uvarint = () => {
+            let value = 0;
+            let scale = 1;
+            let byte;
+            do {
+                byte = bytes[pos++];
+                value += (byte & 0x7f) * scale;
+                scale *= 128;
+            } while (byte >= 0x80);
+            return value;
+        };
+        const unzigzag = v => (v % 2 === 0 ? v / 2 : -(v + 1) / 2);
+        const kind = TRACE_KINDS[bytes[pos++]];
+        const row = uvarint() - 1;
+        const col = uvarint() - 1;
+        cur.frontier += unzigzag(uvarint());
+        const info = unzigzag(uvarint());
+        const count = uvarint();
+        let r = -1;
+        for (let i = 0; i < count; i++) {
+            r += uvarint() + 1;
+            cur.state[r] = uvarint() - 1;
+        }
+        cur.pos = pos;
+        cur.step += 1;
+        return { kind, step: cur.step, row, col, frontier: cur.frontier, info };
+    }
+
+    // Board after `step` steps and that step's event (null at step 0)
+    seek(step) {
+        step = Math.max(0, Math.min(this.steps, step));
+        const cur = this.cursor(Math.max(0, step - 1));
+        let event = null;
+        while (cur.step < step) event = this.advance(cur);
+        return { cur, event };
+    }
+}
+
+// Search run on the Python solver service (queen8_py/queen8_server.py). Same
+// interface as StepByStepAStar, but the steps come from the server's event
+// stream: nextStep() only applies the next buffered step to the board.
+const SERVER_URL = 'http://127.0.0.1:8765'; // used when the page is opened from a file
+const ASTAR_MAX_N = 12; // above this, "Run simulation" uses min-conflicts when the server is connected
+const TERMINAL_KINDS = ['solved', 'conflict', 'exhausted', 'budget', 'no_solution'];
+
+class RemoteSearch {
+    constructor(n, base) {
+        this.n = n;
+        this.base = base;
+        this.mode = 'deterministic';
+        this.source = null;
+        this.reset();
+    }
+
+    reset() {
+        if (this.source) this.source.close();
+        this.source = null;
+        this.currentState = new Array(this.n).fill(-1);
+        this.buffer = [];   // [step, event] pairs received but not shown yet
+        this.head = 0;
+        this.ended = false; // the stream has closed
+        this.final = null;
+        this.solved = false;
+        this.stuck = false;
+        this.stepCount = 0;
+    }
+
+    setMode(mode) {
+        if (!TRACE_MODES.includes(mode)) return;
+        this.mode = mode;
+        this.reset();
+    }
+
+    open() {
+        const source = new EventSource(`${this.base}/api/stream?n=${this.n}&mode=${this.mode}`);
+        source.addEventListener('steps', e => {
+            const batch = JSON.parse(e.data);
+            let step = batch.start;
+            for (const ev of batch.events) this.buffer.push([step++, ev]);
+        });
+        source.addEventListener('done', e => {
+            this.final = JSON.parse(e.data);
+            this.ended = true;
+            source.close();
+        });
+        source.onerror = () => {
+            // EventSource reconnects on its own; a run is never resumed midway
+            if (this.ended) return;
+            this.final = { error: 'Lost the connection to the solver service.' };
+            this.ended = true;
+            source.close();
+        };
+        this.source = source;
+    }
+
+    nextStep() {
+        if (this.solved) {
+            return [this.currentState, "Already solved!", true];
+        }
+        if (this.stuck) {
+            return [this.currentState, "Search failed - no solution found", true];
+        }
+        if (!this.source) this.open();
+        if (this.head >= this.buffer.length) {
+            if (!this.ended) return [this.currentState, 'Waiting for the solver...', false];
+            this.stuck = true;
+            if (this.final && this.final.error) return [this.currentState, `Solver error: ${this.final.error}`, true];
+            return [this.currentState, `Stopped after the service's limit of ${this.stepCount} steps.`, true];
+        }
+        const [step, ev] = this.buffer[this.head];
+        this.buffer[this.head++] = undefined;
+        const changes = ev[5];
+        for (let i = 0; i < changes.length; i += 2) this.currentState[changes[i]] = changes[i + 1];
+        this.stepCount = step;
+        const event = { kind: TRACE_KINDS[ev[0]], step, row: ev[1], col: ev[2], frontier: ev[3], info: ev[4] };
+        if (event.kind === 'solved') {
+            this.solved = true;
+        } else if (TERMINAL_KINDS.includes(event.kind)) {
+            this.stuck = true;
+        }
+        return [this.currentState, traceMessage(event), this.solved || this.stuck];
+    }
+}
+
 // GUI Class
 class EightQueensGUI {
     constructor() {
-        this.astarSearch = new StepByStepAStar();
+        this.n = BOARD_SIZE;
+        this.server = null; // solver service URL once one answers
+        this.astarSearch = this.newSearch(this.n);
         this.state = [...this.astarSearch.currentState];
         this.searchStarted = false;
         this.simulationTimer = null;
         this.isPaused = false;
+        this.trace = null;
+        this.traceCursor = null;
         
         this.initializeElements();
         this.setupEventListeners();
@@ -247,6 +482,34 @@ class EightQueensGUI {
         this.updateStepCounter();
         this.updateModeIndicator();
         this.updateMessage("Click 'Start' to begin the A* search algorithm.");
+        this.connectServer();
+    }
+
+    newSearch(n) {
+        return this.server ? new RemoteSearch(n, this.server) : new StepByStepAStar(n);
+    }
+
+    // Use the Python solver service when it is running; otherwise keep
+    // solving in the page
+    async connectServer() {
+        const base = location.protocol.startsWith('http') ? '' : SERVER_URL;
+        try {
+            const response = await fetch(`${base}/api/health`, { signal: AbortSignal.timeout(1000) });
+            if (!response.ok) return;
+            const { modes } = await response.json();
+            this.server = base;
+            for (const option of this.modeSelect.options) {
+                option.disabled = !modes.includes(option.value);
+            }
+        } catch (err) {
+            return; // no service: local fallback
+        }
+        if (!this.searchStarted && !this.trace) {
+            const mode = this.astarSearch.mode;
+            this.astarSearch = this.newSearch(this.n);
+            this.astarSearch.setMode(mode);
+        }
+        this.updateModeIndicator();
     }
     
     initializeElements() {
@@ -255,6 +518,7 @@ class EightQueensGUI {
         this.restartBtn = document.getElementById('restart-btn');
         this.runSimBtn = document.getElementById('run-sim-btn');
         this.modeSelect = document.getElementById('mode-select');
+        this.sizeSelect = document.getElementById('size-select');
         this.pauseResumeBtn = document.getElementById('pause-resume-btn');
         this.speedSelect = document.getElementById('speed-select');
         this.statusMessage = document.getElementById('status-message');
@@ -263,6 +527,8 @@ class EightQueensGUI {
         this.stepCounter = document.getElementById('step-counter');
         this.chessBoard = document.getElementById('chess-board');
         this.queenPositions = document.getElementById('queen-positions');
+        this.traceInput = document.getElementById('trace-input');
+        this.traceSlider = document.getElementById('trace-slider');
     }
     
     setupEventListeners() {
@@ -278,13 +544,170 @@ class EightQueensGUI {
         if (this.modeSelect) {
             this.modeSelect.addEventListener('change', () => this.onModeChange());
         }
+        if (this.sizeSelect) {
+            this.sizeSelect.addEventListener('change', () => this.onSizeChange());
+        }
         if (this.speedSelect) {
             this.speedSelect.addEventListener('change', () => this.onSpeedChange());
         }
+        if (this.traceInput) {
+            this.traceInput.addEventListener('change', () => this.openTrace());
+        }
+        if (this.traceSlider) {
+            this.traceSlider.addEventListener('input', () => this.showTraceStep(parseInt(this.traceSlider.value, 10)));
+        }
+    }
+
+    // ---- Trace replay: scrub and play a recorded run without re-solving ----
+    async openTrace() {
+        const file = this.traceInput.files[0];
+        if (!file) return;
+        let trace;
+        try {
+            trace = new StepTrace(await file.arrayBuffer());
+        } catch (err) {
+            this.updateMessage(`Cannot open trace: ${err.message}`);
+            return;
+        }
+        if (trace.n > BOARD_MAX_N) {
+            this.updateMessage(`Cannot open trace: the board is ${trace.n} × ${trace.n}; ` +
+                `this page draws boards up to ${BOARD_MAX_N} × ${BOARD_MAX_N}. Replay it in queen8_py/queen8_gui.py.`);
+            return;
+        }
+        this.stopSimulationTimer();
+        this.isPaused = false;
+        this.trace = trace;
+        this.n = trace.n;
+        document.documentElement.style.setProperty('--n', trace.n);
+        if (this.sizeSelect) this.selectSize(trace.n);
+        if (this.modeSelect) this.modeSelect.value = trace.mode;
+        this.astarSearch = this.newSearch(trace.n);
+        this.astarSearch.mode = trace.mode;
+        this.searchStarted = true;
+        this.startBtn.disabled = true;
+        if (this.runSimBtn) {
+            this.runSimBtn.disabled = false;
+            this.runSimBtn.textContent = 'Play trace';
+        }
+        if (this.pauseResumeBtn) {
+            this.pauseResumeBtn.disabled = true;
+            this.pauseResumeBtn.textContent = 'Pause';
+        }
+        this.traceSlider.max = String(trace.steps);
+        this.traceSlider.hidden = false;
+        this.updateModeIndicator();
+        this.showTraceStep(0);
+    }
+
+    // Show n in the size menu, adding an entry when the menu does not list it
+    selectSize(n) {
+        const value = String(n);
+        const options = Array.from(this.sizeSelect.options);
+        if (!options.some(o => o.value === value)) {
+            const option = new Option(`${n} × ${n}`, value);
+            this.sizeSelect.add(option, options.find(o => parseInt(o.value, 10) > n) || null);
+        }
+        this.sizeSelect.value = value;
+    }
+
+    closeTrace() {
+        if (!this.trace) return;
+        this.trace = null;
+        this.traceCursor = null;
+        this.traceInput.value = '';
+        this.traceSlider.hidden = true;
+        if (this.runSimBtn) this.runSimBtn.textContent = 'Run simulation';
+    }
+
+    // Seek through the keyframes to `step` and draw it
+    showTraceStep(step) {
+        const { cur, event } = this.trace.seek(step);
+        this.traceCursor = cur;
+        this.showTraceState(event);
+    }
+
+    showTraceState(event) {
+        const cur = this.traceCursor;
+        this.state = [...cur.state];
+        this.traceSlider.value = String(cur.step);
+        this.updateSidePanel();
+        this.updateHeuristicDisplay();
+        this.updateStepCounter();
+        this.drawBoard();
+        this.updateMessage(event ? traceMessage(event) :
+            `Trace of ${this.trace.steps} steps loaded. Play it or drag the slider.`);
+        this.nextBtn.disabled = cur.step >= this.trace.steps;
+    }
+
+    startTraceTimer() {
+        this.simulationTimer = setInterval(() => {
+            const event = this.trace.advance(this.traceCursor);
+            this.showTraceState(event);
+            if (this.traceCursor.step >= this.trace.steps) {
+                this.stopSimulationTimer();
+                this.isPaused = false;
+                if (this.runSimBtn) {
+                    this.runSimBtn.disabled = false;
+                    this.runSimBtn.textContent = 'Play trace';
+                }
+                if (this.pauseResumeBtn) {
+                    this.pauseResumeBtn.disabled = true;
+                    this.pauseResumeBtn.textContent = 'Pause';
+                }
+            }
+        }, this.getSimulationDelay());
+    }
+
+    playTrace() {
+        if (this.traceCursor.step >= this.trace.steps) this.showTraceStep(0);
+        this.nextBtn.disabled = true;
+        if (this.runSimBtn) {
+            this.runSimBtn.disabled = true;
+            this.runSimBtn.textContent = 'Playing...';
+        }
+        if (this.pauseResumeBtn) {
+            this.pauseResumeBtn.disabled = false;
+            this.pauseResumeBtn.textContent = 'Pause';
+        }
+        this.isPaused = false;
+        this.stopSimulationTimer();
+        this.startTraceTimer();
+    }
+
+    onSizeChange() {
+        const n = parseInt(this.sizeSelect.value, 10);
+        if (!Number.isFinite(n) || n === this.n) return;
+        this.stopSimulationTimer();
+        this.isPaused = false;
+        this.closeTrace();
+        this.n = n;
+        // Cell size and grid dimensions are derived from --n in styles.css
+        document.documentElement.style.setProperty('--n', n);
+        this.astarSearch = this.newSearch(n);
+        if (this.runSimBtn) {
+            this.runSimBtn.disabled = false;
+            this.runSimBtn.textContent = 'Run simulation';
+        }
+        this.onModeChange();
+    }
+
+    modeLabel(mode) {
+        switch (mode) {
+            case 'deterministic': return `Deterministic (${this.n} steps)`;
+            case 'minconflicts': return 'Min-conflicts (local search)';
+            case 'forward': return 'Forward checking (MRV, backtracking)';
+            case 'beam': return 'Beam search';
+            case 'idastar': return 'IDA* (iterative f-bounds)';
+            default: return 'A* Frontier (no backtracking)';
+        }
     }
 
     onModeChange() {
-        const mode = this.modeSelect.value === 'astar' ? 'astar' : 'deterministic';
+        this.stopSimulationTimer();
+        this.isPaused = false;
+        this.closeTrace();
+        const value = this.modeSelect.value;
+        const mode = this.server || value === 'astar' ? value : 'deterministic';
         // Apply mode to algorithm (this will reset internal state)
         this.astarSearch.setMode(mode);
         // Sync local state and UI
@@ -300,16 +723,14 @@ class EightQueensGUI {
         this.updateHeuristicDisplay();
         this.updateStepCounter();
         this.drawBoard();
-        const modeLabel = mode === 'deterministic' ? 'Deterministic (8 steps)' : 'A* Frontier (no backtracking)';
-        this.updateMessage(`Mode changed to ${modeLabel}. Click 'Start' to begin.`);
+        this.updateMessage(`Mode changed to ${this.modeLabel(mode)}. Click 'Start' to begin.`);
         this.updateModeIndicator();
     }
 
     updateModeIndicator() {
         if (!this.modeIndicator) return;
-        const mode = this.astarSearch.mode;
-        const modeLabel = mode === 'deterministic' ? 'Deterministic (8 steps)' : 'A* Frontier (no backtracking)';
-        this.modeIndicator.textContent = `Mode: ${modeLabel}`;
+        const where = this.astarSearch instanceof RemoteSearch ? ' (solver service)' : '';
+        this.modeIndicator.textContent = `Mode: ${this.modeLabel(this.astarSearch.mode)}${where}`;
     }
 
     getSimulationDelay() {
@@ -322,7 +743,7 @@ class EightQueensGUI {
         // If simulation is running and not paused, restart the interval with new speed
         if (this.simulationTimer && !this.isPaused) {
             this.stopSimulationTimer();
-            this.startSimulationTimer();
+            if (this.trace) this.startTraceTimer(); else this.startSimulationTimer();
         }
     }
 
@@ -347,6 +768,9 @@ class EightQueensGUI {
                 if (this.modeSelect) {
                     this.modeSelect.disabled = false;
                 }
+                if (this.sizeSelect) {
+                    this.sizeSelect.disabled = false;
+                }
                 if (this.pauseResumeBtn) {
                     this.pauseResumeBtn.disabled = true;
                     this.pauseResumeBtn.textContent = 'Pause';
@@ -372,8 +796,8 @@ class EightQueensGUI {
         this.chessBoard.innerHTML = '';
         
         // Create chess board cells
-        for (let r = 0; r < BOARD_SIZE; r++) {
-            for (let c = 0; c < BOARD_SIZE; c++) {
+        for (let r = 0; r < this.n; r++) {
+            for (let c = 0; c < this.n; c++) {
                 const cell = document.createElement('div');
                 cell.className = `chess-cell ${(r + c) % 2 === 0 ? 'light' : 'dark'}`;
                 cell.dataset.row = r;
@@ -383,7 +807,7 @@ class EightQueensGUI {
         }
         
         // Draw queens
-        for (let r = 0; r < BOARD_SIZE; r++) {
+        for (let r = 0; r < this.n; r++) {
             const c = this.state[r];
             if (c !== -1) {
                 this.drawQueen(r, c);
@@ -393,7 +817,7 @@ class EightQueensGUI {
         // Highlight current row (most recently placed queen)
         if (this.searchStarted && !this.astarSearch.solved) {
             let lastPlacedRow = -1;
-            for (let r = 0; r < BOARD_SIZE; r++) {
+            for (let r = 0; r < this.n; r++) {
                 if (this.state[r] !== -1) {
                     lastPlacedRow = r;
                 }
@@ -408,7 +832,7 @@ class EightQueensGUI {
     
     drawQueen(row, col) {
         const cells = this.chessBoard.children;
-        const cellIndex = row * BOARD_SIZE + col;
+        const cellIndex = row * this.n + col;
         const cell = cells[cellIndex];
         
         const queen = document.createElement('div');
@@ -428,7 +852,7 @@ class EightQueensGUI {
     addOrangeHighlight(row) {
         const highlight = document.createElement('div');
         highlight.className = 'orange-highlight';
-        highlight.style.top = `${row * 60}px`;
+        highlight.style.top = `calc(${row} * var(--cell))`;
         this.chessBoard.appendChild(highlight);
     }
     
@@ -439,6 +863,9 @@ class EightQueensGUI {
         if (this.modeSelect) {
             this.modeSelect.disabled = true; // disable mode switching during manual run
         }
+        if (this.sizeSelect) {
+            this.sizeSelect.disabled = true;
+        }
         
         // Immediately perform the first step
         const [newState, message, isComplete] = this.astarSearch.nextStep();
@@ -461,10 +888,17 @@ class EightQueensGUI {
             if (this.modeSelect) {
                 this.modeSelect.disabled = false;
             }
+            if (this.sizeSelect) {
+                this.sizeSelect.disabled = false;
+            }
         }
     }
     
     nextStep() {
+        if (this.trace) {
+            if (this.traceCursor.step < this.trace.steps) this.showTraceState(this.trace.advance(this.traceCursor));
+            return;
+        }
         const [newState, message, isComplete] = this.astarSearch.nextStep();
         this.state = [...newState];
         
@@ -485,10 +919,27 @@ class EightQueensGUI {
             if (this.modeSelect) {
                 this.modeSelect.disabled = false;
             }
+            if (this.sizeSelect) {
+                this.sizeSelect.disabled = false;
+            }
         }
     }
     
     restart() {
+        if (this.trace) {
+            this.stopSimulationTimer();
+            this.isPaused = false;
+            if (this.runSimBtn) {
+                this.runSimBtn.disabled = false;
+                this.runSimBtn.textContent = 'Play trace';
+            }
+            if (this.pauseResumeBtn) {
+                this.pauseResumeBtn.disabled = true;
+                this.pauseResumeBtn.textContent = 'Pause';
+            }
+            this.showTraceStep(0);
+            return;
+        }
         this.astarSearch.reset();
         this.state = [...this.astarSearch.currentState];
         this.searchStarted = false;
@@ -503,6 +954,9 @@ class EightQueensGUI {
         if (this.modeSelect) {
             this.modeSelect.disabled = false;
         }
+        if (this.sizeSelect) {
+            this.sizeSelect.disabled = false;
+        }
         if (this.pauseResumeBtn) {
             this.pauseResumeBtn.disabled = true;
             this.pauseResumeBtn.textContent = 'Pause';
@@ -517,14 +971,19 @@ class EightQueensGUI {
     }
 
     runSimulation() {
-        // Ensure mode is A* frontier
-        if (this.modeSelect && this.modeSelect.value !== 'astar') {
-            this.modeSelect.value = 'astar';
+        if (this.trace) {
+            this.playTrace();
+            return;
+        }
+        // Ensure a searching mode (deterministic runs switch to A* frontier,
+        // or to min-conflicts on boards too large for A* to finish)
+        if (this.modeSelect && this.modeSelect.value === 'deterministic') {
+            this.modeSelect.value = this.server && this.astarSearch.n > ASTAR_MAX_N ? 'minconflicts' : 'astar';
             this.onModeChange();
         } else {
-            // If already in astar mode, reset to fresh state if not started
+            // If already in a searching mode, reset to fresh state if not started
             if (!this.searchStarted) {
-                this.astarSearch.setMode('astar');
+                this.astarSearch.setMode(this.astarSearch.mode);
                 this.state = [...this.astarSearch.currentState];
             }
         }
@@ -539,6 +998,9 @@ class EightQueensGUI {
         if (this.modeSelect) {
             this.modeSelect.disabled = true;
         }
+        if (this.sizeSelect) {
+            this.sizeSelect.disabled = true;
+        }
         if (this.pauseResumeBtn) {
             this.pauseResumeBtn.disabled = false;
             this.pauseResumeBtn.textContent = 'Pause';
@@ -555,7 +1017,7 @@ class EightQueensGUI {
             // Resume
             this.isPaused = false;
             this.pauseResumeBtn.textContent = 'Pause';
-            this.startSimulationTimer();
+            if (this.trace) this.startTraceTimer(); else this.startSimulationTimer();
         } else {
             // Pause
             this.isPaused = true;
@@ -564,10 +1026,22 @@ class EightQueensGUI {
         }
     }
     
+    // Large boards list their first SIDE_PANEL_ROWS rows
     updateSidePanel() {
         this.queenPositions.innerHTML = '';
         
-        for (let r = 0; r < BOARD_SIZE; r++) {
+        // Highlight the last placed row while the search is running
+        let lastPlacedRow = -1;
+        if (this.searchStarted && !this.astarSearch.solved) {
+            for (let row = 0; row < this.n; row++) {
+                if (this.state[row] !== -1) {
+                    lastPlacedRow = row;
+                }
+            }
+        }
+        
+        const shown = Math.min(this.n, SIDE_PANEL_ROWS);
+        for (let r = 0; r < shown; r++) {
             const val = this.state[r];
             const text = val === -1 ? `Row ${r}: not placed` : `Row ${r}: column ${val}`;
             
@@ -575,32 +1049,30 @@ class EightQueensGUI {
             div.className = 'queen-position';
             div.textContent = text;
             
-            // Highlight current row
-            let isHighlighted = false;
-            if (this.searchStarted && !this.astarSearch.solved) {
-                let lastPlacedRow = -1;
-                for (let row = 0; row < BOARD_SIZE; row++) {
-                    if (this.state[row] !== -1) {
-                        lastPlacedRow = row;
-                    }
-                }
-                isHighlighted = (r === lastPlacedRow && lastPlacedRow >= 0);
-            }
-            
-            if (isHighlighted) {
+            if (r === lastPlacedRow) {
                 div.classList.add('highlighted');
             }
             
             this.queenPositions.appendChild(div);
         }
+        if (this.n > shown) {
+            const div = document.createElement('div');
+            div.className = 'queen-position';
+            div.textContent = `... ${this.n - shown} more rows`;
+            this.queenPositions.appendChild(div);
+        }
     }
     
     updateHeuristicDisplay() {
         const placedQueens = this.state.filter(c => c !== -1).length;
-        this.heuristicDisplay.textContent = `Queens placed: ${placedQueens}/${BOARD_SIZE}`;
+        this.heuristicDisplay.textContent = `Queens placed: ${placedQueens}/${this.n}`;
     }
     
     updateStepCounter() {
+        if (this.trace) {
+            this.stepCounter.textContent = `Trace step: ${this.traceCursor.step}/${this.trace.steps}`;
+            return;
+        }
         this.stepCounter.textContent = `Algorithm steps: ${this.astarSearch.stepCount}`;
     }
     